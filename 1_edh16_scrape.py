@@ -1,33 +1,58 @@
 import os
-import re
-import json
+import csv
 import time
-from bs4 import BeautifulSoup
-from selenium import webdriver
+import argparse
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from edhtop16_api import TIME_PERIODS, commander_url, entry_key, scrape_edhtop16_http, take_new_entries, with_sort_by
+from edhtop16_parser import DECK_ENTRY_CLASS, parse_edhtop16_html
+from browser_pool import BrowserPool
+from browser_profile import ResourceStats
+from run_metrics import RunMetrics
+from scrape_waits import wait_for, document_ready, element_count_at_least, element_count_greater_than, element_clickable, xpath
+
+DECK_ENTRY_LOCATOR = xpath(f'//div[@class="{DECK_ENTRY_CLASS}"]')
 
 #todo improve the user input experience - automatically prompt the user for the weblink, or read the weblink from a config file
 #todo update the code to upload all files into their own new directory - no need to faff around rearranging stuff
-def scrape_edhtop16(url):
-    # Set up Selenium with Chrome
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # Run in headless mode
-    chrome_options.add_argument("--window-size=1920,1080")
-    driver = webdriver.Chrome(options=chrome_options)
+# Shared by every scrape in this process so Chrome is only started once
+_browser_pool = None
+
+def get_browser_pool(size=1, block_resources=True):
+    """Return this process's browser pool, creating it on first use."""
+    global _browser_pool
+    if _browser_pool is None:
+        # Skip images, fonts and analytics we never read
+        _browser_pool = BrowserPool(size=size, site='edhtop16' if block_resources else None)
+    return _browser_pool
+
+def scrape_edhtop16(url, known_keys=None, pool=None, metrics=None):
+    # In incremental mode, sort newest first so already-stored entries come last
+    if known_keys is not None:
+        url = with_sort_by(url, 'NEW')
+
+    # Borrow a warm Chrome session from the pool
+    pool = pool or get_browser_pool()
+    session = pool.acquire()
+    driver = session.driver
+    timer = metrics or RunMetrics()
+    resource_stats = ResourceStats()
 
     try:
         # Load the page
         print(f"Loading URL: {url}")
-        driver.get(url)
-        time.sleep(3)  # Give initial page time to load
+        load_start = time.time()
+        with timer.step("navigate"):
+            driver.get(url)
+
+        # Wait for the first batch of entries to render rather than a fixed delay
+        wait_for(driver, document_ready(), timeout=15, step="document_ready", timer=timer)
+        wait_for(driver, element_count_at_least(DECK_ENTRY_LOCATOR, 1), timeout=15, step="first_entries", timer=timer)
 
         # First, scroll down to ensure all initial content is loaded
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
 
         # Try different selectors for the "Load More" button
         load_more_selectors = [
@@ -45,6 +70,15 @@ def scrape_edhtop16(url):
         max_attempts = 100  # Increased limit to ensure we get all content
 
         while click_count < max_attempts:
+            entry_count = len(driver.find_elements(*DECK_ENTRY_LOCATOR))
+
+            if known_keys is not None:
+                # Newest first, so stop loading once a stored entry has appeared
+                _, reached_known = take_new_entries(parse_edhtop16_html(driver.page_source)['decks'], known_keys)
+                if reached_known:
+                    print("Reached an already stored entry, stopping incremental load.")
+                    break
+
             button_found = False
 
             # Try each selector
@@ -57,12 +91,17 @@ def scrape_edhtop16(url):
                     for element in elements:
                         if element.is_displayed() and element.is_enabled():
                             driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                            time.sleep(1)
+                            wait_for(driver, element_clickable(element), timeout=5, step="button_clickable", timer=timer)
                             element.click()
                             print(f"Clicked 'Load More' button ({click_count + 1})")
                             click_count += 1
                             button_found = True
-                            time.sleep(3)  # Wait for content to load
+
+                            # Wait until the new batch of entries is in the DOM
+                            if not wait_for(driver, element_count_greater_than(DECK_ENTRY_LOCATOR, entry_count),
+                                            timeout=15, step="load_more", timer=timer):
+                                print("No new entries appeared after clicking 'Load More'.")
+                                button_found = False
                             break
 
                     if button_found:
@@ -76,159 +115,236 @@ def scrape_edhtop16(url):
                 break
 
         print(f"Loaded all content after {click_count} clicks")
+        timer.print_summary()
+        resource_stats.collect(driver, time.time() - load_start)
+        print(f"Network: {resource_stats.summary()}")
 
         # Get the fully loaded page source
         html_content = driver.page_source
 
-        # Now use BeautifulSoup to parse the content
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        # Extract the commander name from the title
-        title_text = soup.title.text
-        commander_name = title_text.split('|')[0].strip()
-
-        # Find all deck entries using the correct class structure
-        deck_entries = soup.find_all('div', class_='group relative overflow-hidden rounded-lg bg-white shadow transition-shadow cursor-pointer hover:shadow-lg')
-        print(f"Found {len(deck_entries)} deck entries")
-
-        decks = []
-        for entry in deck_entries:
-            # Extract deck name and URL (from the first <a> tag)
-            deck_link = entry.find('a')
-            if not deck_link:
-                continue
-
-            url = deck_link['href'].strip() #you have to do this because they sometimes make a small typo and add a space!!
-
-            # Skip if not a Moxfield URL
-            if "moxfield.com" not in url:
-                continue
-
-            # Extract the deck ID from the URL
-            deck_id_match = re.search(r'moxfield\.com/decks/([^/]+)', url)
-            if not deck_id_match:
-                continue
-
-            deck_id = deck_id_match.group(1)
-
-            # Create deck info dictionary with the required fields
-            deck_info = {
-                'commander': commander_name,
-                'deck_id': deck_id,
-                'url': url,
-                'name': deck_link.text.strip()
-            }
-
-            # Extract tournament name (from the second <a> tag)
-            tournament_link = entry.find_all('a')
-            if len(tournament_link) > 1:
-                deck_info['tournament'] = tournament_link[1].text.strip()
-            else:
-                deck_info['tournament'] = ""
-
-            # Extract date
-            date_span = entry.find('span', class_='line-clamp-1 text-sm opacity-70')
-            if date_span:
-                deck_info['date'] = date_span.text.strip()
-            else:
-                deck_info['date'] = ""
-
-            # Extract placement info from the div with class "absolute bottom-0"
-            # Extract placement info from the div with class "absolute bottom-0"
-            placement_div = entry.find('div', class_='bottom-0')
-            if placement_div:
-                # Find both spans within the flex container
-                spans = placement_div.find_all('span')
-
-                # First span contains placement info
-                if len(spans) > 0:
-                    placement_text = spans[0].get_text(strip=True)
-                    # Handle "4th / 63 players" format
-                    parts = [p.strip() for p in placement_text.split('/')]
-                    if len(parts) >= 2:
-                        # Extract placement number (remove ordinal suffix)
-                        placement = re.search(r'\d+', parts[0]).group() if re.search(r'\d+', parts[0]) else ""
-                        # Extract total players
-                        total_players = re.search(r'\d+', parts[1]).group() if re.search(r'\d+', parts[1]) else ""
-
-                        deck_info['placement'] = placement
-                        deck_info['total_players'] = total_players
-
-                # Second span contains win/loss record
-                if len(spans) > 1:
-                    record_text = spans[1].get_text(strip=True)
-                    # Handle "Wins: 2 / Losses: 3 / Draws: 0" format
-                    wins = re.search(r'Wins:\s*(\d+)', record_text)
-                    losses = re.search(r'Losses:\s*(\d+)', record_text)
-                    draws = re.search(r'Draws:\s*(\d+)', record_text)
-
-                    deck_info['wins'] = wins.group(1) if wins else ""
-                    deck_info['losses'] = losses.group(1) if losses else ""
-                    deck_info['draws'] = draws.group(1) if draws else ""
-            else:
-                deck_info['placement'] = ''
-                deck_info['total_players'] = ''
-                deck_info['wins'] = ""
-                deck_info['losses'] = ""
-                deck_info['draws'] = ""
+        # Parse the deck entries out of the loaded page
+        data = parse_edhtop16_html(html_content)
+        if known_keys is not None:
+            data['decks'], _ = take_new_entries(data['decks'], known_keys)
+        print(f"Found {len(data['decks'])} deck entries")
 
+        for deck_info in data['decks']:
             # Debug output
             print(f"Deck: {deck_info['name']}")
             print(f"  Placement: {deck_info['placement']} / {deck_info['total_players']}")
             print(f"  Record: W{deck_info['wins']} L{deck_info['losses']} D{deck_info['draws']}")
 
-            decks.append(deck_info)
-
-        return {
-            'commander': commander_name,
-            'decks': decks
-        }
+        return data
 
     finally:
-        # Always close the driver
-        driver.quit()
-
-def main():
-    # Use the URL directly
-    url = "https://edhtop16.com/commander/Winota%2C%20Joiner%20of%20Forces?timePeriod=POST_BAN"
-
-    # Scrape the data
-    data = scrape_edhtop16(url)
-
-    # Define CSV headers based on the expected columns
-    headers = [
-        'commander', 'deck_id', 'url', 'name', 'tournament',
-        'date', 'placement', 'total_players', 'wins', 'losses', 'draws'
-    ]
-
-    # Save the data to a CSV file - completely overwrite the file
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_file = os.path.join(script_dir, "edh16_scrape.csv")
-
-    # Always write a new file (overwrite mode)
+        # Always hand the session back for the next scrape
+        session.page_done()
+        pool.release(session)
+
+CSV_HEADERS = [
+    'commander', 'deck_id', 'url', 'name', 'tournament',
+    'date', 'placement', 'total_players', 'wins', 'losses', 'draws'
+]
+
+def save_decks_csv(decks, output_file):
+    """
+    Write scraped deck entries to a CSV file, overwriting any existing file.
+
+    Args:
+        decks: List of deck dictionaries as returned by the scrapers
+        output_file: Path of the CSV file to write
+    """
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
         # Write header
-        f.write(','.join(headers) + '\n')
+        f.write(','.join(CSV_HEADERS) + '\n')
 
         # Write data rows
-        for deck in data['decks']:
-            row = [
-                deck.get('commander', ''),
-                deck.get('deck_id', ''),
-                deck.get('url', ''),
-                deck.get('name', ''),
-                deck.get('tournament', ''),
-                deck.get('date', ''),
-                deck.get('placement', ''),
-                deck.get('total_players', ''),
-                deck.get('wins', ''),
-                deck.get('losses', ''),
-                deck.get('draws', '')
-            ]
+        for deck in decks:
+            row = [deck.get(header, '') for header in CSV_HEADERS]
             f.write(','.join([str(item).replace(',', ' ') for item in row]) + '\n')
 
-    print(f"Scraped {len(data['decks'])} decks for {data['commander']}")
-    print(f"Data saved to {output_file}")
+def load_existing_decks(csv_file):
+    """
+    Read a previously saved stage 1 CSV.
+
+    Returns:
+        Tuple of (list of row dictionaries, set of entry keys); both empty if the file doesn't exist
+    """
+    if not os.path.exists(csv_file):
+        return [], set()
+
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return rows, {entry_key(row) for row in rows}
+
+def merge_decks(existing_decks, new_decks):
+    """Put newly scraped entries ahead of the stored ones, dropping any duplicate keys."""
+    merged = []
+    seen_keys = set()
+    for deck in list(new_decks) + list(existing_decks):
+        key = entry_key(deck)
+        if key not in seen_keys:
+            seen_keys.add(key)
+            merged.append(deck)
+    return merged
+
+def scrape_incremental(url, output_file, use_browser=False, pool=None, metrics=None):
+    """
+    Scrape only the entries that aren't in output_file yet and merge them into it.
+
+    Returns:
+        Tuple of (commander name, number of new entries, total entries)
+    """
+    existing_decks, known_keys = load_existing_decks(output_file)
+    print(f"Loaded {len(existing_decks)} stored entries from {output_file}")
+
+    if use_browser:
+        data = scrape_edhtop16(url, known_keys=known_keys, pool=pool, metrics=metrics)
+    else:
+        data = scrape_edhtop16_http(url, known_keys=known_keys, metrics=metrics)
+
+    merged_decks = merge_decks(existing_decks, data['decks'])
+    with metrics.step("file_write") if metrics else nullcontext():
+        save_decks_csv(merged_decks, output_file)
+    return data['commander'], len(data['decks']), len(merged_decks)
+
+def safe_filename(text):
+    """Turn a commander name into a filesystem-safe directory name."""
+    safe_text = "".join([c if c.isalnum() or c in " -_" else "_" for c in text])
+    return safe_text.strip().replace(' ', '_')
+
+def scrape_batch(commanders, time_periods, output_dir="edh16_scrapes", max_workers=4, use_browser=False, incremental=False,
+                 metrics=None):
+    """
+    Scrape every commander x time period combination on a bounded worker pool.
+
+    Each job writes its own CSV to output_dir/<commander>/<time_period>.csv, so
+    jobs never contend for the same file and a failed job leaves the others intact.
+
+    Args:
+        commanders: List of commander names, e.g. "Magda, Brazen Outlaw"
+        time_periods: List of EDHTop16 time periods, e.g. "POST_BAN"
+        output_dir: Directory where the partitioned CSV files will be saved
+        max_workers: Number of jobs scraped at the same time
+        use_browser: Drive headless Chrome instead of the plain HTTP ingest
+        incremental: Only fetch entries missing from each job's existing CSV and merge them in
+        metrics: Optional RunMetrics shared by every job
+
+    Returns:
+        List of (commander, time_period, deck_count or None on failure, output_file), in the
+        order of commanders then time_periods regardless of which job finished first
+    """
+    jobs = [(commander, time_period) for commander in commanders for time_period in time_periods]
+    print(f"Scraping {len(jobs)} commander/period combinations with {max_workers} workers")
+
+    # One warm browser per worker, reused across that worker's jobs
+    pool = get_browser_pool(size=max_workers) if use_browser else None
+
+    def run_job(commander, time_period):
+        url = commander_url(commander, time_period)
+        commander_dir = os.path.join(output_dir, safe_filename(commander))
+        os.makedirs(commander_dir, exist_ok=True)
+        output_file = os.path.join(commander_dir, f"{time_period}.csv")
+
+        if incremental:
+            _, _, total_decks = scrape_incremental(url, output_file, use_browser=use_browser, pool=pool, metrics=metrics)
+            return total_decks, output_file
+
+        if use_browser:
+            data = scrape_edhtop16(url, pool=pool, metrics=metrics)
+        else:
+            data = scrape_edhtop16_http(url, metrics=metrics)
+        with metrics.step("file_write") if metrics else nullcontext():
+            save_decks_csv(data['decks'], output_file)
+        return len(data['decks']), output_file
+
+    start_time = time.time()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_job, commander, time_period): (commander, time_period)
+                   for commander, time_period in jobs}
+
+        for future in as_completed(futures):
+            commander, time_period = futures[future]
+            try:
+                deck_count, output_file = future.result()
+                print(f"Saved {deck_count} decks for {commander} ({time_period}) to {output_file}")
+                results[(commander, time_period)] = (commander, time_period, deck_count, output_file)
+            except Exception as e:
+                print(f"Error scraping {commander} ({time_period}): {e}")
+                results[(commander, time_period)] = (commander, time_period, None, None)
+
+    results = [results[job] for job in jobs]
+    failed = sum(1 for result in results if result[2] is None)
+    print(f"Batch finished in {time.time() - start_time:.1f} seconds: {len(jobs) - failed} succeeded, {failed} failed")
+    return results
+
+def read_commander_list(path):
+    """Read commander names from a text file, one per line; blank lines and # comments are ignored."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape deck entries for a commander from EDHTop16")
+    parser.add_argument('url', nargs='?',
+                        default="https://edhtop16.com/commander/Winota%2C%20Joiner%20of%20Forces?timePeriod=POST_BAN",
+                        help="EDHTop16 commander URL")
+    parser.add_argument('--http', action='store_true',
+                        help="Read the page's __NEXT_DATA__ payload and GraphQL endpoint instead of driving Chrome")
+    parser.add_argument('--html-file',
+                        help="Parse the deck entries of a saved commander page instead of loading the URL")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only fetch entries that aren't already in the output CSV and merge them in")
+    parser.add_argument('--batch', metavar='COMMANDERS_FILE',
+                        help="Scrape every commander listed in this file (one per line) instead of a single URL")
+    parser.add_argument('--periods', nargs='+', default=['POST_BAN'],
+                        help=f"Time periods for --batch, or ALL for every period ({', '.join(TIME_PERIODS)})")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent jobs for --batch")
+    parser.add_argument('--output-dir', default="edh16_scrapes", help="Output directory for --batch")
+    parser.add_argument('--report', metavar='JSON_FILE',
+                        help="Save step timings, request counts and latency histograms for the run to this file")
+    args = parser.parse_args()
+    metrics = RunMetrics()
+
+    if args.batch:
+        time_periods = TIME_PERIODS if args.periods == ['ALL'] else args.periods
+        results = scrape_batch(read_commander_list(args.batch), time_periods, output_dir=args.output_dir,
+                               max_workers=args.workers, use_browser=not args.http, incremental=args.incremental,
+                               metrics=metrics)
+        entries = sum(result[2] or 0 for result in results)
+        failed = sum(1 for result in results if result[2] is None)
+    else:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        output_file = os.path.join(script_dir, "edh16_scrape.csv")
+        failed = 0
+
+        if args.incremental:
+            commander, new_count, entries = scrape_incremental(args.url, output_file, use_browser=not args.http, metrics=metrics)
+            print(f"Added {new_count} new decks for {commander} ({entries} stored)")
+        else:
+            # Scrape the data
+            if args.html_file:
+                data = parse_edhtop16_html(args.html_file)
+            elif args.http:
+                data = scrape_edhtop16_http(args.url, metrics=metrics)
+            else:
+                data = scrape_edhtop16(args.url, metrics=metrics)
+
+            # Save the data to a CSV file - completely overwrite the file
+            with metrics.step("file_write"):
+                save_decks_csv(data['decks'], output_file)
+            entries = len(data['decks'])
+            print(f"Scraped {entries} decks for {data['commander']}")
+        print(f"Data saved to {output_file}")
+
+    if args.report:
+        metrics.write_report(args.report, script="1_edh16_scrape", mode="browser" if not args.http else "http",
+                             batch=args.batch, entries=entries, failed_jobs=failed)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # Release browser sessions; a pool service's browsers stay warm for the next stage
+        if _browser_pool is not None:
+            _browser_pool.close()
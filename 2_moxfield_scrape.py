@@ -1,22 +1,140 @@
 import pandas as pd
 import time
 import random
-import sys
 import os
+import argparse
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from contextlib import nullcontext
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import WebDriverException, SessionNotCreatedException, InvalidSessionIdException
 from selenium_stealth import stealth
+from browser_pool import BrowserPool
+from rate_control import backoff_delay
+from multi_tab import run_in_tabs
+from fetch_priority import DEFAULT_PRIORITY, add_priority_argument, prioritize
+from deck_fetcher import DeckFetcher, DeckFetchError, DeckNotFound, deck_api_pattern, render_deck_text
+from network_capture import NetworkCapture
+from deck_store import DeckStore, deck_record_from_json, deck_record_from_text
+from job_journal import JobJournal, journal_key
+from browser_profile import ResourceStats
+from run_metrics import RunMetrics
+from scrape_waits import POLL_INTERVAL, wait_for, any_of, element_count_at_least, element_visible, value_non_empty, xpath
+
+DECK_HEADER_LOCATOR = (By.CLASS_NAME, "deckheader-name")
+ERROR_PAGE_LOCATOR = xpath("//*[contains(text(), 'Page Not Found') or contains(text(), 'does not exist on Moxfield') or contains(text(), 'This page is lost, but seeking.')]")
+EXPORT_OPTION_LOCATOR = xpath("//a[contains(text(), 'Export')]")
+EXPORT_TEXTAREA_LOCATOR = xpath("//textarea[contains(@class, 'form-control')]")
+
+def export_deck_list(driver, timer):
+    """
+    Open the Export modal on a loaded deck page and read the deck list from its text area.
+
+    Args:
+        driver: WebDriver showing a Moxfield deck page
+        timer: RunMetrics for the menu and modal waits
+
+    Returns:
+        Tuple of (deck list text or None, summary status describing the failure or None)
+    """
+    # Look for the "More" button and click it
+    try:
+        with timer.step("more_button"):
+            more_button = WebDriverWait(driver, 10, poll_frequency=POLL_INTERVAL).until(
+                EC.element_to_be_clickable((By.ID, "subheader-more"))
+            )
+        more_button.click()
+        print("Clicked on 'More' button")
+
+        # Wait for the dropdown's Export option to become visible
+        export_option = wait_for(driver, element_visible(EXPORT_OPTION_LOCATOR),
+                                 timeout=5, step="more_dropdown", timer=timer)
+        if not export_option:
+            print("Could not find 'Export' option in dropdown")
+            return None, "Failed - No Export option"
+
+        export_option.click()
+        print("Clicked on 'Export' option")
+
+        # Wait for the export modal's text area to be populated
+        try:
+            deck_list_text = wait_for(driver, value_non_empty(EXPORT_TEXTAREA_LOCATOR),
+                                      timeout=10, step="export_textarea", timer=timer)
+            failure = None
+            if not deck_list_text:
+                print("Text area was empty")
+                failure = "Failed - Empty text area"
+        except Exception as e:
+            print(f"Error extracting deck list text: {e}")
+            deck_list_text, failure = None, "Failed - Could not extract text"
+
+        # Close the modal if it's still open
+        try:
+            close_buttons = driver.find_elements(By.XPATH, "//button[contains(@class, 'btn-close')]")
+            if close_buttons:
+                close_buttons[0].click()
+                print("Closed the export modal")
+        except:
+            pass
+        return deck_list_text, failure
+
+    except Exception as e:
+        print(f"Error trying to export deck list: {e}")
+        return None, f"Failed - {str(e)}"
+
+def read_deck_list(driver, capture, deck_id, timer, wait=True):
+    """
+    Get the deck list from a loaded deck page.
+
+    The page fetches the deck JSON from the Moxfield API as it renders, so the
+    list is normally taken from that response through the network log, with no
+    menu clicks. The Export modal is only used if the response can't be read.
+
+    Args:
+        driver: WebDriver showing the deck page (switched to its tab)
+        capture: NetworkCapture for the driver
+        deck_id: Moxfield deck ID
+        timer: RunMetrics
+        wait: Whether to wait for the response to finish, or only look at what is logged already
+
+    Returns:
+        Tuple of (deck list text or None, failure status or None, captured deck JSON or None)
+    """
+    with timer.step("capture_json"):
+        deck_json = capture.take_json(deck_api_pattern(deck_id), timeout=3.0 if wait else 0.0)
+    if deck_json:
+        deck_list_text = render_deck_text(deck_json)
+        if deck_list_text.strip():
+            print("Captured deck JSON from the page's API request")
+            return deck_list_text, None, deck_json
+
+    deck_list_text, failure = export_deck_list(driver, timer)
+    return deck_list_text, failure, None
+
+def save_deck(store, output_file_path, deck_id, deck_list_text, deck_json=None, timer=None):
+    """
+    Store the deck as a snapshot (from its JSON when we have it) and hardlink the row's text file to it.
+
+    Returns:
+        The snapshot's content hash
+    """
+    if deck_json is not None:
+        record = deck_record_from_json(deck_json, deck_id)
+    else:
+        record = deck_record_from_text(deck_list_text, deck_id)
+    with timer.step("file_write") if timer else nullcontext():
+        snapshot, is_new = store.add(record, deck_list_text)
+        store.link(snapshot, output_file_path)
+    if timer:
+        timer.count("snapshots_new" if is_new else "snapshots_unchanged")
+    print(f"Saved deck list to: {output_file_path} ({'new' if is_new else 'unchanged'} snapshot {snapshot[:12]})")
+    return snapshot
 
 #todo: more elegantly handle invalid links - you should know when to give up if the content is Page Not Found
 
-def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists"):
+def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists", block_resources=True, recycle_after=200, direct_fetch=True,
+                      tabs=1, tab_interval=1.0, priority=DEFAULT_PRIORITY):
     # Create output directory if it doesn't exist
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -38,59 +156,46 @@ def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists")
         print("Error: CSV file does not contain a 'url' column.")
         return
 
-    # Create or load summary file
-    summary_file = os.path.join(output_dir, "deck_summary.csv")
+    # Fetch the most useful decks first, so an interrupted run still leaves them downloaded.
+    # Rows keep their index, so file names and the summary stay in CSV order.
+    df = prioritize(df, priority)
 
-    # Check for existing summary file to determine already processed decks
-    processed_urls = set()
-    if os.path.exists(summary_file):
-        try:
-            summary_df = pd.read_csv(summary_file)
-            # Extract URLs of successfully processed decks
-            successful_entries = summary_df[summary_df['Download Status'] == 'Success']
-            processed_urls = set(successful_entries['Deck URL'].tolist())
-            print(f"Found {len(processed_urls)} already successfully processed decks")
-        except Exception as e:
-            print(f"Error reading existing summary file: {e}")
-            # Create a new summary file if there was an error reading the existing one
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                f.write("Deck Title,Placement,Total Players,Wins,Losses,Draws,Deck URL,Deck ID,Download Status\n")
-    else:
-        # Create a new summary file if it doesn't exist
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write("Deck Title,Placement,Total Players,Wins,Losses,Draws,Deck URL,Deck ID,Download Status\n")
-
-    # Function to initialize the WebDriver
-    def init_driver():
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in headless mode (no GUI)
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-
-        try:
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-
-            # Apply stealth settings
-            stealth(driver,
-                    languages=["en-US", "en"],
-                    vendor="Google Inc.",
-                    platform="Win32",
-                    webgl_vendor="Intel Inc.",
-                    renderer="Intel Iris OpenGL Engine",
-                    fix_hairline=True,
-            )
-
-            # Additional anti-detection measures
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            print("WebDriver initialized with stealth settings")
-            return driver
-        except Exception as e:
-            print(f"Error initializing WebDriver: {e}")
-            return None
+    # The journal records each deck's status as it happens; deck_summary.csv is exported from it
+    summary_file = os.path.join(output_dir, "deck_summary.csv")
+    journal = JobJournal(os.path.join(output_dir, "deck_journal.sqlite3"))
+    # Structured decks (boards, quantities, printings) for the later stages
+    store = DeckStore(output_dir)
+    # Deck ID -> snapshot fetched this run; rows reusing a deck link to it instead of fetching again
+    snapshots = {}
+    imported = journal.import_summary_csv(summary_file, df['url'].items())
+    if imported:
+        print(f"Imported {imported} rows from the existing summary file into the journal")
+    print(f"Found {journal.count('Success')} already successfully processed decks")
+
+    # Function to apply stealth settings to each new WebDriver
+    def apply_stealth(driver):
+        stealth(driver,
+                languages=["en-US", "en"],
+                vendor="Google Inc.",
+                platform="Win32",
+                webgl_vendor="Intel Inc.",
+                renderer="Intel Iris OpenGL Engine",
+                fix_hairline=True,
+        )
+
+        # Additional anti-detection measures
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        print("WebDriver initialized with stealth settings")
+
+    # Warm browser sessions: attaches to the pipeline's browser pool service if one is running.
+    # Headless, with card art, fonts and analytics blocked.
+    pool = BrowserPool(
+        site='moxfield' if block_resources else None,
+        recycle_after=recycle_after,
+        extra_arguments=["--no-sandbox", "--disable-dev-shm-usage", "--disable-blink-features=AutomationControlled"],
+        experimental_options={"excludeSwitches": ["enable-automation"], "useAutomationExtension": False},
+        configure=apply_stealth,
+    )
 
     # Function to extract deck ID from URL
     def extract_deck_id(url):
@@ -100,10 +205,23 @@ def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists")
             return match.group(1)
         return None
 
-    # Initialize the WebDriver
-    driver = init_driver()
-    if not driver:
-        return
+    # Per-step latency histograms, HTTP status counts and bytes, saved as run_report.json at the end
+    timer = RunMetrics()
+    report_file = os.path.join(output_dir, "run_report.json")
+
+    def export_results():
+        journal.export_summary_csv(summary_file)
+        timer.write_report(report_file, script="2_moxfield_scrape", csv_file=csv_file_path, rows=len(df), tabs=tabs,
+                           statuses=journal.status_counts(), network=resource_stats.summary())
+
+    # The browser is only started if a direct API fetch fails
+    fetcher = DeckFetcher(metrics=timer) if direct_fetch else None
+    session = None
+    driver = None
+    capture = None
+    browser_jobs = []
+    queued_jobs = {}
+    resource_stats = ResourceStats()
 
     # Iterate through each URL in the DataFrame
     for index, row in df.iterrows():
@@ -125,16 +243,18 @@ def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists")
         filename = f"{index+1:03d}_{deck_id}"
         output_file_path = os.path.join(output_dir, f"{filename}.txt")
 
+        # Skip if already successfully processed
+        key = journal_key(url, index)
+        if journal.is_done(key):
+            print(f"Skipping already processed URL for entry {index+1}: {url}")
+            continue
+        journal.begin(key, url=url, row_index=index, deck_id=deck_id, title=title, placement=placement,
+                      players=players, wins=wins, losses=losses, draws=draws)
+
         # Skip if URL is not valid
         if url == "No link found" or not url.startswith('http'):
             print(f"Skipping invalid URL for entry {index+1}: {url}")
-            with open(summary_file, 'a', encoding='utf-8') as f:
-                f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Skipped - Invalid URL"\n')
-            continue
-
-        # Skip if already successfully processed
-        if url in processed_urls or os.path.exists(output_file_path):
-            print(f"Skipping already processed URL for entry {index+1}: {url}")
+            journal.finish(key, "Skipped - Invalid URL")
             continue
 
         print(f"\n{'='*80}")
@@ -143,173 +263,214 @@ def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists")
         print(f"Deck ID: {deck_id}")
         print(f"{'='*80}")
 
+        # The same deck is often registered for several tournaments - fetch it once per run
+        if deck_id in snapshots:
+            store.link(snapshots[deck_id], output_file_path)
+            timer.count("duplicates_linked")
+            print(f"Deck {deck_id} already fetched this run, linked snapshot {snapshots[deck_id][:12]}")
+            journal.finish(key, "Success", output_file=output_file_path, snapshot=snapshots[deck_id])
+            continue
+
+        # Try the Moxfield API first - no page load, no menu clicks
+        if fetcher is not None:
+            journal.attempt(key)
+            try:
+                with timer.step("direct_fetch"):
+                    deck_list_text, source, deck_json = fetcher.fetch_structured(deck_id)
+
+                snapshots[deck_id] = save_deck(store, output_file_path, deck_id, deck_list_text, deck_json, timer)
+                print(f"Fetched from the API ({source})")
+
+                journal.finish(key, "Success", output_file=output_file_path, snapshot=snapshots[deck_id])
+                continue
+            except DeckNotFound:
+                print(f"Skipping invalid deck url: {url}")
+                journal.finish(key, "Skipped - Page Not Found")
+                continue
+            except DeckFetchError as e:
+                print(f"Direct fetch failed ({e}), falling back to the browser")
+                journal.attempt(key, error=str(e))
+
+        # In multi-tab mode the browser pages are loaded together once the direct fetches are done
+        if tabs > 1:
+            if deck_id in queued_jobs:
+                # Same deck as a page that's already queued: take its result
+                queued_jobs[deck_id]['duplicates'].append((key, output_file_path))
+            else:
+                queued_jobs[deck_id] = {'url': url, 'key': key, 'deck_id': deck_id, 'output_file_path': output_file_path,
+                                        'duplicates': []}
+                browser_jobs.append(queued_jobs[deck_id])
+            continue
+
         max_retries = 3
         for retry in range(max_retries):
             try:
-                # Check if driver is still valid, reinitialize if needed
+                # Start the browser on first use, or reinitialize it if it stopped responding
                 try:
-                    # Simple test to see if driver is still responsive
-                    driver.title
-                except (WebDriverException, SessionNotCreatedException, InvalidSessionIdException):
-                    print("WebDriver session is invalid. Reinitializing...")
-                    try:
-                        driver.quit()
-                    except:
-                        pass
-                    driver = init_driver()
-                    if not driver:
-                        print("Failed to reinitialize WebDriver. Exiting.")
-                        return
+                    if session is None:
+                        session = pool.acquire()
+                    driver = session.ensure_healthy()
+                except Exception as e:
+                    print(f"Failed to initialize WebDriver: {e}. Exiting.")
+                    export_results()
+                    return
+
+                journal.attempt(key)
 
                 # Add a random delay to avoid being blocked
                 delay = random.uniform(2, 5)
                 print(f"Waiting {delay:.2f} seconds before request...")
                 time.sleep(delay)
+                timer.record("random_delay", delay)
 
                 # Load the page
                 print(f"Navigating to {url}...")
-                driver.get(url)
+                navigate_start = time.time()
+                with timer.step("navigate"):
+                    driver.get(url)
 
-                # Wait for content to load
+                # Wait for either the deck header or an error page, whichever renders first
                 print("Waiting for page content to load...")
-                try:
-                    # Check for error page elements
-                    error_element = driver.find_element(By.XPATH,
-                                                        "//*[contains(text(), 'Page Not Found') or contains(text(), 'does not exist on Moxfield') or contains(text(), 'This page is lost, but seeking.')]")
+                loaded = wait_for(driver, any_of(element_count_at_least(DECK_HEADER_LOCATOR, 1),
+                                                 element_count_at_least(ERROR_PAGE_LOCATOR, 1)),
+                                  timeout=10, step="page_content", timer=timer)
+                if loaded and loaded[0] == 1:
                     print(f"Skipping invalid deck url: {url}")
-                    with open(summary_file, 'a', encoding='utf-8') as f:
-                        f.write(
-                            f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Skipped - Page Not Found"\n')
+                    journal.finish(key, "Skipped - Page Not Found")
                     break
-                except:
-                    pass  # Proceed if no error elements found
-                try:
-                    # Wait up to 10 seconds for the deck name to appear
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "deckheader-name"))
-                    )
+                elif loaded:
                     print("Content loaded successfully!")
-                except Exception as e:
-                    print(f"Timeout waiting for content to load: {e}")
-                    # Try waiting a bit more
-                    time.sleep(3)
+                else:
+                    print("Timeout waiting for content to load")
 
-                # Look for the "More" button and click it
-                try:
-                    more_button = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.ID, "subheader-more"))
-                    )
-                    more_button.click()
-                    print("Clicked on 'More' button")
-                    time.sleep(1)  # Wait for dropdown to appear
-
-                    # Look for the Export option in the dropdown
-                    export_options = driver.find_elements(By.XPATH, "//a[contains(text(), 'Export')]")
-                    if export_options:
-                        export_options[0].click()
-                        print("Clicked on 'Export' option")
-                        time.sleep(1)  # Wait for the export modal to appear
-
-                        # Wait for the text area to be populated
-                        try:
-                            text_area = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, "//textarea[contains(@class, 'form-control')]"))
-                            )
-
-                            # Get the deck list text
-                            deck_list_text = text_area.get_attribute('value')
-
-                            if deck_list_text:
-                                # Save the text to a file
-                                with open(output_file_path, 'w', encoding='utf-8') as f:
-                                    f.write(deck_list_text)
-
-                                print(f"Saved deck list to: {output_file_path}")
-
-                                # Add to summary
-                                with open(summary_file, 'a', encoding='utf-8') as f:
-                                    f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Success"\n')
-
-                                # Add to processed URLs
-                                processed_urls.add(url)
-
-                                # Break out of retry loop on success
-                                break
-                            else:
-                                print("Text area was empty")
-                                if retry == max_retries - 1:  # Only write to summary on last retry
-                                    with open(summary_file, 'a', encoding='utf-8') as f:
-                                        f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Failed - Empty text area"\n')
-
-                        except Exception as e:
-                            print(f"Error extracting deck list text: {e}")
-                            if retry == max_retries - 1:  # Only write to summary on last retry
-                                with open(summary_file, 'a', encoding='utf-8') as f:
-                                    f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Failed - Could not extract text"\n')
-
-                        # Close the modal if it's still open
-                        try:
-                            close_buttons = driver.find_elements(By.XPATH, "//button[contains(@class, 'btn-close')]")
-                            if close_buttons:
-                                close_buttons[0].click()
-                                print("Closed the export modal")
-                        except:
-                            pass
-                    else:
-                        print("Could not find 'Export' option in dropdown")
-                        if retry == max_retries - 1:  # Only write to summary on last retry
-                            with open(summary_file, 'a', encoding='utf-8') as f:
-                                f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Failed - No Export option"\n')
+                if capture is None or capture.driver is not driver:
+                    capture = NetworkCapture(driver)
+                deck_list_text, failure, deck_json = read_deck_list(driver, capture, deck_id, timer, wait=bool(loaded))
+                resource_stats.collect(driver, time.time() - navigate_start, messages=capture.drain_messages())
 
-                except Exception as e:
-                    print(f"Error trying to export deck list: {e}")
-                    if retry == max_retries - 1:  # Only write to summary on last retry
-                        with open(summary_file, 'a', encoding='utf-8') as f:
-                            f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Failed - {str(e)}"\n')
+                if deck_list_text:
+                    snapshots[deck_id] = save_deck(store, output_file_path, deck_id, deck_list_text, deck_json, timer)
+                    journal.finish(key, "Success", output_file=output_file_path, snapshot=snapshots[deck_id])
+
+                    # Break out of retry loop on success
+                    break
+                elif retry == max_retries - 1:  # Only record the failure on the last retry
+                    journal.finish(key, failure)
 
                 print(f"\nFinished processing {url}")
 
             except (WebDriverException, SessionNotCreatedException, InvalidSessionIdException) as e:
                 print(f"WebDriver error on retry {retry+1}/{max_retries}: {e}")
-                try:
-                    driver.quit()
-                except:
-                    pass
 
                 # Reinitialize the driver
                 print("Reinitializing WebDriver...")
-                driver = init_driver()
-                if not driver:
-                    print("Failed to reinitialize WebDriver. Exiting.")
+                try:
+                    driver = session.restart()
+                except Exception as e:
+                    print(f"Failed to reinitialize WebDriver: {e}. Exiting.")
+                    export_results()
                     return
 
                 # Wait a bit longer before retrying
-                time.sleep(random.uniform(4, 8))
+                time.sleep(backoff_delay(retry, base=2.0))
 
-                if retry == max_retries - 1:  # Only write to summary on last retry
-                    with open(summary_file, 'a', encoding='utf-8') as f:
-                        f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Failed - WebDriver error"\n')
+                if retry == max_retries - 1:  # Only record the failure on the last retry
+                    journal.finish(key, "Failed - WebDriver error", error=str(e))
 
             except Exception as e:
                 print(f"Error processing URL {url} on retry {retry+1}/{max_retries}: {e}")
-                if retry == max_retries - 1:  # Only write to summary on last retry
-                    with open(summary_file, 'a', encoding='utf-8') as f:
-                        f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","Failed - General error"\n')
+                if retry == max_retries - 1:  # Only record the failure on the last retry
+                    journal.finish(key, "Failed - General error", error=str(e))
 
                 # Wait before retrying
-                time.sleep(random.uniform(4, 8))
-
-    # Close the WebDriver
-    try:
-        driver.quit()
-    except:
-        pass
+                time.sleep(backoff_delay(retry, base=2.0))
 
+        # Count the page against the session, recycling the browser when it's due
+        try:
+            driver = session.page_done()
+        except Exception as e:
+            print(f"Failed to recycle WebDriver: {e}. Exiting.")
+            export_results()
+            return
+
+    # Multi-tab mode: drive several tabs of one browser, harvesting whichever page is ready first
+    if browser_jobs:
+        finished_jobs = set()
+
+        def finish_job(job, status, snapshot=None, error=None):
+            finished_jobs.add(job['key'])
+            for job_key, output_file_path in [(job['key'], job['output_file_path'])] + job['duplicates']:
+                if snapshot is not None:
+                    store.link(snapshot, output_file_path)
+                    journal.finish(job_key, status, output_file=output_file_path, snapshot=snapshot)
+                else:
+                    journal.finish(job_key, status, error=error)
+
+        def harvest(driver, job, loaded, final_attempt):
+            journal.attempt(job['key'])
+            if loaded and loaded[0] == 1:
+                print(f"Skipping invalid deck url: {job['url']}")
+                finish_job(job, "Skipped - Page Not Found")
+                return True
+            if not loaded:
+                # The tab may still show the page it had before, so there is nothing safe to read from it
+                print(f"Timeout waiting for content to load: {job['url']}")
+                if final_attempt:
+                    finish_job(job, "Failed - Timeout waiting for content")
+                return False
+
+            nonlocal capture
+            if capture is None or capture.driver is not driver:
+                capture = NetworkCapture(driver)
+            deck_list_text, failure, deck_json = read_deck_list(driver, capture, job['deck_id'], timer)
+            resource_stats.collect(driver, messages=capture.drain_messages())
+
+            if deck_list_text:
+                snapshots[job['deck_id']] = save_deck(store, job['output_file_path'], job['deck_id'], deck_list_text, deck_json, timer)
+                finish_job(job, "Success", snapshots[job['deck_id']])
+                return True
+            if final_attempt:
+                finish_job(job, failure)
+            return False
+
+        page_loaded = any_of(element_count_at_least(DECK_HEADER_LOCATOR, 1),
+                             element_count_at_least(ERROR_PAGE_LOCATOR, 1))
+        print(f"\nLoading {len(browser_jobs)} deck pages in {tabs} tabs")
+        try:
+            if session is None:
+                session = pool.acquire()
+            # Recycle the browser between batches rather than under the open tabs
+            batch_size = recycle_after or len(browser_jobs)
+            for start in range(0, len(browser_jobs), batch_size):
+                batch = browser_jobs[start:start + batch_size]
+                driver = session.ensure_healthy()
+                run_in_tabs(driver, batch, page_loaded, harvest, tabs=tabs, timeout=10,
+                            navigate_interval=tab_interval, timer=timer)
+                for _ in batch:
+                    driver = session.page_done()
+        except WebDriverException as e:
+            print(f"Multi-tab scraping stopped by a WebDriver error: {e}")
+            for job in browser_jobs:
+                if job['key'] not in finished_jobs:
+                    finish_job(job, "Failed - WebDriver error", error=str(e))
+
+    # Release the WebDriver (a pool service's browser stays warm for the next stage)
+    if session is not None:
+        pool.release(session)
+    pool.close()
+
+    export_results()
+    journal.close()
+
+    timer.print_summary()
+    print(f"Network: {resource_stats.summary()}")
     print(f"\nScraping completed! Results saved to {output_dir} directory")
     print(f"Summary file created at: {summary_file}")
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        scrape_deck_pages(sys.argv[1])
-    else:
-        scrape_deck_pages()
+    parser = argparse.ArgumentParser(description="Download Moxfield deck lists, falling back to the browser")
+    parser.add_argument('csv_file', nargs='?', default="edh16_scrape.csv", help="CSV file containing deck information")
+    parser.add_argument('--tabs', type=int, default=1, help="Browser tabs to load deck pages in at once")
+    add_priority_argument(parser)
+    args = parser.parse_args()
+    scrape_deck_pages(args.csv_file, tabs=args.tabs, priority=args.priority)
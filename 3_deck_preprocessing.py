@@ -1,99 +1,353 @@
 import os
 import re
-import sys
-import glob
+import argparse
+import msgpack
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from deck_store import DeckStore, content_hash
+from deck_archive import ARCHIVE_SUFFIX, DeckArchiveWriter, open_decklists
 
-def preprocess_decklists(input_dir="deck_lists", output_dir="processed_decklists"):
+# Deck lists sent to a worker process at a time in parallel mode
+CHUNK_SIZE = 200
+
+MANIFEST_FILE = ".preprocess_manifest.msgpack"
+# Bump whenever parse_deck_text or expand_card_names change their output, so every deck is reprocessed
+PARSER_VERSION = 1
+
+def expand_card_names(entries, card_counts):
+    """
+    Turn (count, card name) entries into one name per copy.
+    For cards with multiple copies, create entries like card_name1, card_name2, etc.
+
+    Args:
+        entries: Iterable of (count, card_name) tuples
+        card_counts: Dictionary tracking how many copies of each card have been numbered so far
+
+    Returns:
+        List of card names
+    """
+    processed_cards = []
+    for count, card_name in entries:
+        # Add the card with numbered suffix for each copy
+        for i in range(count):
+            # Get the current count for this card
+            if count>1:
+                current_count = card_counts.get(card_name, 0) + 1
+                card_counts[card_name] = current_count
+
+                # Create the numbered card name
+                numbered_card_name = f"{card_name}{current_count}"
+            else:
+                numbered_card_name = card_name
+
+            processed_cards.append(numbered_card_name)
+    return processed_cards
+
+def parse_deck_text(deck_text, verbose=True):
+    """
+    Extract the card names from a text export, stopping at the sideboard or stickers section.
+
+    Args:
+        deck_text: The deck list text
+        verbose: Print the section a deck stops at and the lines that couldn't be parsed
+
+    Returns:
+        List of card names, numbered for cards with multiple copies
+    """
+    # Extract card entries
+    processed_cards = []
+    card_counts = {}  # Track how many of each card we've seen
+
+    # Split the text into lines and process each line
+    for line in deck_text.splitlines():
+        line = line.strip()
+
+        # Skip empty lines or comment lines
+        if not line or line.startswith('//') or line.startswith('#'):
+            continue
+
+        # Stop processing if we reach the sideboard or stickers section
+        if (line.upper().startswith("SIDEBOARD:") or line.upper() == "SIDEBOARD" or
+            line.upper().startswith("STICKERS:") or line.upper() == "STICKERS"):
+            if verbose:
+                print(f"  Reached {line} section, stopping processing")
+            break
+
+        # Try to match the card entry pattern: count + card name + (set) + other info
+        # Pattern: number at start, followed by card name, then (set code)
+        match = re.match(r'(\d+)\s+([^(]+)(?:\s+\([^)]+\).*)?$', line)
+
+        if match:
+            count = int(match.group(1))
+            card_name = match.group(2).strip()
+            processed_cards.extend(expand_card_names([(count, card_name)], card_counts))
+        else:
+            # Check if this might be a section header that's not sideboard or stickers
+            if verbose and not any(keyword in line.upper() for keyword in ["COMMANDER", "COMPANION", "MAINDECK"]):
+                print(f"  Warning: Could not parse line: {line}")
+
+    return processed_cards
+
+def parse_chunk(chunk):
+    """
+    Parse a chunk of deck texts in a worker process.
+
+    Args:
+        chunk: List of (snapshot, deck text) tuples
+
+    Returns:
+        List of (snapshot, card names, error message or None) tuples
+    """
+    results = []
+    for snapshot, deck_text in chunk:
+        try:
+            results.append((snapshot, parse_deck_text(deck_text, verbose=False), None))
+        except Exception as e:
+            results.append((snapshot, None, str(e)))
+    return results
+
+def preprocess_parallel(decklists, total, records, write_processed, workers, chunk_size=CHUNK_SIZE):
+    """
+    Parse deck texts across a pool of worker processes.
+
+    Each distinct deck text is parsed once, in chunks of chunk_size; the parent
+    converts deck store records itself and writes every chunk's results as it
+    comes back. Only a few chunks per worker are in flight, so the deck texts
+    aren't all held in memory at once.
+
+    Args:
+        decklists: Iterable of (name, deck text)
+        total: Number of deck lists, for the progress messages
+        records: Snapshot -> DeckRecord from the deck store
+        write_processed: Called as write_processed(name, snapshot, card names) for every deck list
+        workers: Number of worker processes
+        chunk_size: Deck texts per chunk
+
+    Returns:
+        Tuple of (deck lists written, deck lists that failed)
+    """
+    processed_snapshots = {}
+    waiting = defaultdict(list)  # snapshot -> names of the deck lists waiting for it to be parsed
+    written, failed = 0, 0
+
+    def collect(futures):
+        nonlocal written, failed
+        for future in futures:
+            for snapshot, processed_cards, error in future.result():
+                names = waiting.pop(snapshot)
+                if error is not None:
+                    print(f"  Error processing {', '.join(names)}: {error}")
+                    failed += len(names)
+                    continue
+                processed_snapshots[snapshot] = processed_cards
+                for name in names:
+                    write_processed(name, snapshot, processed_cards)
+                written += len(names)
+        print(f"  Processed {written + failed}/{total} deck lists")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        chunk = []
+        for name, deck_text in decklists:
+            snapshot = content_hash(deck_text)
+            if snapshot in processed_snapshots:
+                write_processed(name, snapshot, processed_snapshots[snapshot])
+                written += 1
+                continue
+            waiting[snapshot].append(name)
+            if len(waiting[snapshot]) > 1:
+                continue  # Already in a chunk
+
+            if snapshot in records:
+                # Typed records: no text to tokenize, so no need for a worker
+                processed_cards = expand_card_names(((card.quantity, card.name) for card in records[snapshot].main_deck()), {})
+                processed_snapshots[snapshot] = processed_cards
+                write_processed(name, snapshot, processed_cards)
+                waiting.pop(snapshot)
+                written += 1
+                continue
+
+            chunk.append((snapshot, deck_text))
+            if len(chunk) >= chunk_size:
+                in_flight.add(executor.submit(parse_chunk, chunk))
+                chunk = []
+                if len(in_flight) >= 2 * workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+        if chunk:
+            in_flight.add(executor.submit(parse_chunk, chunk))
+        collect(wait(in_flight).done)
+
+    return written, failed
+
+def load_manifest(output_dir, input_dir):
+    """
+    Read the manifest a previous run left in output_dir.
+
+    Returns:
+        Tuple of ({deck list name: [input signature, content hash]}, current), where
+        current is False if the manifest is missing, from another PARSER_VERSION or
+        for another input (its entries then only say which outputs exist)
+    """
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'rb') as f:
+            manifest = msgpack.unpackb(f.read(), raw=False)
+        files = manifest['files']
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}, False
+    current = manifest.get('parser_version') == PARSER_VERSION and manifest.get('input') == os.path.abspath(input_dir)
+    if not current:
+        print("The preprocessing manifest is from another parser version or input; reprocessing every deck")
+    return files, current
+
+def save_manifest(output_dir, input_dir, files):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(msgpack.packb({'parser_version': PARSER_VERSION, 'input': os.path.abspath(input_dir), 'files': files},
+                              use_bin_type=True))
+    os.replace(temp_path, path)
+
+def preprocess_decklists(input_dir="deck_lists", output_dir="processed_decklists", workers=1, full=False):
     """
     Preprocess deck list text files to extract just the card names.
     For cards with multiple copies, create entries like card_name1, card_name2, etc.
     Stop processing when reaching the sideboard or stickers section.
 
+    Decks in the stage 2 deck store are read from their structured records
+    (commanders and mainboard) instead of re-parsing the text; a snapshot shared
+    by several rows is only converted once.
+
+    Either side may be a packed archive (deck_archive.py) instead of a directory
+    of .txt files: input_dir is read through open_decklists, and an output_dir
+    ending in .pack is written as an archive.
+
+    With more than one worker, the texts are parsed in a process pool (see
+    preprocess_parallel) and progress is printed per chunk instead of per file.
+
+    Runs are incremental: a manifest in output_dir records each input's
+    signature (modification time and size, or archive position) and content
+    hash, plus PARSER_VERSION. Only new or changed deck lists are processed, and
+    outputs whose input is gone are deleted. Outputs edited or deleted by hand
+    aren't noticed; use full=True (--full) to rebuild everything.
+
     Args:
-        input_dir: Directory containing the raw deck list text files
-        output_dir: Directory where processed files will be saved
+        input_dir: Directory (or archive) containing the raw deck list text files
+        output_dir: Directory where processed files will be saved, or an archive path ending in .pack
+        workers: Worker processes to parse deck texts in; 1 parses them in this process
+        full: Reprocess every deck list, ignoring the manifest
     """
+    packed_output = output_dir.endswith(ARCHIVE_SUFFIX)
+
     # Create output directory if it doesn't exist
-    if not os.path.exists(output_dir):
+    if not packed_output and not os.path.exists(output_dir):
         os.makedirs(output_dir)
         print(f"Created output directory: {output_dir}")
 
-    # Get all text files in the input directory
-    deck_files = glob.glob(os.path.join(input_dir, "*.txt"))
-    print(f"Found {len(deck_files)} deck list files to process")
+    # All deck lists in the input directory or archive
+    decklists = open_decklists(input_dir)
+    print(f"Found {len(decklists)} deck list files to process")
 
-    # Process each deck file
-    for file_path in deck_files:
-        file_name = os.path.basename(file_path)
-        output_path = os.path.join(output_dir, file_name)
+    # Compare every input's signature with the manifest; only stat calls, no reads
+    previous, current = ({}, False) if full else load_manifest(output_dir, input_dir)
+    unchanged = previous if current else {}
+    files = {}  # The manifest for this run
+    pending = []  # (name, signature) of the deck lists to process
+    for name in decklists.names:
+        signature = decklists.signature(name)
+        entry = unchanged.get(name)
+        if entry and entry[0] == signature:
+            files[name] = entry
+        else:
+            pending.append((name, signature))
+    input_names = set(decklists.names)
+    removed = [name for name in previous if name not in input_names]
+    print(f"{len(pending)} new or changed deck lists, {len(files)} unchanged, {len(removed)} removed")
+    if not pending and not removed:
+        print(f"\nPreprocessing completed! {output_dir} is up to date")
+        return
 
-        print(f"Processing: {file_name}")
+    archive_writer = DeckArchiveWriter(output_dir) if packed_output else None
+    for name in removed:
+        if archive_writer is not None:
+            archive_writer.remove(name)
+        elif os.path.exists(os.path.join(output_dir, f"{name}.txt")):
+            os.remove(os.path.join(output_dir, f"{name}.txt"))
 
-        try:
-            # Read the deck list file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                deck_text = f.read()
+    # Structured records written by the downloader, if there are any
+    records = DeckStore(input_dir).load_snapshots() if pending else {}
+    if records:
+        print(f"Loaded {len(records)} deck snapshots from the deck store")
 
-            # Extract card entries
-            processed_cards = []
-            card_counts = {}  # Track how many of each card we've seen
+    signatures = dict(pending)
 
-            # Split the text into lines and process each line
-            for line in deck_text.splitlines():
-                line = line.strip()
+    def write_processed(name, snapshot, processed_cards):
+        # Write the processed cards to the output file (or archive)
+        if archive_writer is not None:
+            archive_writer.add(name, "".join(f"{card}\n" for card in processed_cards))
+        else:
+            with open(os.path.join(output_dir, f"{name}.txt"), 'w', encoding='utf-8') as f:
+                f.write("".join(f"{card}\n" for card in processed_cards))
+        files[name] = [signatures[name], snapshot]
 
-                # Skip empty lines or comment lines
-                if not line or line.startswith('//') or line.startswith('#'):
-                    continue
+    def pending_decklists():
+        # Stream the whole input when everything is pending, otherwise read just the pending deck lists
+        source = iter(decklists) if len(pending) == len(decklists) else ((name, decklists.read(name)) for name, _ in pending)
+        for name, deck_text in source:
+            entry = unchanged.get(name)
+            if entry and entry[1] == content_hash(deck_text):
+                # Touched but not changed: the output is still right
+                files[name] = [signatures[name], entry[1]]
+                continue
+            yield name, deck_text
+
+    if workers > 1 and len(pending) > 1:
+        print(f"Parsing in {workers} worker processes")
+        written, failed = preprocess_parallel(pending_decklists(), len(pending), records, write_processed, workers)
+        if archive_writer is not None:
+            archive_writer.close()
+        save_manifest(output_dir, input_dir, files)
+        print(f"\nPreprocessing completed! {written} processed files saved to {output_dir}"
+              + (f" ({failed} failed)" if failed else ""))
+        return
+
+    processed_snapshots = {}
+
+    # Process each new or changed deck file
+    for name, deck_text in pending_decklists():
+        file_name = f"{name}.txt"
+        output_path = os.path.join(output_dir, file_name)
+
+        print(f"Processing: {file_name}")
 
-                # Stop processing if we reach the sideboard or stickers section
-                if (line.upper().startswith("SIDEBOARD:") or line.upper() == "SIDEBOARD" or
-                    line.upper().startswith("STICKERS:") or line.upper() == "STICKERS"):
-                    print(f"  Reached {line} section, stopping processing")
-                    break
-
-                # Try to match the card entry pattern: count + card name + (set) + other info
-                # Pattern: number at start, followed by card name, then (set code)
-                match = re.match(r'(\d+)\s+([^(]+)(?:\s+\([^)]+\).*)?$', line)
-
-                if match:
-                    count = int(match.group(1))
-                    card_name = match.group(2).strip()
-
-                    # Add the card with numbered suffix for each copy
-                    for i in range(count):
-                        # Get the current count for this card
-                        if count>1:
-                            current_count = card_counts.get(card_name, 0) + 1
-                            card_counts[card_name] = current_count
-
-                            # Create the numbered card name
-                            numbered_card_name = f"{card_name}{current_count}"
-                        else:
-                            numbered_card_name = card_name
-
-                        processed_cards.append(numbered_card_name)
-                else:
-                    # Check if this might be a section header that's not sideboard or stickers
-                    if not any(keyword in line.upper() for keyword in ["COMMANDER", "COMPANION", "MAINDECK"]):
-                        print(f"  Warning: Could not parse line: {line}")
-
-            # Write the processed cards to the output file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                for card in processed_cards:
-                    f.write(f"{card}\n")
+        try:
+            snapshot = content_hash(deck_text)
+            if snapshot in processed_snapshots:
+                processed_cards = processed_snapshots[snapshot]
+            elif snapshot in records:
+                # Typed records: no text to tokenize
+                processed_cards = expand_card_names(((card.quantity, card.name) for card in records[snapshot].main_deck()), {})
+            else:
+                processed_cards = parse_deck_text(deck_text)
+            processed_snapshots[snapshot] = processed_cards
+            write_processed(name, snapshot, processed_cards)
 
             print(f"  Processed {len(processed_cards)} cards and saved to {output_path}")
 
         except Exception as e:
             print(f"  Error processing {file_name}: {e}")
 
+    if archive_writer is not None:
+        archive_writer.close()
+    save_manifest(output_dir, input_dir, files)
     print(f"\nPreprocessing completed! Processed files saved to {output_dir} directory")
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
-        preprocess_decklists(sys.argv[1], sys.argv[2])
-    elif len(sys.argv) > 1:
-        preprocess_decklists(sys.argv[1])
-    else:
-        preprocess_decklists()
+    parser = argparse.ArgumentParser(description="Reduce deck lists to one card name per line")
+    parser.add_argument('input_dir', nargs='?', default="deck_lists", help="Directory or archive of raw deck lists")
+    parser.add_argument('output_dir', nargs='?', default="processed_decklists", help="Output directory, or an archive path ending in .pack")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes to parse deck lists in (default: one per core; 1 to parse in this process)")
+    parser.add_argument('--full', action='store_true', help="Reprocess every deck list instead of only new or changed ones")
+    args = parser.parse_args()
+    preprocess_decklists(args.input_dir, args.output_dir, workers=args.workers, full=args.full)
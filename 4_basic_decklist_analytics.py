@@ -1,8 +1,8 @@
 import os
 import sys
-import glob
 import re
 from collections import Counter
+from deck_archive import ARCHIVE_SUFFIX, open_decklists
 
 def analyze_card_usage(input_dir="processed_decklists", output_file="tagged_cards.txt"):
     """
@@ -16,35 +16,33 @@ def analyze_card_usage(input_dir="processed_decklists", output_file="tagged_card
     and show the total count in the output.
 
     Args:
-        input_dir: Directory containing the processed deck list files
+        input_dir: Directory (or packed archive) containing the processed deck list files
         output_file: File where tagged cards will be saved
     """
     # Check if input directory exists
-    if not os.path.exists(input_dir):
+    if not os.path.exists(input_dir) and not os.path.exists(input_dir + ARCHIVE_SUFFIX):
         print(f"Error: Input directory '{input_dir}' does not exist")
         return
 
-    # Get all text files in the input directory
-    deck_files = glob.glob(os.path.join(input_dir, "*.txt"))
-    print(f"Found {len(deck_files)} processed deck list files to analyze")
+    # All deck lists in the input directory or archive
+    decklists = open_decklists(input_dir)
+    print(f"Found {len(decklists)} processed deck list files to analyze")
 
-    if not deck_files:
+    if not len(decklists):
         print("No deck files found to analyze.")
         return
 
     # Count cards across all decks
     card_counts = Counter()
-    total_decks = len(deck_files)
+    total_decks = len(decklists)
 
     # Process each deck file
-    for file_path in deck_files:
-        file_name = os.path.basename(file_path)
+    for name, deck_text in decklists:
+        file_name = f"{name}.txt"
         print(f"Analyzing: {file_name}")
 
         try:
-            # Read the deck list file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                cards = [line.strip() for line in f if line.strip()]
+            cards = [line.strip() for line in deck_text.splitlines() if line.strip()]
 
             #todo this doesn't work quite right at the moment
 
@@ -66,10 +64,9 @@ def analyze_card_usage(input_dir="processed_decklists", output_file="tagged_card
 
     # Count how many of each card appears in each deck
     card_quantities = {}
-    for file_path in deck_files:
+    for name, deck_text in decklists:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                cards = [line.strip() for line in f if line.strip()]
+            cards = [line.strip() for line in deck_text.splitlines() if line.strip()]
 
             # Count cards in this deck
             deck_card_counts = Counter()
@@ -83,7 +80,7 @@ def analyze_card_usage(input_dir="processed_decklists", output_file="tagged_card
                     card_quantities[card] = count
 
         except Exception as e:
-            print(f"  Error counting quantities in {os.path.basename(file_path)}: {e}")
+            print(f"  Error counting quantities in {name}.txt: {e}")
 
     # Calculate usage percentages and assign tags
     tagged_cards = []
@@ -4,6 +4,11 @@ import os
 import re
 import matplotlib.pyplot as plt
 from collections import defaultdict
+from deck_archive import ARCHIVE_SUFFIX, open_decklists
+
+PROCESSED_DECKLISTS = "processed_decklists"
+# Opened on first use by get_decklists
+_decklists = None
 
 def power_law_weight(win_rate, power=2, center=0.25):
     """
@@ -30,20 +35,25 @@ def extract_deck_id(url):
         print(f"Error extracting deck ID: {e}")
         return None
 
+def get_decklists():
+    """Open the processed deck lists (a directory of .txt files or a packed archive) on first use."""
+    global _decklists
+    if _decklists is None:
+        _decklists = open_decklists(PROCESSED_DECKLISTS)
+    return _decklists
+
 def find_decklist_file(deck_id):
-    """Find the decklist file that contains the deck ID in its name"""
+    """Find the decklist whose name contains the deck ID"""
     try:
-        processed_decklists_dir = "processed_decklists"
-
-        # Check if directory exists
-        if not os.path.isdir(processed_decklists_dir):
-            print(f"Warning: Directory {processed_decklists_dir} not found")
+        # Check if the deck lists exist
+        if not os.path.exists(PROCESSED_DECKLISTS) and not os.path.exists(PROCESSED_DECKLISTS + ARCHIVE_SUFFIX):
+            print(f"Warning: Directory {PROCESSED_DECKLISTS} not found")
             return None
 
-        # List all files in the directory
-        for filename in os.listdir(processed_decklists_dir):
-            if deck_id in filename:
-                return os.path.join(processed_decklists_dir, filename)
+        # The directory is listed (or the archive index read) once, not per deck
+        name = get_decklists().find(deck_id)
+        if name:
+            return name
 
         print(f"Warning: No decklist file found containing ID {deck_id}")
         return None
@@ -51,16 +61,15 @@ def find_decklist_file(deck_id):
         print(f"Error finding decklist file for {deck_id}: {e}")
         return None
 
-def read_decklist(filepath):
-    """Read the decklist file"""
+def read_decklist(name):
+    """Read the decklist"""
     try:
-        with open(filepath, 'r') as file:
-            return [line.strip() for line in file if line.strip()]
-    except FileNotFoundError:
-        print(f"Warning: Decklist file not found: {filepath}")
+        return [line.strip() for line in get_decklists().read(name).splitlines() if line.strip()]
+    except (FileNotFoundError, KeyError):
+        print(f"Warning: Decklist file not found: {name}")
         return []
     except Exception as e:
-        print(f"Error reading file {filepath}: {e}")
+        print(f"Error reading file {name}: {e}")
         return []
 
 def create_spice_tags(card_df, output_file="tagged_cards.txt"):
@@ -0,0 +1,184 @@
+import time
+import asyncio
+import aiohttp
+from collections import defaultdict
+from urllib.parse import urlparse
+from rate_control import AIMDController, HostGovernor, backoff_delay
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: allows `rate` requests per second on average,
+    with bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host, so each site gets its own requests-per-second budget."""
+
+    def __init__(self, requests_per_second, burst=1):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.buckets = {}
+
+    def bucket(self, url):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+        return self.buckets[host]
+
+    async def acquire(self, url):
+        await self.bucket(url).acquire()
+
+
+async def fetch_all(jobs, handle_result, concurrency=8, requests_per_second=2.0, burst=1, headers=None, timeout=30,
+                    initial_concurrency=2, max_retries=3, metrics=None, should_stop=None, max_requests_per_second=None):
+    """
+    GET every job's URL, adapting the requests in flight and the request rate to how the server responds.
+
+    Each host gets a HostGovernor with two AIMD controllers: one starts at
+    initial_concurrency requests in flight and grows towards `concurrency`, the
+    other sets the host's token bucket rate, starting at requests_per_second and
+    growing towards max_requests_per_second. Both grow while responses are fast
+    200s and halve on 429/5xx or rising latency. Retry-After is honoured, throttled
+    and failed requests are retried with backoff, and once the host's circuit
+    breaker opens the remaining jobs for it fail fast.
+
+    Args:
+        jobs: List of dictionaries, each with at least a 'url' key and optionally extra
+            request 'headers' (e.g. conditional request headers)
+        handle_result: Called as handle_result(job, result) as each request finishes, where
+            result has 'status' (None on a network error), 'text', 'headers', 'error',
+            'elapsed' and 'attempts'
+        concurrency: Upper bound on requests in flight per host
+        requests_per_second: Per-host request rate to start at
+        burst: Requests a host may receive back-to-back before pacing applies
+        headers: Headers sent with every request
+        timeout: Per-request timeout in seconds
+        initial_concurrency: Requests in flight per host before the controller adapts
+        max_retries: Retries for throttled, 5xx and network-error responses
+        metrics: Optional RunMetrics to record every attempt in
+        should_stop: Optional callable; once it returns True no new jobs are started, and
+            jobs not yet started are never passed to handle_result
+        max_requests_per_second: Per-host request rate ceiling (default: requests_per_second,
+            so the rate can only drop)
+
+    Returns:
+        Dictionary of host -> HostGovernor, for reporting the settled limits
+    """
+    limiter = HostRateLimiter(requests_per_second, burst)
+    max_requests_per_second = max(max_requests_per_second or requests_per_second, requests_per_second)
+    governors = {}
+    in_flight = defaultdict(int)
+    slot_available = asyncio.Condition()
+
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    def governor_for(host):
+        if host not in governors:
+            controller = AIMDController(initial=min(initial_concurrency, concurrency), maximum=concurrency)
+            rate_controller = AIMDController(initial=requests_per_second, minimum=min(0.1, requests_per_second),
+                                             maximum=max_requests_per_second, increase=0.2)
+            governors[host] = HostGovernor(controller=controller, rate_controller=rate_controller)
+        return governors[host]
+
+    async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=client_timeout) as session:
+        async def request(url, request_headers):
+            start_time = time.monotonic()
+            try:
+                async with session.get(url, headers=request_headers) as response:
+                    text = await response.text()
+                    result = {'status': response.status, 'text': text, 'error': None,
+                              'headers': response.headers.copy(),
+                              'retry_after': response.headers.get('Retry-After')}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result = {'status': None, 'text': '', 'error': str(e) or type(e).__name__,
+                          'headers': {}, 'retry_after': None}
+            result['elapsed'] = time.monotonic() - start_time
+            return result
+
+        async def worker():
+            while True:
+                if should_stop is not None and should_stop():
+                    return
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                host = urlparse(job['url']).netloc
+                governor = governor_for(host)
+
+                for attempt in range(max_retries + 1):
+                    if not governor.breaker.allow():
+                        result = {'status': None, 'text': '', 'error': "Circuit open - host appears down",
+                                  'headers': {}, 'retry_after': None, 'elapsed': 0.0}
+                        break
+
+                    pause = governor.pause_remaining()
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+
+                    # Wait for a slot under the host's current adaptive limit
+                    async with slot_available:
+                        await slot_available.wait_for(lambda: in_flight[host] < governor.controller.limit)
+                        in_flight[host] += 1
+                    try:
+                        limiter.bucket(job['url']).rate = governor.rate_controller.value
+                        await limiter.acquire(job['url'])
+                        result = await request(job['url'], job.get('headers'))
+                    finally:
+                        async with slot_available:
+                            in_flight[host] -= 1
+                            slot_available.notify_all()
+
+                    retry = governor.record(result['status'], result['elapsed'], result['retry_after'])
+                    if metrics is not None:
+                        metrics.record_request(job['url'], result['status'], result['elapsed'],
+                                               len(result['text'].encode('utf-8')), retry=retry and attempt < max_retries)
+                    if not retry or attempt == max_retries:
+                        break
+                    if not result['retry_after']:
+                        await asyncio.sleep(backoff_delay(attempt, base=0.5))
+
+                result['attempts'] = attempt + 1
+                handle_result(job, result)
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(jobs)) or 1)))
+
+    for host, governor in governors.items():
+        print(f"{host}: settled at {governor.controller.limit} requests in flight, "
+              f"{governor.rate_controller.value:.1f} requests/second, circuit {governor.breaker.state}")
+    return governors
+
+
+def download_all(jobs, handle_result, **kwargs):
+    """Blocking wrapper around fetch_all for use from scripts."""
+    return asyncio.run(fetch_all(jobs, handle_result, **kwargs))
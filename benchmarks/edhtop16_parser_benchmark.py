@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import argparse
+from lxml import etree, html as lxml_html
+
+# Add the parent directory to the path so we can import the parser module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from edhtop16_parser import ENTRY_XPATH, parse_edhtop16_html, parse_edhtop16_html_bs4
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', "Magda, Brazen Outlaw _ EDHTop 16.html")
+
+
+def build_synthetic_page(fixture_path, target_entries):
+    """
+    Replicate the deck entries of the saved Magda page until there are at least target_entries.
+
+    The entries are appended to the same parent container, so the rest of the page
+    (head, scripts, navigation) is kept as-is and the parsers see a realistic document.
+    """
+    with open(fixture_path, 'r', encoding='utf-8') as f:
+        tree = lxml_html.fromstring(f.read())
+
+    entries = ENTRY_XPATH(tree)
+    container = entries[0].getparent()
+    entry_html = [etree.tostring(entry, encoding='unicode') for entry in entries]
+
+    copies = 0
+    while len(entries) + copies < target_entries:
+        container.append(lxml_html.fragment_fromstring(entry_html[copies % len(entry_html)]))
+        copies += 1
+
+    return etree.tostring(tree, encoding='unicode', method='html')
+
+
+def time_parser(parse, page, repeats):
+    """Return the best wall-clock time over repeats runs, and the parsed result."""
+    best = None
+    result = None
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        result = parse(page)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lxml EDHTop16 parser against the BeautifulSoup path")
+    parser.add_argument('--entries', type=int, default=10000, help="Number of deck entries in the synthetic page")
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per parser (best time is reported)")
+    args = parser.parse_args()
+
+    page = build_synthetic_page(FIXTURE, args.entries)
+    print(f"Synthetic page: {len(page) / 1024 / 1024:.1f} MiB, {args.entries} entries")
+
+    lxml_time, lxml_result = time_parser(parse_edhtop16_html, page, args.repeats)
+    bs4_time, bs4_result = time_parser(parse_edhtop16_html_bs4, page, args.repeats)
+
+    if lxml_result != bs4_result:
+        print("Error: lxml and BeautifulSoup parsers disagree")
+        sys.exit(1)
+
+    entries = len(lxml_result['decks'])
+    print(f"{'parser':<16}{'seconds':>10}{'entries/s':>14}")
+    print(f"{'beautifulsoup':<16}{bs4_time:>10.3f}{entries / bs4_time:>14.0f}")
+    print(f"{'lxml':<16}{lxml_time:>10.3f}{entries / lxml_time:>14.0f}")
+    print(f"Speedup: {bs4_time / lxml_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
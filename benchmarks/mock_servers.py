@@ -0,0 +1,340 @@
+import os
+import re
+import sys
+import json
+import time
+import copy
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+# Add the parent directory to the path so we can import the scraper modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from edhtop16_api import NEXT_DATA_PATTERN, PAGE_SIZE
+from deck_fetcher import render_deck_text
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', "Magda, Brazen Outlaw _ EDHTop 16.html")
+
+DECK_PATH_PATTERN = re.compile(r'^/v[23]/decks/all/([^/]+)(/download)?$')
+COMMANDER_PATH_PATTERN = re.compile(r'^/commander/([^/]+)$')
+
+# Deck IDs with this prefix answer 404, like deleted or private decks
+MISSING_DECK_PREFIX = "gone"
+EXPORT_ID_PREFIX = "mock-export"
+
+CARD_POOL = [f"Synthetic Card {n}" for n in range(1, 401)]
+
+
+@dataclass
+class FaultConfig:
+    """
+    What the mock servers do to each request.
+
+    Args:
+        latency: Seconds added to every response
+        jitter: Up to this many extra seconds, drawn uniformly per request
+        error_rate: Fraction of requests answered with a 503
+        burst_every: Seconds between 429 bursts (0 turns bursts off)
+        burst_length: Seconds each burst lasts; every request in it gets a 429
+        retry_after: Retry-After value sent with each 429
+    """
+    latency: float = 0.05
+    jitter: float = 0.05
+    error_rate: float = 0.0
+    burst_every: float = 0.0
+    burst_length: float = 2.0
+    retry_after: int = 1
+
+
+def synthetic_deck_id(index, duplicate_rate=0.1, missing_rate=0.02):
+    """
+    Deck ID of the index-th synthetic entry.
+
+    Some entries reuse an earlier entry's deck, the way a player registers the
+    same list for several tournaments, and a few point at decks that are gone.
+    """
+    rng = random.Random(index)
+    roll = rng.random()
+    if index > 0 and roll < duplicate_rate:
+        return f"mock{rng.randrange(index):06d}"
+    if roll < duplicate_rate + missing_rate:
+        return f"{MISSING_DECK_PREFIX}{index:06d}"
+    return f"mock{index:06d}"
+
+
+def synthetic_deck_json(deck_id):
+    """A v2 deck document with Magda and 99 other cards, the same for every request of deck_id."""
+    rng = random.Random(deck_id)
+    mainboard = {name: {'quantity': 1, 'card': {'name': name, 'set': "mck", 'cn': str(CARD_POOL.index(name) + 1)}}
+                 for name in rng.sample(CARD_POOL, 70)}
+    mainboard["Mountain"] = {'quantity': 29, 'card': {'name': "Mountain", 'set': "unf", 'cn': "239"}}
+    return {
+        'id': deck_id,
+        'name': f"Mock Deck {deck_id}",
+        'format': "commander",
+        'lastUpdatedAtUtc': "2025-02-01T10:00:00Z",
+        'commanders': {"Magda, Brazen Outlaw": {'quantity': 1, 'card': {'name': "Magda, Brazen Outlaw", 'set': "eld", 'cn': "135"}}},
+        'mainboard': mainboard,
+        'sideboard': {},
+    }
+
+
+class MockState:
+    """
+    Synthetic data and request log shared by the handler threads.
+
+    Args:
+        faults: FaultConfig
+        entries: Entries listed for every commander
+        duplicate_rate: Fraction of entries reusing an earlier entry's deck
+        missing_rate: Fraction of entries whose deck answers 404
+        export_id_period: Seconds between export ID changes (0 to keep one ID); downloads
+            with any other export ID answer 404
+    """
+
+    def __init__(self, faults=None, entries=200, duplicate_rate=0.1, missing_rate=0.02, export_id_period=0.0):
+        self.faults = faults or FaultConfig()
+        self.entries = entries
+        self.duplicate_rate = duplicate_rate
+        self.missing_rate = missing_rate
+        self.export_id_period = export_id_period
+        self.start_time = time.monotonic()
+        self.lock = threading.Lock()
+        self.log = []
+
+        with open(FIXTURE, 'r', encoding='utf-8') as f:
+            self.page_template = f.read()
+        next_data = json.loads(NEXT_DATA_PATTERN.search(self.page_template).group(1))
+        self.next_data_template = next_data
+        self.edge_templates = next_data['props']['pageProps']['payload']['data']['commander']['entries']['edges']
+
+    def reset(self):
+        with self.lock:
+            self.log = []
+            self.start_time = time.monotonic()
+
+    def record(self, site, key, status, seconds):
+        with self.lock:
+            self.log.append((site, key, status, seconds))
+
+    def edge(self, index):
+        """The index-th entry, copied from the saved page's entries with a synthetic deck link."""
+        edge = copy.deepcopy(self.edge_templates[index % len(self.edge_templates)])
+        deck_id = synthetic_deck_id(index, self.duplicate_rate, self.missing_rate)
+        edge['node']['id'] = base64.b64encode(f"Entry:{index}".encode()).decode()
+        edge['node']['decklist'] = f"https://www.moxfield.com/decks/{deck_id}"
+        edge['cursor'] = base64.b64encode(f"OffsetConnection:{index}".encode()).decode()
+        return edge
+
+    def entries_page(self, cursor=None, count=PAGE_SIZE):
+        start = 0
+        if cursor:
+            start = int(base64.b64decode(cursor).decode().split(':')[1]) + 1
+        edges = [self.edge(index) for index in range(start, min(start + count, self.entries))]
+        page_info = {'endCursor': edges[-1]['cursor'] if edges else cursor,
+                     'hasNextPage': start + count < self.entries}
+        return {'edges': edges, 'pageInfo': page_info}
+
+    def commander_page(self, commander, variables):
+        """The saved Magda page with its __NEXT_DATA__ payload replaced by the first page of synthetic entries."""
+        next_data = copy.deepcopy(self.next_data_template)
+        page_props = next_data['props']['pageProps']
+        page_props['payload']['data']['commander']['name'] = commander
+        page_props['payload']['data']['commander']['entries'] = self.entries_page()
+        page_props['operationDescriptor']['request']['variables'] = variables
+        payload = json.dumps(next_data).replace('</', '<\\/')
+        match = NEXT_DATA_PATTERN.search(self.page_template)
+        return self.page_template[:match.start(1)] + payload + self.page_template[match.end(1):]
+
+    def export_id(self):
+        """The export ID the download endpoint currently accepts (and deck JSON reports)."""
+        if not self.export_id_period:
+            return f"{EXPORT_ID_PREFIX}-0"
+        return f"{EXPORT_ID_PREFIX}-{int((time.monotonic() - self.start_time) // self.export_id_period)}"
+
+    def injected_fault(self):
+        """Return (status, headers) for a throttled or failed request, or None to answer normally."""
+        faults = self.faults
+        if faults.burst_every and (time.monotonic() - self.start_time) % faults.burst_every < faults.burst_length:
+            return 429, {'Retry-After': str(faults.retry_after)}
+        if faults.error_rate and random.random() < faults.error_rate:
+            return 503, {}
+        return None
+
+    def summary(self):
+        """Request counts and latency percentiles per site, from the request log."""
+        with self.lock:
+            log = list(self.log)
+
+        report = {}
+        for site in sorted({entry[0] for entry in log}):
+            entries = [entry for entry in log if entry[0] == site]
+            seconds = sorted(entry[3] for entry in entries)
+            statuses = {}
+            for entry in entries:
+                statuses[entry[2]] = statuses.get(entry[2], 0) + 1
+            report[site] = {
+                'requests': len(entries),
+                'distinct': len({entry[1] for entry in entries}),
+                'statuses': statuses,
+                'p50_ms': seconds[int(0.50 * (len(seconds) - 1))] * 1000,
+                'p99_ms': seconds[int(0.99 * (len(seconds) - 1))] * 1000,
+            }
+        return report
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Serves EDHTop16 commander pages and GraphQL, and the Moxfield deck JSON and export endpoints."""
+
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, status, body=b"", content_type="text/plain", headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_request(self, site, key, answer):
+        """Delay, maybe inject a fault, otherwise call answer() for (status, body, content_type, headers)."""
+        start_time = time.monotonic()
+        faults = self.state.faults
+        time.sleep(faults.latency + random.uniform(0, faults.jitter))
+
+        fault = self.state.injected_fault()
+        if fault:
+            status, headers = fault
+            self.respond(status, b"Too Many Requests" if status == 429 else b"Service Unavailable", headers=headers)
+        else:
+            status, body, content_type, headers = answer()
+            self.respond(status, body, content_type, headers)
+        self.state.record(site, key, status, time.monotonic() - start_time)
+
+    def do_GET(self):
+        parsed_url = urlparse(self.path)
+
+        deck_match = DECK_PATH_PATTERN.match(parsed_url.path)
+        if deck_match:
+            self.handle_request('moxfield', self.path, lambda: self.deck_response(deck_match.group(1), bool(deck_match.group(2)),
+                                                                                 parse_qs(parsed_url.query)))
+            return
+
+        commander_match = COMMANDER_PATH_PATTERN.match(parsed_url.path)
+        if commander_match:
+            self.handle_request('edhtop16', self.path, lambda: self.commander_response(commander_match.group(1), parsed_url.query))
+            return
+
+        self.respond(404, b"Not Found")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if urlparse(self.path).path != '/api/graphql':
+            self.respond(404, b"Not Found")
+            return
+
+        variables = json.loads(body or b"{}").get('variables') or {}
+        key = f"graphql:{variables.get('commander')}:{variables.get('cursor')}"
+        self.handle_request('edhtop16', key, lambda: self.graphql_response(variables))
+
+    def deck_response(self, deck_id, download, params):
+        if deck_id.startswith(MISSING_DECK_PREFIX):
+            return 404, b'{"status": 404}', "application/json", {}
+        export_id = self.state.export_id()
+        if download and params.get('exportId', [None])[0] != export_id:
+            return 404, b'{"status": 404}', "application/json", {}
+
+        deck_json = dict(synthetic_deck_json(deck_id), exportId=export_id)
+        if download:
+            body, content_type = render_deck_text(deck_json).encode('utf-8'), "text/plain"
+        else:
+            body, content_type = json.dumps(deck_json).encode('utf-8'), "application/json"
+
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get('If-None-Match') == etag:
+            return 304, b"", content_type, {'ETag': etag}
+        return 200, body, content_type, {'ETag': etag}
+
+    def commander_response(self, commander, query):
+        params = parse_qs(query)
+        variables = {
+            'commander': unquote(commander),
+            'sortBy': params.get('sortBy', ['TOP'])[0],
+            'minEventSize': int(params.get('minEventSize', [60])[0]),
+            'maxStanding': None,
+            'timePeriod': params.get('timePeriod', ['SIX_MONTHS'])[0],
+        }
+        page = self.state.commander_page(variables['commander'], variables)
+        return 200, page.encode('utf-8'), "text/html; charset=utf-8", {}
+
+    def graphql_response(self, variables):
+        entries = self.state.entries_page(variables.get('cursor'), variables.get('count') or PAGE_SIZE)
+        body = {'data': {'commander': {'name': variables.get('commander'), 'entries': entries}}}
+        return 200, json.dumps(body).encode('utf-8'), "application/json", {}
+
+
+def start_mock_server(state, host="127.0.0.1", port=0):
+    """
+    Serve both sites from one local server in a background thread.
+
+    Returns:
+        Tuple of (server, base URL); point EDHTOP16_BASE_URL and MOXFIELD_API_BASE at the base URL
+    """
+    handler = type('BoundMockHandler', (MockHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_fault_arguments(parser):
+    """Command line options for FaultConfig and the synthetic data, shared with the benchmark harness."""
+    parser.add_argument('--entries', type=int, default=200, help="Entries listed per commander")
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help="Fraction of entries reusing an earlier deck")
+    parser.add_argument('--missing-rate', type=float, default=0.02, help="Fraction of entries whose deck is gone (404)")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Up to this many extra seconds per response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with a 503")
+    parser.add_argument('--burst-every', type=float, default=0.0, help="Seconds between 429 bursts (0 for none)")
+    parser.add_argument('--burst-length', type=float, default=2.0, help="Seconds each 429 burst lasts")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with each 429")
+    parser.add_argument('--export-id-period', type=float, default=0.0,
+                        help="Seconds between export ID changes, to exercise stale-ID recovery (0 for never)")
+
+
+def state_from_arguments(args):
+    faults = FaultConfig(args.latency, args.jitter, args.error_rate, args.burst_every, args.burst_length, args.retry_after)
+    return MockState(faults, args.entries, args.duplicate_rate, args.missing_rate, args.export_id_period)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic EDHTop16 and Moxfield endpoints locally")
+    parser.add_argument('--port', type=int, default=8080, help="Port to listen on")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    state = state_from_arguments(args)
+    server, base_url = start_mock_server(state, port=args.port)
+    print(f"Mock servers listening on {base_url}. Point the scrapers at them with:")
+    print(f"  export EDHTOP16_BASE_URL={base_url} MOXFIELD_API_BASE={base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(json.dumps(state.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
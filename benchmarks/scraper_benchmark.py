@@ -0,0 +1,153 @@
+import os
+import sys
+import csv
+import time
+import shutil
+import argparse
+import tempfile
+import importlib
+import subprocess
+
+# Add the parent directory to the path so we can import the scraper modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from edhtop16_api import entry_to_deck
+from mock_servers import add_fault_arguments, start_mock_server, state_from_arguments
+from browser_pool import find_chrome_binary
+
+# The stage 1 script's name isn't a valid identifier, so it can't be imported with a plain import statement
+stage1 = importlib.import_module('1_edh16_scrape')
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+COMMANDER = "Magda, Brazen Outlaw"
+
+# target -> (command line after the interpreter, site whose requests it makes)
+TARGETS = {
+    'stage1': (["1_edh16_scrape.py", "--http", "--batch", "commanders.txt", "--periods", "SIX_MONTHS",
+                "--output-dir", "edh16_scrapes"], 'edhtop16'),
+    'stage1-browser': (["1_edh16_scrape.py", "--batch", "commanders.txt", "--periods", "SIX_MONTHS",
+                        "--output-dir", "edh16_scrapes"], 'edhtop16'),
+    'stage2': (["2_moxfield_scrape.py", "decks.csv"], 'moxfield'),
+    'api': (["moxfield_api_scrape.py", "legacy_decks.csv", "--no-cache"], 'moxfield'),
+    'api-async': (["moxfield_api_scrape.py", "legacy_decks.csv", "--no-cache", "--async"], 'moxfield'),
+}
+# Targets that drive Chrome for every request; skipped when it isn't installed
+BROWSER_TARGETS = {'stage1-browser'}
+
+
+def chrome_available():
+    try:
+        find_chrome_binary()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def write_deck_csvs(state, work_dir):
+    """
+    Write the mock's synthetic entries as the scrapers' input: a stage 1 CSV (decks.csv)
+    and the older Title/Weblink layout moxfield_api_scrape.py reads (legacy_decks.csv).
+    """
+    decks = [entry_to_deck(state.edge(index)['node'], COMMANDER) for index in range(state.entries)]
+    decks = [deck for deck in decks if deck]
+    stage1.save_decks_csv(decks, os.path.join(work_dir, "decks.csv"))
+
+    with open(os.path.join(work_dir, "legacy_decks.csv"), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Title', 'Placement', 'Total Players', 'Wins', 'Losses', 'Draws', 'Weblink'])
+        for deck in decks:
+            writer.writerow([deck['name'], deck['placement'], deck['total_players'], deck['wins'],
+                             deck['losses'], deck['draws'], deck['url']])
+
+
+def count_results(target, work_dir):
+    """Entries (stage 1) or successfully fetched deck rows (the Moxfield scrapers) the run produced."""
+    if target.startswith('stage1'):
+        csv_file = os.path.join(work_dir, "edh16_scrapes", stage1.safe_filename(COMMANDER), "SIX_MONTHS.csv")
+    else:
+        csv_file = os.path.join(work_dir, "deck_lists", "deck_summary.csv")
+    if not os.path.exists(csv_file):
+        return 0
+
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    if target.startswith('stage1'):
+        return len(rows)
+    return sum(1 for row in rows if row.get('Download Status') == 'Success')
+
+
+def run_target(target, state, base_url, timeout, verbose):
+    """Run one scraper against the mock servers in a scratch directory and return its measurements."""
+    command, site = TARGETS[target]
+    work_dir = tempfile.mkdtemp(prefix=f"benchmark_{target}_")
+    try:
+        with open(os.path.join(work_dir, "commanders.txt"), 'w', encoding='utf-8') as f:
+            f.write(COMMANDER + "\n")
+        write_deck_csvs(state, work_dir)
+
+        env = dict(os.environ, EDHTOP16_BASE_URL=base_url, MOXFIELD_API_BASE=base_url, PYTHONUNBUFFERED="1",
+                   MOXFIELD_EXPORT_ID_FILE=os.path.join(work_dir, ".moxfield_export_id.json"))
+        state.reset()
+        start_time = time.perf_counter()
+        result = subprocess.run([sys.executable, os.path.join(PROJECT_ROOT, command[0])] + command[1:],
+                                cwd=work_dir, env=env, timeout=timeout,
+                                stdout=None if verbose else subprocess.DEVNULL,
+                                stderr=None if verbose else subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start_time
+
+        stats = state.summary().get(site, {'requests': 0, 'distinct': 0, 'statuses': {}, 'p50_ms': 0.0, 'p99_ms': 0.0})
+        statuses = stats['statuses']
+        return {
+            'target': target,
+            'exit_code': result.returncode,
+            'seconds': elapsed,
+            'results': count_results(target, work_dir),
+            'requests': stats['requests'],
+            'retries': stats['requests'] - stats['distinct'],
+            'throttled': statuses.get(429, 0),
+            'errors': sum(count for status, count in statuses.items() if status >= 500),
+            'p50_ms': stats['p50_ms'],
+            'p99_ms': stats['p99_ms'],
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against local mock EDHTop16 and Moxfield servers")
+    parser.add_argument('targets', nargs='*', default=list(TARGETS), help=f"Scrapers to run: {', '.join(TARGETS)} (default: all)")
+    parser.add_argument('--timeout', type=float, default=900, help="Seconds before a scraper run is abandoned")
+    parser.add_argument('--verbose', action='store_true', help="Show the scrapers' own output")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    unknown = [target for target in args.targets if target not in TARGETS]
+    if unknown:
+        parser.error(f"Unknown targets: {', '.join(unknown)}")
+
+    state = state_from_arguments(args)
+    server, base_url = start_mock_server(state)
+    print(f"Mock servers on {base_url}: {args.entries} entries, {state.faults}")
+    print("stage2 falls back to Chrome for decks the API won't serve; the mock has no deck pages, so keep error rates low for it")
+    print("stage1-browser sees only the saved page's rendered entries: the mock serves none of the site's scripts, so there's no Load More")
+
+    results = []
+    for target in args.targets:
+        if target in BROWSER_TARGETS and not chrome_available():
+            print(f"Skipping {target}: Chrome not found (set CHROME_BINARY)")
+            continue
+        print(f"Running {target}...")
+        results.append(run_target(target, state, base_url, args.timeout, args.verbose))
+    server.shutdown()
+
+    print(f"\n{'target':<15}{'exit':>5}{'seconds':>9}{'results':>9}{'per sec':>9}{'requests':>10}"
+          f"{'retries':>9}{'429s':>6}{'5xx':>6}{'p50 ms':>8}{'p99 ms':>8}")
+    for r in results:
+        rate = r['results'] / r['seconds'] if r['seconds'] else 0.0
+        print(f"{r['target']:<15}{r['exit_code']:>5}{r['seconds']:>9.1f}{r['results']:>9}{rate:>9.1f}{r['requests']:>10}"
+              f"{r['retries']:>9}{r['throttled']:>6}{r['errors']:>6}{r['p50_ms']:>8.0f}{r['p99_ms']:>8.0f}")
+    print("results: entries written (stage1) or deck rows fetched (the Moxfield scrapers)")
+    print("retries: requests beyond one per distinct URL; latency is measured at the mock server")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import signal
+import socket
+import tempfile
+import subprocess
+import urllib.request
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from browser_profile import build_chrome_options, enable_resource_blocking
+
+POOL_DIR = ".browser_pool"
+DRIVER_CACHE_FILE = os.path.join(POOL_DIR, "chromedriver.json")
+REGISTRY_ENV_VAR = "BROWSER_POOL_REGISTRY"
+DEFAULT_REGISTRY_FILE = os.path.join(POOL_DIR, "registry.json")
+
+# Resolved chromedriver path for this process
+_driver_path = None
+
+
+def get_chromedriver_path(max_age_hours=24):
+    """
+    Return the chromedriver binary path, resolving it with ChromeDriverManager at most once a day.
+
+    The path is cached in memory and in .browser_pool/chromedriver.json, so recreating
+    a driver or starting another pipeline stage doesn't repeat the version lookup.
+    """
+    global _driver_path
+    if _driver_path and os.path.exists(_driver_path):
+        return _driver_path
+
+    try:
+        with open(DRIVER_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if os.path.exists(cached['path']) and time.time() - cached['resolved_at'] < max_age_hours * 3600:
+            _driver_path = cached['path']
+            return _driver_path
+    except (OSError, ValueError, KeyError):
+        pass
+
+    _driver_path = ChromeDriverManager().install()
+    os.makedirs(POOL_DIR, exist_ok=True)
+    with open(DRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'path': _driver_path, 'resolved_at': time.time()}, f)
+    return _driver_path
+
+
+def find_chrome_binary():
+    """Locate the Chrome/Chromium executable, honouring the CHROME_BINARY environment variable."""
+    candidates = [os.environ.get('CHROME_BINARY'), 'google-chrome', 'google-chrome-stable',
+                  'chromium', 'chromium-browser', 'chrome']
+    for candidate in candidates:
+        if candidate and shutil.which(candidate):
+            return shutil.which(candidate)
+    raise FileNotFoundError("Could not find a Chrome binary; set CHROME_BINARY")
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def launch_chrome(port=None, timeout=20):
+    """
+    Start a headless Chrome that accepts WebDriver attachments on its DevTools port.
+
+    Returns:
+        Registry entry with the port, pid and profile directory of the browser
+    """
+    port = port or _free_port()
+    user_data_dir = tempfile.mkdtemp(prefix="browser_pool_")
+    process = subprocess.Popen([
+        find_chrome_binary(),
+        "--headless=new",
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={user_data_dir}",
+        "--window-size=1920,1080",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--disable-blink-features=AutomationControlled",
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # Wait until the DevTools endpoint answers
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1).read()
+            return {'port': port, 'pid': process.pid, 'user_data_dir': user_data_dir, 'pages': 0}
+        except OSError:
+            time.sleep(0.1)
+
+    process.kill()
+    raise RuntimeError(f"Chrome did not start listening on port {port}")
+
+
+def kill_chrome(entry):
+    """Stop a browser started by launch_chrome and remove its profile directory."""
+    try:
+        os.kill(entry['pid'], signal.SIGTERM)
+    except OSError:
+        pass
+    shutil.rmtree(entry['user_data_dir'], ignore_errors=True)
+
+
+def start_service(size=1, registry_file=DEFAULT_REGISTRY_FILE):
+    """Launch size warm browsers and record them in the registry file for other processes to attach to."""
+    get_chromedriver_path()
+    sessions = [launch_chrome() for _ in range(size)]
+    os.makedirs(os.path.dirname(registry_file) or '.', exist_ok=True)
+    with open(registry_file, 'w', encoding='utf-8') as f:
+        json.dump({'sessions': sessions}, f)
+    print(f"Browser pool started with {size} session(s), registry at {registry_file}")
+    return registry_file
+
+
+def stop_service(registry_file=DEFAULT_REGISTRY_FILE):
+    """Shut down every browser listed in the registry file and delete it."""
+    try:
+        with open(registry_file, 'r', encoding='utf-8') as f:
+            sessions = json.load(f)['sessions']
+    except (OSError, ValueError, KeyError):
+        return
+    for entry in sessions:
+        kill_chrome(entry)
+    os.remove(registry_file)
+    print(f"Browser pool stopped ({len(sessions)} session(s))")
+
+
+@contextmanager
+def serve(size=1, registry_file=DEFAULT_REGISTRY_FILE):
+    """
+    Keep a warm browser pool running for the duration of a with-block.
+
+    Child processes started inside the block find the pool through the
+    BROWSER_POOL_REGISTRY environment variable.
+    """
+    start_service(size, registry_file)
+    previous = os.environ.get(REGISTRY_ENV_VAR)
+    os.environ[REGISTRY_ENV_VAR] = os.path.abspath(registry_file)
+    try:
+        yield registry_file
+    finally:
+        if previous is None:
+            os.environ.pop(REGISTRY_ENV_VAR, None)
+        else:
+            os.environ[REGISTRY_ENV_VAR] = previous
+        stop_service(registry_file)
+
+
+class PooledSession:
+    """A browser session handed out by BrowserPool. Use .driver; call page_done() after each page."""
+
+    def __init__(self, pool, slot):
+        self.pool = pool
+        self.slot = slot
+        self.driver = None
+        self.pages = slot.get('pages', 0)
+
+    def start(self):
+        self.driver = self.pool._create_driver(self.slot)
+        return self.driver
+
+    def healthy(self):
+        try:
+            return self.driver is not None and self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def ensure_healthy(self):
+        """Replace the driver if it no longer responds. Returns the (possibly new) driver."""
+        if not self.healthy():
+            print("Browser session is unresponsive. Restarting...")
+            self.restart()
+        return self.driver
+
+    def page_done(self):
+        """Count a processed page, recycling the browser once it reaches the pool's limit."""
+        self.pages += 1
+        if self.pool.recycle_after and self.pages >= self.pool.recycle_after:
+            print(f"Recycling browser session after {self.pages} pages")
+            self.restart()
+        return self.driver
+
+    def restart(self):
+        self.pool._discard_driver(self.slot, self.driver, kill_browser=True)
+        self.pages = 0
+        return self.start()
+
+
+class BrowserPool:
+    """
+    Hands out warm Chrome sessions.
+
+    If a pool service is running (BROWSER_POOL_REGISTRY is set, see serve()),
+    sessions attach to its already running browsers, so no Chrome cold start is
+    paid. Otherwise the pool launches and keeps its own drivers for the life of
+    the process. When the service has fewer browsers than size, the remaining
+    sessions are launched locally, so size jobs can still run at once.
+
+    Args:
+        size: Number of sessions
+        site: browser_profile site profile used for resource blocking
+        recycle_after: Restart a session's browser after this many pages (0 to never)
+        extra_arguments: Additional Chrome command line arguments
+        experimental_options: Chrome experimental options; only applied to browsers the
+            pool launches itself, since chromedriver rejects them when attaching
+        configure: Optional callable run on every new driver (e.g. stealth settings)
+    """
+
+    def __init__(self, size=1, site=None, recycle_after=200, extra_arguments=None, experimental_options=None, configure=None):
+        self.site = site
+        self.recycle_after = recycle_after
+        self.extra_arguments = extra_arguments or []
+        self.experimental_options = experimental_options or {}
+        self.configure = configure
+        self.registry_file = os.environ.get(REGISTRY_ENV_VAR)
+
+        # Every entry is kept for _save_registry, including any beyond size that this pool doesn't use
+        self.registry_entries = []
+        if self.registry_file and os.path.exists(self.registry_file):
+            with open(self.registry_file, 'r', encoding='utf-8') as f:
+                self.registry_entries = json.load(f)['sessions']
+            print(f"Attaching to {min(size, len(self.registry_entries))} warm browser(s) from {self.registry_file}")
+        else:
+            self.registry_file = None
+        entries = self.registry_entries[:size]
+        entries += [{'pages': 0} for _ in range(size - len(entries))]
+
+        self.slots = queue.Queue()
+        for entry in entries:
+            self.slots.put(entry)
+        self.sessions = {}
+
+    @staticmethod
+    def attached(slot):
+        """True if the slot is a pool service browser rather than one this process launches."""
+        return 'port' in slot
+
+    def _create_driver(self, slot):
+        chrome_options = build_chrome_options(self.site)
+        for argument in self.extra_arguments:
+            chrome_options.add_argument(argument)
+        if self.attached(slot):
+            chrome_options.add_experimental_option("debuggerAddress", f"127.0.0.1:{slot['port']}")
+        else:
+            for name, value in self.experimental_options.items():
+                chrome_options.add_experimental_option(name, value)
+
+        driver = webdriver.Chrome(service=Service(get_chromedriver_path()), options=chrome_options)
+        if self.site:
+            enable_resource_blocking(driver, self.site)
+        if self.configure:
+            self.configure(driver)
+        return driver
+
+    def _discard_driver(self, slot, driver, kill_browser=False):
+        if driver is None:
+            return
+        if self.attached(slot):
+            # Stop our chromedriver without closing the shared browser
+            try:
+                driver.service.stop()
+            except Exception:
+                pass
+            if kill_browser:
+                # SIGTERM doesn't wait for the old browser to let go of its port, so the
+                # replacement gets a fresh one; the registry tells other processes
+                kill_chrome(slot)
+                slot.update(launch_chrome())
+                self._save_registry()
+        else:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def _save_registry(self):
+        if self.registry_file is None:
+            return
+        # Attached slots are the registry's own entry dictionaries, updated in place
+        with open(self.registry_file, 'w', encoding='utf-8') as f:
+            json.dump({'sessions': self.registry_entries}, f)
+
+    def acquire(self):
+        """Take a session from the pool, starting or health-checking its driver."""
+        slot = self.slots.get()
+        session = self.sessions.get(id(slot))
+        if session is None:
+            session = PooledSession(self, slot)
+            session.start()
+            self.sessions[id(slot)] = session
+        else:
+            session.ensure_healthy()
+        return session
+
+    def release(self, session):
+        session.slot['pages'] = session.pages
+        self._save_registry()
+        self.slots.put(session.slot)
+
+    @contextmanager
+    def session(self):
+        """with pool.session() as session: session.driver.get(...)"""
+        session = self.acquire()
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def close(self):
+        """Release every driver; attached browsers keep running for the next stage."""
+        for session in self.sessions.values():
+            self._discard_driver(session.slot, session.driver)
+            session.driver = None
+        self.sessions = {}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'start':
+        start_service(int(sys.argv[2]) if len(sys.argv) > 2 else 1)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'stop':
+        stop_service()
+    else:
+        print("Usage: python browser_pool.py start [size] | stop")
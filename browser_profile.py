@@ -0,0 +1,189 @@
+import sys
+import json
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+# URL patterns for each resource type we can do without while scraping
+RESOURCE_TYPE_PATTERNS = {
+    'image': ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    'font': ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    'media': ["*.mp4", "*.webm", "*.mp3", "*.ogg"],
+    'stylesheet': ["*.css"],
+}
+
+# Analytics, ads and other third-party hosts that never affect the data we read
+THIRD_PARTY_HOST_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*adservice.google.com*",
+    "*facebook.net*",
+    "*hotjar.com*",
+    "*sentry.io*",
+    "*nitropay.com*",
+    "*cloudflareinsights.com*",
+    "*quantserve.com*",
+    "*amazon-adsystem.com*",
+]
+
+# Per-site profiles. Stylesheets stay enabled by default because both scrapers
+# rely on is_displayed() checks, which need the page's layout.
+SITE_PROFILES = {
+    'edhtop16': {
+        'blocked_types': ['image', 'font', 'media'],
+        'blocked_hosts': THIRD_PARTY_HOST_PATTERNS,
+        'extra_patterns': [],
+    },
+    'moxfield': {
+        'blocked_types': ['image', 'font', 'media'],
+        'blocked_hosts': THIRD_PARTY_HOST_PATTERNS,
+        # Card art and symbols are served from the asset CDN whatever their extension
+        'extra_patterns': ["*assets.moxfield.net/cards/*", "*cards.scryfall.io*"],
+    },
+}
+
+
+def blocked_url_patterns(site):
+    """Return the list of URL patterns to block for a site profile (empty for unknown sites)."""
+    profile = SITE_PROFILES.get(site)
+    if not profile:
+        return []
+
+    patterns = []
+    for resource_type in profile['blocked_types']:
+        patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+    patterns.extend(profile['blocked_hosts'])
+    patterns.extend(profile['extra_patterns'])
+    return patterns
+
+
+def build_chrome_options(site=None, headless=True):
+    """
+    Base Chrome options for a scraping session.
+
+    Performance logging is switched on so ResourceStats can account for the bytes
+    each page transfers and the requests the profile blocked.
+
+    Args:
+        site: Name of a profile in SITE_PROFILES, or None for no blocking
+        headless: Run Chrome without a window
+
+    Returns:
+        selenium Options, ready for site-specific arguments to be added
+    """
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--window-size=1920,1080")
+    if site and 'image' in SITE_PROFILES.get(site, {}).get('blocked_types', []):
+        # Stop image decoding as well as the downloads
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return chrome_options
+
+
+def enable_resource_blocking(driver, site):
+    """
+    Block the site profile's resource types and third-party hosts through DevTools.
+
+    Returns:
+        Number of URL patterns installed
+    """
+    patterns = blocked_url_patterns(site)
+    if not patterns:
+        return 0
+
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    print(f"Blocking {len(patterns)} URL patterns for {site}")
+    return len(patterns)
+
+
+def read_performance_log(driver):
+    """Drain Chrome's performance log and return its DevTools messages (empty if logging is off)."""
+    try:
+        entries = driver.get_log('performance')
+    except WebDriverException:
+        return []  # performance logging wasn't enabled for this driver
+    return [json.loads(entry['message'])['message'] for entry in entries]
+
+
+class ResourceStats:
+    """Tallies transferred bytes and blocked requests from Chrome's performance log."""
+
+    def __init__(self):
+        self.pages = 0
+        self.requests = 0
+        self.bytes_transferred = 0
+        self.blocked_requests = 0
+        self.load_seconds = 0.0
+
+    def collect(self, driver, load_seconds=0.0, messages=None):
+        """
+        Add a page load to the totals.
+
+        Args:
+            driver: WebDriver whose performance log is drained when messages isn't given
+            load_seconds: How long the page took to load
+            messages: DevTools messages already read from the log (e.g. by NetworkCapture)
+        """
+        self.pages += 1
+        self.load_seconds += load_seconds
+        if messages is None:
+            messages = read_performance_log(driver)
+
+        for message in messages:
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.loadingFinished':
+                self.requests += 1
+                self.bytes_transferred += int(params.get('encodedDataLength', 0))
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                self.blocked_requests += 1
+
+    def summary(self):
+        return (f"{self.pages} pages, {self.requests} requests, "
+                f"{self.bytes_transferred / 1024 / 1024:.1f} MiB transferred, "
+                f"{self.blocked_requests} requests blocked, {self.load_seconds:.1f}s loading")
+
+
+def measure_savings(url, site):
+    """
+    Load a page once with the default profile and once with blocking, and report the difference.
+
+    Returns:
+        Dictionary with the bytes and seconds for both loads
+    """
+    results = {}
+    for label, blocking in (('unblocked', False), ('blocked', True)):
+        driver = webdriver.Chrome(options=build_chrome_options(site if blocking else None))
+        try:
+            if blocking:
+                enable_resource_blocking(driver, site)
+            else:
+                driver.execute_cdp_cmd('Network.enable', {})
+
+            stats = ResourceStats()
+            start_time = time.time()
+            driver.get(url)
+            stats.collect(driver, time.time() - start_time)
+            results[label] = {'bytes': stats.bytes_transferred, 'seconds': stats.load_seconds,
+                              'requests': stats.requests, 'blocked': stats.blocked_requests}
+            print(f"{label}: {stats.summary()}")
+        finally:
+            driver.quit()
+
+    saved_bytes = results['unblocked']['bytes'] - results['blocked']['bytes']
+    saved_seconds = results['unblocked']['seconds'] - results['blocked']['seconds']
+    print(f"Saved {saved_bytes / 1024 / 1024:.1f} MiB and {saved_seconds:.2f}s on {url}")
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        measure_savings(sys.argv[1], sys.argv[2])
+    else:
+        print("Usage: python browser_profile.py <url> <edhtop16|moxfield>")
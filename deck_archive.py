@@ -0,0 +1,251 @@
+import os
+import sys
+import glob
+import msgpack
+
+try:
+    import zstandard
+except ImportError:  # Only needed for packed archives
+    zstandard = None
+
+ARCHIVE_SUFFIX = ".pack"
+INDEX_FILE_NAME = "index.msgpack"
+SHARD_SIZE = 64 * 1024 * 1024  # Compressed bytes per shard before starting the next one
+COMPRESSION_LEVEL = 3
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("Packed deck archives need the zstandard package (pip install zstandard)")
+
+
+def deck_id_from_name(name):
+    """Deck ID of a deck list named like the scrapers' files: NNN_<deck id>."""
+    prefix, _, rest = name.partition('_')
+    return rest if prefix.isdigit() and rest else name
+
+
+def is_archive(path):
+    return os.path.isfile(os.path.join(path, INDEX_FILE_NAME))
+
+
+class DirectoryDeckLists:
+    """
+    Deck lists kept as one .txt file per deck (what every stage writes by default).
+
+    The directory is listed once, so lookups by deck ID don't rescan it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.names = sorted(os.path.splitext(os.path.basename(file_path))[0]
+                            for file_path in glob.glob(os.path.join(path, "*.txt")))
+
+    def __len__(self):
+        return len(self.names)
+
+    def read(self, name):
+        with open(os.path.join(self.path, f"{name}.txt"), 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def signature(self, name):
+        """Cheap change marker for a deck list (modification time and size), without reading it."""
+        stat = os.stat(os.path.join(self.path, f"{name}.txt"))
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def find(self, deck_id):
+        """Name of the first deck list whose file name contains deck_id, or None."""
+        for name in self.names:
+            if deck_id in name:
+                return name
+        return None
+
+    def __iter__(self):
+        """Yield (name, text) for every deck list."""
+        for name in self.names:
+            yield name, self.read(name)
+
+
+class PackedDeckLists:
+    """
+    Deck lists packed into zstd-compressed shards (see DeckArchiveWriter).
+
+    Each deck is its own zstd frame, so read() seeks straight to it through the
+    offset index, while iteration streams through each shard in order.
+    """
+
+    def __init__(self, path):
+        _require_zstandard()
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE_NAME), 'rb') as f:
+            index = msgpack.unpackb(f.read(), raw=False)
+        # name -> (deck_id, shard, offset, length), in the order the decks were added
+        self.index = {name: tuple(entry) for name, *entry in index['entries']}
+        self.names = list(self.index)
+        self.by_deck_id = {}
+        for name, (deck_id, _, _, _) in self.index.items():
+            self.by_deck_id.setdefault(deck_id, name)
+        self.decompressor = zstandard.ZstdDecompressor()
+
+    def __len__(self):
+        return len(self.names)
+
+    def shard_path(self, shard):
+        return os.path.join(self.path, f"shard-{shard:05d}.zst")
+
+    def read(self, name):
+        _, shard, offset, length = self.index[name]
+        with open(self.shard_path(shard), 'rb') as f:
+            f.seek(offset)
+            return self.decompressor.decompress(f.read(length)).decode('utf-8')
+
+    def signature(self, name):
+        """Cheap change marker for a deck list: where its frame is, which changes whenever it's rewritten."""
+        _, shard, offset, length = self.index[name]
+        return [shard, offset, length]
+
+    def find(self, deck_id):
+        """Name of a deck list for deck_id (exact match first, then by name like DirectoryDeckLists), or None."""
+        if deck_id in self.by_deck_id:
+            return self.by_deck_id[deck_id]
+        for name in self.names:
+            if deck_id in name:
+                return name
+        return None
+
+    def __iter__(self):
+        """Yield (name, text) for every deck list, reading each shard front to back once."""
+        entries = sorted(self.index.items(), key=lambda item: (item[1][1], item[1][2]))
+        shard, f = None, None
+        try:
+            for name, (_, entry_shard, offset, length) in entries:
+                if entry_shard != shard:
+                    if f:
+                        f.close()
+                    shard, f = entry_shard, open(self.shard_path(entry_shard), 'rb')
+                f.seek(offset)
+                yield name, self.decompressor.decompress(f.read(length)).decode('utf-8')
+        finally:
+            if f:
+                f.close()
+
+
+def open_decklists(path):
+    """
+    Open a directory of deck list .txt files or a packed archive for reading.
+
+    If path doesn't exist but path + ".pack" is an archive, the archive is opened,
+    so stages that default to e.g. "processed_decklists" pick up a packed copy.
+
+    Returns:
+        DirectoryDeckLists or PackedDeckLists; both offer len(), names, iteration
+        over (name, text), read(name), signature(name) and find(deck_id)
+    """
+    if is_archive(path):
+        return PackedDeckLists(path)
+    if not os.path.exists(path) and is_archive(path + ARCHIVE_SUFFIX):
+        return PackedDeckLists(path + ARCHIVE_SUFFIX)
+    return DirectoryDeckLists(path)
+
+
+class DeckArchiveWriter:
+    """
+    Writes deck lists into a packed archive: a directory of zstd shards plus an offset index.
+
+    Opening an existing archive appends to it; a deck added under a name that's
+    already present replaces it in the index. The index is written on close(), so
+    use the writer as a context manager.
+
+    Args:
+        path: Archive directory, conventionally ending in .pack
+        shard_size: Compressed bytes per shard before starting a new one
+        level: zstd compression level
+    """
+
+    def __init__(self, path, shard_size=SHARD_SIZE, level=COMPRESSION_LEVEL):
+        _require_zstandard()
+        self.path = path
+        self.shard_size = shard_size
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        os.makedirs(path, exist_ok=True)
+
+        self.entries = dict(PackedDeckLists(path).index) if is_archive(path) else {}
+        shards = glob.glob(os.path.join(path, "shard-*.zst"))
+        # Always start a fresh shard so existing shards are never rewritten
+        self.shard = max((int(os.path.basename(p)[6:11]) for p in shards), default=-1) + 1
+        self.file = None
+        self.offset = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _open_shard(self):
+        if self.file:
+            self.file.close()
+            self.shard += 1
+        self.file = open(os.path.join(self.path, f"shard-{self.shard:05d}.zst"), 'wb')
+        self.offset = 0
+
+    def add(self, name, text, deck_id=None):
+        """Compress one deck list into the current shard and index it under name."""
+        if self.file is None or self.offset >= self.shard_size:
+            self._open_shard()
+        frame = self.compressor.compress(text.encode('utf-8'))
+        self.file.write(frame)
+        self.entries[name] = (deck_id or deck_id_from_name(name), self.shard, self.offset, len(frame))
+        self.offset += len(frame)
+
+    def remove(self, name):
+        """Drop a deck list from the index (its frame stays in its shard until the archive is repacked)."""
+        self.entries.pop(name, None)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+        index_path = os.path.join(self.path, INDEX_FILE_NAME)
+        temp_path = index_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(msgpack.packb({'version': 1, 'entries': [[name, *entry] for name, entry in self.entries.items()]},
+                                  use_bin_type=True))
+        os.replace(temp_path, index_path)
+
+
+def pack_directory(input_dir, archive_path=None):
+    """
+    Pack every .txt deck list in input_dir into an archive (input_dir + ".pack" by default).
+
+    Returns:
+        The archive path
+    """
+    archive_path = archive_path or input_dir.rstrip(os.sep) + ARCHIVE_SUFFIX
+    decklists = DirectoryDeckLists(input_dir)
+    with DeckArchiveWriter(archive_path) as writer:
+        for name, text in decklists:
+            writer.add(name, text)
+    print(f"Packed {len(decklists)} deck lists from {input_dir} into {archive_path}")
+    return archive_path
+
+
+def unpack_archive(archive_path, output_dir):
+    """Write every deck list in an archive back out as output_dir/<name>.txt."""
+    os.makedirs(output_dir, exist_ok=True)
+    count = 0
+    for name, text in PackedDeckLists(archive_path):
+        with open(os.path.join(output_dir, f"{name}.txt"), 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        count += 1
+    print(f"Unpacked {count} deck lists from {archive_path} into {output_dir}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "pack":
+        pack_directory(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    elif len(sys.argv) == 4 and sys.argv[1] == "unpack":
+        unpack_archive(sys.argv[2], sys.argv[3])
+    else:
+        print("Usage: python deck_archive.py pack <deck list directory> [archive.pack]")
+        print("       python deck_archive.py unpack <archive.pack> <output directory>")
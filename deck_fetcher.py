@@ -0,0 +1,334 @@
+import os
+import re
+import json
+import time
+import tempfile
+from http_client import NETWORK_ERRORS, create_client
+from rate_control import AIMDController, CircuitOpenError, HostGovernor, governed_get
+
+# Overridable so the scrapers can be pointed at a local mock server (benchmarks/mock_servers.py)
+MOXFIELD_API_BASE = os.environ.get("MOXFIELD_API_BASE", "https://api.moxfield.com")
+DEFAULT_EXPORT_ID = "b8c9ef4b-34fe-4ed8-8d4d-9759552b7b3a"
+# Next to the scripts, so every run shares one cache whichever directory it's started from
+# (overridable so runs against the mock server don't replace the real ID)
+EXPORT_ID_FILE = os.environ.get("MOXFIELD_EXPORT_ID_FILE",
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), ".moxfield_export_id.json"))
+EXPORT_ID_TTL = 24 * 60 * 60  # Seconds a discovered export ID is reused before it's looked up again
+# Download 404s in a row, with no success between them, that make the export ID suspect
+NOT_FOUND_BURST = 5
+
+DECK_ID_PATTERN = re.compile(r'/decks/([a-zA-Z0-9_-]+)')
+
+# Boards that make up the 100 cards, in the order the text export lists them
+MAIN_BOARDS = ['commanders', 'mainboard']
+SIDE_BOARDS = ['companions', 'sideboard']
+
+
+class DeckFetchError(Exception):
+    """The direct fetch failed; status is the HTTP status code, or None for a network error."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class DeckNotFound(DeckFetchError):
+    """Moxfield says the deck doesn't exist (deleted, private, or a bad ID)."""
+
+
+def extract_deck_id(url):
+    """Extract the deck ID from a Moxfield deck URL, or None."""
+    match = DECK_ID_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    return None
+
+
+def create_session(http2=False, pool_maxsize=16):
+    """Pooled HTTP client (see http_client.create_client) with the headers the Moxfield API expects from a browser."""
+    return create_client({
+        'Accept': 'application/json, text/plain',
+        'Referer': 'https://www.moxfield.com/',
+        'Origin': 'https://www.moxfield.com'
+    }, http2=http2, pool_maxsize=pool_maxsize)
+
+
+def deck_json_url(deck_id):
+    return f"{MOXFIELD_API_BASE}/v2/decks/all/{deck_id}"
+
+
+def deck_download_url(deck_id, export_id):
+    return f"{MOXFIELD_API_BASE}/v2/decks/all/{deck_id}/download?exportId={export_id}&arenaOnly=false"
+
+
+def discover_export_id(get, deck_ids, attempts=3):
+    """
+    Read the current export ID from the JSON of the first of deck_ids that loads.
+
+    Every deck document carries the exportId the text download endpoint expects.
+
+    Args:
+        get: Called as get(url) to make a request, e.g. a governed_get wrapper
+        deck_ids: Deck IDs to try, in order
+        attempts: Most deck documents to request
+
+    Returns:
+        The export ID, or None if none of the decks tried had one
+    """
+    for deck_id in list(dict.fromkeys(deck_ids))[:attempts]:
+        try:
+            response = get(deck_json_url(deck_id))
+        except NETWORK_ERRORS + (CircuitOpenError,) as e:
+            print(f"Could not load {deck_id} to look up the export ID: {e}")
+            continue
+        if response.status_code != 200:
+            continue
+        try:
+            export_id = response.json().get('exportId')
+        except (ValueError, AttributeError):
+            continue
+        if export_id:
+            return export_id
+    return None
+
+
+class ExportIdCache:
+    """
+    The export ID for the text download endpoint, discovered from deck JSON and cached on disk.
+
+    A discovered ID is saved with the time it was found and trusted for `ttl`
+    seconds, so most runs don't look it up at all. When downloads fail in a burst
+    of 404s, refresh() looks it up again: a stale ID costs one lookup and a retry
+    of the failed downloads.
+
+    Args:
+        path: JSON file the ID is cached in (EXPORT_ID_FILE by default)
+        ttl: Seconds a discovered ID is trusted
+        export_id: ID to use instead of the cached one; it's treated as fresh for this run
+        max_refreshes: Lookups refresh() may make per run, so genuinely missing decks can't cause a loop
+    """
+
+    def __init__(self, path=None, ttl=EXPORT_ID_TTL, export_id=None, max_refreshes=2):
+        self.path = path or EXPORT_ID_FILE
+        self.ttl = ttl
+        self.max_refreshes = max_refreshes
+        self.refreshes = 0
+        self.export_id = None
+        self.discovered_at = 0.0
+        if export_id:
+            self.export_id, self.discovered_at = export_id, time.time()
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self.export_id, self.discovered_at = saved['export_id'], float(saved['discovered_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def is_fresh(self):
+        return bool(self.export_id) and time.time() - self.discovered_at < self.ttl
+
+    def update(self, export_id):
+        """Adopt a newly seen export ID and save it."""
+        if export_id != self.export_id:
+            print(f"Using Moxfield export ID {export_id}")
+        self.export_id, self.discovered_at = export_id, time.time()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'export_id': export_id, 'discovered_at': self.discovered_at}, f)
+        os.replace(temp_path, self.path)
+
+    def current(self, get, deck_ids):
+        """
+        The export ID to use, looked up from deck_ids' JSON if the cached one is missing or expired.
+
+        Falls back to the cached ID, then DEFAULT_EXPORT_ID, if the lookup fails.
+        """
+        if self.is_fresh():
+            return self.export_id
+        export_id = discover_export_id(get, deck_ids)
+        if export_id:
+            self.update(export_id)
+        elif not self.export_id:
+            print(f"Could not look up the export ID; using the default {DEFAULT_EXPORT_ID}")
+            self.export_id = DEFAULT_EXPORT_ID
+        return self.export_id
+
+    def can_refresh(self):
+        return self.refreshes < self.max_refreshes
+
+    def refresh(self, get, deck_ids):
+        """
+        Look the export ID up again after a burst of download 404s.
+
+        deck_ids should be the decks that failed: if their JSON loads, it has the
+        current ID; if it doesn't either, the decks are really gone.
+
+        Returns:
+            True if the export ID changed, so the failed downloads are worth retrying
+        """
+        if not self.can_refresh():
+            return False
+        self.refreshes += 1
+        previous = self.export_id
+        self.discovered_at = 0.0
+        print(f"{len(deck_ids)} downloads in a row returned 404; looking up the export ID again")
+        return self.current(get, deck_ids) != previous
+
+
+def deck_api_pattern(deck_id):
+    """Regex matching the deck JSON request the Moxfield deck page makes (v2 or v3 API) for deck_id."""
+    return re.compile(rf'/v[23]/decks/all/{re.escape(deck_id)}(?:\?|$)')
+
+
+def deck_board(deck_json, board_name):
+    """
+    Return a board's cards as {key: {'quantity': n, 'card': {...}}}.
+
+    v2 documents keep each board at the top level keyed by card name; v3
+    documents (what the deck page itself loads) nest them under boards.<name>.cards.
+    """
+    if 'boards' in deck_json:
+        return ((deck_json['boards'] or {}).get(board_name) or {}).get('cards') or {}
+    return deck_json.get(board_name) or {}
+
+
+def render_deck_text(deck_json):
+    """
+    Render a v2 or v3 deck JSON document in the same layout as Moxfield's text
+    export: "1 Card Name (SET) 123" lines for the commanders and mainboard, then
+    a SIDEBOARD: section.
+    """
+    def board_lines(board_name):
+        board = deck_board(deck_json, board_name)
+        lines = []
+        for name, entry in sorted(board.items(), key=lambda item: (item[1].get('card') or {}).get('name', item[0])):
+            card = entry.get('card') or {}
+            line = f"{entry.get('quantity', 1)} {card.get('name', name)}"
+            if card.get('set'):
+                line += f" ({card['set'].upper()}) {card.get('cn', '')}".rstrip()
+            lines.append(line)
+        return lines
+
+    lines = []
+    for board_name in MAIN_BOARDS:
+        lines.extend(board_lines(board_name))
+
+    side_lines = []
+    for board_name in SIDE_BOARDS:
+        side_lines.extend(board_lines(board_name))
+    if side_lines:
+        lines.append("")
+        lines.append("SIDEBOARD:")
+        lines.extend(side_lines)
+
+    return "\n".join(lines) + "\n"
+
+
+class DeckFetcher:
+    """
+    Fetches a deck's text export straight from the Moxfield API.
+
+    Tries the text download endpoint first (byte-for-byte what the Export modal
+    shows), then the deck JSON rendered to the same format. Callers fall back
+    to the browser only when both fail.
+
+    Requests are paced by an AIMD rate controller: the rate creeps up while the
+    API answers quickly and halves on 429/5xx, Retry-After is honoured, and a
+    circuit breaker stops requests while the API is down.
+
+    Args:
+        session: HTTP client to reuse, a requests.Session or httpx.Client (one is created if omitted)
+        export_id: Export ID for the download endpoint; by default the cached one (see ExportIdCache).
+            Deck JSON fetched along the way updates it if the cached ID has gone stale.
+        requests_per_second: Starting request rate
+        max_requests_per_second: Ceiling the rate controller may grow to
+        timeout: Per-request timeout in seconds
+        metrics: Optional RunMetrics to record every request in
+    """
+
+    def __init__(self, session=None, export_id=None, requests_per_second=2.0, max_requests_per_second=5.0, timeout=15,
+                 metrics=None):
+        self.session = session or create_session()
+        self.export_ids = ExportIdCache(export_id=export_id)
+        self.export_id = self.export_ids.export_id or DEFAULT_EXPORT_ID
+        self.timeout = timeout
+        self.metrics = metrics
+        self.governor = HostGovernor(AIMDController(initial=requests_per_second, minimum=0.2,
+                                                    maximum=max_requests_per_second, increase=0.5))
+
+    def _get(self, url):
+        try:
+            return governed_get(self.session, url, self.governor, timeout=self.timeout, metrics=self.metrics)
+        except NETWORK_ERRORS + (CircuitOpenError,) as e:
+            raise DeckFetchError(f"Request failed: {e}")
+
+    def fetch(self, deck_id):
+        """
+        Returns:
+            Tuple of (deck list text, source) where source is 'download' or 'json'
+
+        Raises:
+            DeckNotFound if the deck doesn't exist, DeckFetchError for anything else
+        """
+        if self.export_id:
+            response = self._get(deck_download_url(deck_id, self.export_id))
+            if response.status_code == 200 and response.text.strip():
+                return response.text, 'download'
+
+        deck_json = self.fetch_json(deck_id)
+        return self._render(deck_json), 'json'
+
+    def fetch_json(self, deck_id):
+        """
+        Returns:
+            The deck's JSON document
+
+        Raises:
+            DeckNotFound if the deck doesn't exist, DeckFetchError for anything else
+        """
+        response = self._get(deck_json_url(deck_id))
+        if response.status_code == 404:
+            raise DeckNotFound(f"Deck {deck_id} not found", status=404)
+        if response.status_code != 200:
+            raise DeckFetchError(f"API status {response.status_code}", status=response.status_code)
+
+        try:
+            deck_json = response.json()
+        except ValueError as e:
+            raise DeckFetchError(f"Invalid deck JSON: {e}", status=response.status_code)
+
+        # The document carries the current export ID, so a stale one is replaced by the first deck fetched this way
+        export_id = deck_json.get('exportId') if isinstance(deck_json, dict) else None
+        if export_id and export_id != self.export_id:
+            self.export_ids.update(export_id)
+            self.export_id = export_id
+        return deck_json
+
+    def fetch_structured(self, deck_id):
+        """
+        Like fetch, but asks for the deck JSON first so the structured deck comes with the text.
+
+        Returns:
+            Tuple of (deck list text, source, deck JSON or None if only the text download worked)
+        """
+        try:
+            deck_json = self.fetch_json(deck_id)
+            return self._render(deck_json), 'json', deck_json
+        except DeckNotFound:
+            raise
+        except DeckFetchError as e:
+            if not self.export_id:
+                raise
+            response = self._get(deck_download_url(deck_id, self.export_id))
+            if response.status_code == 200 and response.text.strip():
+                return response.text, 'download', None
+            raise e
+
+    @staticmethod
+    def _render(deck_json):
+        deck_text = render_deck_text(deck_json)
+        if not deck_text.strip():
+            raise DeckFetchError("Deck JSON has no cards", status=200)
+        return deck_text
@@ -0,0 +1,207 @@
+import os
+import re
+import shutil
+import hashlib
+import msgpack
+from dataclasses import dataclass, field
+from deck_fetcher import MAIN_BOARDS, SIDE_BOARDS, deck_board
+
+STORE_FILE_NAME = "deck_store.msgpack"
+SNAPSHOT_DIR_NAME = "snapshots"
+
+# "1 Card Name (SET) 123" lines from the text export
+TEXT_CARD_PATTERN = re.compile(r'(\d+)\s+([^(]+?)\s*(?:\(([^)]+)\)\s*(\S+)?.*)?$')
+
+
+@dataclass
+class DeckCard:
+    board: str
+    quantity: int
+    name: str
+    set_code: str = ""
+    collector_number: str = ""
+    card_id: str = ""
+
+    def to_row(self):
+        return [self.board, self.quantity, self.name, self.set_code, self.collector_number, self.card_id]
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+
+@dataclass
+class DeckRecord:
+    deck_id: str
+    name: str = ""
+    format: str = ""
+    last_updated: str = ""
+    source: str = ""
+    cards: list = field(default_factory=list)
+    content_hash: str = ""
+
+    def board(self, *boards):
+        """Cards in the given boards, in stored order."""
+        return [card for card in self.cards if card.board in boards]
+
+    def main_deck(self):
+        """Commanders and mainboard - the cards the preprocessing stage keeps."""
+        return self.board(*MAIN_BOARDS)
+
+    def to_dict(self):
+        return {'deck_id': self.deck_id, 'name': self.name, 'format': self.format,
+                'last_updated': self.last_updated, 'source': self.source,
+                'cards': [card.to_row() for card in self.cards], 'content_hash': self.content_hash}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['deck_id'], data.get('name', ""), data.get('format', ""), data.get('last_updated', ""),
+                   data.get('source', ""), [DeckCard.from_row(row) for row in data.get('cards', [])],
+                   data.get('content_hash', ""))
+
+
+def content_hash(deck_text):
+    """Snapshot ID of a deck list: the sha256 of its text."""
+    return hashlib.sha256(deck_text.encode('utf-8')).hexdigest()
+
+
+def link_or_copy(source, destination):
+    """Hardlink destination to source (replacing any existing file), copying where links aren't supported."""
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def deck_record_from_json(deck_json, deck_id, source="json"):
+    """Build a DeckRecord from a Moxfield v2 or v3 deck JSON document."""
+    cards = []
+    for board_name in MAIN_BOARDS + SIDE_BOARDS:
+        board = deck_board(deck_json, board_name)
+        for key, entry in sorted(board.items(), key=lambda item: (item[1].get('card') or {}).get('name', item[0])):
+            card = entry.get('card') or {}
+            cards.append(DeckCard(board_name, int(entry.get('quantity', 1)), card.get('name', key),
+                                  (card.get('set') or "").upper(), str(card.get('cn') or ""),
+                                  card.get('scryfall_id') or card.get('id') or ""))
+    return DeckRecord(deck_id, deck_json.get('name', ""), deck_json.get('format', ""),
+                      deck_json.get('lastUpdatedAtUtc', ""), source, cards)
+
+
+def deck_record_from_text(deck_text, deck_id, source="text"):
+    """
+    Build a DeckRecord from a text export, for decks that only came back as text.
+
+    Everything before SIDEBOARD: is counted as mainboard, since the export doesn't
+    mark commanders separately; card IDs are left empty.
+    """
+    cards = []
+    board_name = 'mainboard'
+    for line in deck_text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('//') or line.startswith('#'):
+            continue
+        if line.upper().rstrip(':') == "SIDEBOARD":
+            board_name = 'sideboard'
+            continue
+        if line.upper().rstrip(':') == "STICKERS":
+            break
+
+        match = TEXT_CARD_PATTERN.match(line)
+        if match:
+            cards.append(DeckCard(board_name, int(match.group(1)), match.group(2).strip(),
+                                  match.group(3) or "", match.group(4) or ""))
+    return DeckRecord(deck_id, source=source, cards=cards)
+
+
+class DeckStore:
+    """
+    Append-only msgpack file of DeckRecords, one per distinct deck snapshot.
+
+    A snapshot is one version of a deck's contents, identified by the sha256 of its
+    text, which is kept once under snapshots/<hash>.txt. A deck ID that shows up
+    in many tournament rows is stored once per version, and each row's text file
+    is a hardlink to its snapshot. Appending keeps writes cheap and crash-safe (a
+    torn final record is ignored on load); the latest record per deck ID wins.
+
+    Args:
+        path: Store file, or a directory to keep deck_store.msgpack in
+    """
+
+    def __init__(self, path):
+        if os.path.isdir(path):
+            path = os.path.join(path, STORE_FILE_NAME)
+        self.path = path
+        self.snapshot_dir = os.path.join(os.path.dirname(path), SNAPSHOT_DIR_NAME)
+        self._latest = None
+
+    def snapshot_path(self, snapshot):
+        return os.path.join(self.snapshot_dir, f"{snapshot}.txt")
+
+    def latest(self, deck_id):
+        """The most recent record stored for deck_id, or None."""
+        if self._latest is None:
+            self._latest = self.load()
+        return self._latest.get(deck_id)
+
+    def add(self, record, deck_text):
+        """
+        Store a downloaded deck unless this version of it is already stored.
+
+        A record whose lastUpdated matches the stored one is taken to be the same
+        version without comparing contents.
+
+        Returns:
+            Tuple of (snapshot hash, True if this was a new snapshot)
+        """
+        previous = self.latest(record.deck_id)
+        if (previous is not None and previous.content_hash and record.last_updated
+                and record.last_updated == previous.last_updated
+                and os.path.exists(self.snapshot_path(previous.content_hash))):
+            return previous.content_hash, False
+
+        record.content_hash = content_hash(deck_text)
+        snapshot_path = self.snapshot_path(record.content_hash)
+        if not os.path.exists(snapshot_path):
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            temp_path = snapshot_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(deck_text)
+            os.replace(temp_path, snapshot_path)
+
+        if previous is not None and previous.content_hash == record.content_hash:
+            return record.content_hash, False
+        self.append(record)
+        self._latest[record.deck_id] = record
+        return record.content_hash, True
+
+    def link(self, snapshot, output_file_path):
+        """Make output_file_path a hardlink to the snapshot's text."""
+        link_or_copy(self.snapshot_path(snapshot), output_file_path)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def append(self, record):
+        with open(self.path, 'ab') as f:
+            f.write(msgpack.packb(record.to_dict(), use_bin_type=True))
+
+    def __iter__(self):
+        if not self.exists():
+            return
+        with open(self.path, 'rb') as f:
+            unpacker = msgpack.Unpacker(f, raw=False)
+            try:
+                for data in unpacker:
+                    yield DeckRecord.from_dict(data)
+            except (msgpack.OutOfData, ValueError) as e:
+                print(f"Ignoring a truncated record at the end of {self.path}: {e}")
+
+    def load(self):
+        """Return {deck_id: DeckRecord} with the latest record for each deck."""
+        return {record.deck_id: record for record in self}
+
+    def load_snapshots(self):
+        """Return {snapshot hash: DeckRecord} for every stored snapshot."""
+        return {record.content_hash: record for record in self if record.content_hash}
@@ -0,0 +1,362 @@
+import os
+import re
+import json
+import time
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs, quote, unquote, urlencode
+from http_client import create_session
+from run_metrics import RunMetrics
+
+# Overridable so the scrapers can be pointed at a local mock server (benchmarks/mock_servers.py)
+EDHTOP16_BASE_URL = os.environ.get("EDHTOP16_BASE_URL", "https://edhtop16.com")
+GRAPHQL_URL = f"{EDHTOP16_BASE_URL}/api/graphql"
+
+# The site pages through entries 48 at a time, same as the "Load More" button
+PAGE_SIZE = 48
+
+# Values of the site's TimePeriod filter
+TIME_PERIODS = ['ONE_MONTH', 'THREE_MONTHS', 'SIX_MONTHS', 'ONE_YEAR', 'ALL_TIME', 'POST_BAN']
+
+ENTRIES_QUERY = """
+query CommanderEntries(
+  $commander: String!
+  $sortBy: EntriesSortBy!
+  $minEventSize: Int!
+  $maxStanding: Int
+  $timePeriod: TimePeriod!
+  $count: Int!
+  $cursor: String
+) {
+  commander(name: $commander) {
+    name
+    entries(first: $count, after: $cursor, sortBy: $sortBy, filters: {minEventSize: $minEventSize, maxStanding: $maxStanding, timePeriod: $timePeriod}) {
+      edges {
+        node {
+          id
+          standing
+          wins
+          losses
+          draws
+          decklist
+          player {
+            name
+            id
+          }
+          tournament {
+            name
+            size
+            tournamentDate
+            TID
+            id
+          }
+        }
+        cursor
+      }
+      pageInfo {
+        endCursor
+        hasNextPage
+      }
+    }
+  }
+}
+"""
+
+NEXT_DATA_PATTERN = re.compile(r'<script id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+DECK_ID_PATTERN = re.compile(r'moxfield\.com/decks/([^/]+)')
+
+
+def commander_url(commander, time_period='SIX_MONTHS'):
+    """Build the EDHTop16 page URL for a commander name and time period."""
+    return f"{EDHTOP16_BASE_URL}/commander/{quote(commander, safe='')}?timePeriod={time_period}"
+
+
+def with_sort_by(url, sort_by):
+    """Return the commander URL with its sortBy query parameter replaced."""
+    parsed_url = urlparse(url)
+    query = parse_qs(parsed_url.query)
+    query['sortBy'] = [sort_by]
+    return parsed_url._replace(query=urlencode(query, doseq=True)).geturl()
+
+
+def parse_commander_url(url):
+    """
+    Split an EDHTop16 commander URL into the GraphQL query variables.
+
+    Args:
+        url: e.g. https://edhtop16.com/commander/Winota%2C%20Joiner%20of%20Forces?timePeriod=POST_BAN
+
+    Returns:
+        Dictionary of variables for the entries query
+    """
+    parsed_url = urlparse(url)
+    path_parts = parsed_url.path.split('/')
+    if len(path_parts) < 3 or path_parts[1] != 'commander':
+        raise ValueError(f"Not an EDHTop16 commander URL: {url}")
+
+    query = parse_qs(parsed_url.query)
+    max_standing = query.get('maxStanding', [None])[0]
+    return {
+        'commander': unquote(path_parts[2]),
+        'sortBy': query.get('sortBy', ['TOP'])[0],
+        'minEventSize': int(query.get('minEventSize', [60])[0]),
+        'maxStanding': int(max_standing) if max_standing else None,
+        'timePeriod': query.get('timePeriod', ['SIX_MONTHS'])[0],
+    }
+
+
+def extract_next_data(html_content):
+    """
+    Pull the commander payload out of the page's embedded __NEXT_DATA__ JSON.
+
+    Returns:
+        Dictionary with 'commander', 'edges', 'page_info' and the query 'variables',
+        or None if the page has no payload
+    """
+    match = NEXT_DATA_PATTERN.search(html_content)
+    if not match:
+        return None
+
+    page_props = json.loads(match.group(1)).get('props', {}).get('pageProps', {})
+    try:
+        commander = page_props['payload']['data']['commander']
+    except (KeyError, TypeError):
+        return None
+
+    entries = commander.get('entries') or {}
+    variables = page_props.get('operationDescriptor', {}).get('request', {}).get('variables')
+    return {
+        'commander': commander['name'],
+        'edges': entries.get('edges', []),
+        'page_info': entries.get('pageInfo', {}),
+        'variables': variables,
+    }
+
+
+def format_standing_name(player_name, standing):
+    """Prefix the player name with the same medal the site renders (top 16 only)."""
+    if standing == 1:
+        return f"🥇 {player_name}"
+    if standing is not None and standing <= 4:
+        return f"🥈 {player_name}"
+    if standing is not None and standing <= 16:
+        return f"🥉 {player_name}"
+    return player_name
+
+
+def format_tournament_date(tournament_date):
+    """Render an ISO timestamp the way the site prints it, e.g. 'February 1st 2025'."""
+    if not tournament_date:
+        return ""
+    date = datetime.strptime(tournament_date[:10], "%Y-%m-%d")
+    if 11 <= date.day <= 13:
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(date.day % 10, 'th')
+    return f"{date.strftime('%B')} {date.day}{suffix} {date.year}"
+
+
+def entry_to_deck(node, commander_name):
+    """
+    Convert one GraphQL entry node into the deck dictionary produced by scrape_edhtop16.
+
+    Returns:
+        Deck dictionary, or None if the entry has no usable Moxfield link
+    """
+    url = (node.get('decklist') or '').strip()
+    if "moxfield.com" not in url:
+        return None
+
+    deck_id_match = DECK_ID_PATTERN.search(url)
+    if not deck_id_match:
+        return None
+
+    player = node.get('player') or {}
+    tournament = node.get('tournament') or {}
+
+    def as_text(value):
+        return "" if value is None else str(value)
+
+    return {
+        'commander': commander_name,
+        'deck_id': deck_id_match.group(1),
+        'url': url,
+        'name': format_standing_name((player.get('name') or '').strip(), node.get('standing')),
+        'tournament': (tournament.get('name') or '').strip(),
+        'date': format_tournament_date(tournament.get('tournamentDate')),
+        'placement': as_text(node.get('standing')),
+        'total_players': as_text(tournament.get('size')),
+        'wins': as_text(node.get('wins')),
+        'losses': as_text(node.get('losses')),
+        'draws': as_text(node.get('draws')),
+    }
+
+
+def entry_key(deck):
+    """
+    Identify a scraped entry by deck ID, tournament and date.
+
+    Commas are replaced the same way the stage 1 CSV writer does, so keys built
+    from freshly scraped entries and from rows read back from the CSV compare equal.
+    """
+    return tuple(str(deck.get(field, '')).replace(',', ' ') for field in ('deck_id', 'tournament', 'date'))
+
+
+def take_new_entries(decks, known_keys):
+    """
+    Split newest-first entries at the first one that's already stored.
+
+    Everything after a known entry is older, so it's stored too. The HTTP and
+    browser scrapers both use this rule, so they return the same new entries.
+
+    Returns:
+        Tuple of (entries before the first known one, whether a known entry was found)
+    """
+    for position, deck in enumerate(decks):
+        if entry_key(deck) in known_keys:
+            return decks[:position], True
+    return list(decks), False
+
+
+def fetch_entries_page(session, variables, cursor=None, page_size=PAGE_SIZE, metrics=None):
+    """
+    Request one page of entries from the EDHTop16 GraphQL endpoint.
+
+    Returns:
+        Tuple of (edges, page_info, commander display name)
+    """
+    payload = {
+        'query': ENTRIES_QUERY,
+        'variables': dict(variables, count=page_size, cursor=cursor),
+    }
+    start_time = time.perf_counter()
+    response = session.post(GRAPHQL_URL, json=payload, timeout=30)
+    if metrics is not None:
+        elapsed = time.perf_counter() - start_time
+        metrics.record("graphql_page", elapsed)
+        metrics.record_request(GRAPHQL_URL, response.status_code, elapsed, len(response.content))
+    response.raise_for_status()
+
+    body = response.json()
+    if body.get('errors'):
+        raise RuntimeError(f"GraphQL error: {body['errors']}")
+
+    commander = body['data']['commander']
+    return commander['entries']['edges'], commander['entries']['pageInfo'], commander['name']
+
+
+def scrape_edhtop16_http(url=None, html_file=None, session=None, known_keys=None, metrics=None):
+    """
+    Scrape a commander page without a browser.
+
+    The first page of entries is read from the __NEXT_DATA__ blob embedded in the
+    page HTML (fetched over plain HTTP, or read from a saved copy). The remaining
+    pages are requested from the site's GraphQL endpoint, one request per 48 entries.
+
+    Args:
+        url: EDHTop16 commander URL
+        html_file: Optional saved copy of the commander page to use instead of fetching it
+        session: Optional requests.Session to reuse
+        known_keys: Optional set of entry_key values already stored. When given, entries
+            are requested newest first and paging stops at the first known entry,
+            since everything after it is older; only the entries before it are
+            returned (see take_new_entries).
+        metrics: Optional RunMetrics to record page fetches and requests in
+
+    Returns:
+        Dictionary with 'commander' and 'decks', the same structure as scrape_edhtop16
+    """
+    if session is None:
+        session = create_session()
+
+    start_time = time.time()
+    metrics = metrics or RunMetrics()
+
+    if known_keys is not None:
+        return _scrape_new_entries(session, parse_commander_url(url), known_keys, start_time, metrics)
+
+    # Load the first page, either from disk or over HTTP
+    if html_file:
+        print(f"Reading saved page: {html_file}")
+        with open(html_file, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+    else:
+        print(f"Fetching URL: {url}")
+        fetch_start = time.perf_counter()
+        response = session.get(url, timeout=30)
+        elapsed = time.perf_counter() - fetch_start
+        metrics.record("page_fetch", elapsed)
+        metrics.record_request(url, response.status_code, elapsed, len(response.content))
+        response.raise_for_status()
+        html_content = response.text
+
+    next_data = extract_next_data(html_content)
+
+    if url:
+        variables = parse_commander_url(url)
+    elif next_data and next_data['variables']:
+        # A saved page carries its own query variables alongside the payload
+        variables = next_data['variables']
+    else:
+        raise ValueError("Need either a commander URL or a saved page containing __NEXT_DATA__")
+
+    if next_data:
+        commander_name = next_data['commander']
+        edges, page_info = next_data['edges'], next_data['page_info']
+        print(f"Read {len(edges)} entries from embedded __NEXT_DATA__")
+    else:
+        # No embedded payload - start paging from the beginning
+        edges, page_info, commander_name = fetch_entries_page(session, variables, metrics=metrics)
+
+    all_edges = list(edges)
+    page_count = 1
+
+    # A saved page on its own is read offline; only follow the cursor for a live URL
+    while page_info.get('hasNextPage') and url:
+        edges, page_info, _ = fetch_entries_page(session, variables, cursor=page_info.get('endCursor'), metrics=metrics)
+        all_edges.extend(edges)
+        page_count += 1
+        print(f"Fetched page {page_count} ({len(all_edges)} entries so far)")
+
+    decks = []
+    for edge in all_edges:
+        deck_info = entry_to_deck(edge['node'], commander_name)
+        if deck_info:
+            decks.append(deck_info)
+
+    print(f"Found {len(decks)} deck entries in {time.time() - start_time:.2f} seconds")
+
+    return {
+        'commander': commander_name,
+        'decks': decks
+    }
+
+
+def _scrape_new_entries(session, variables, known_keys, start_time, metrics=None):
+    """Page through entries newest first until a page holds an entry that's already known."""
+    variables = dict(variables, sortBy='NEW')
+    # The URL slug until the first response gives the site's display name
+    commander_name = variables['commander']
+
+    decks = []
+    page_info = {'hasNextPage': True, 'endCursor': None}
+    page_count = 0
+
+    while page_info.get('hasNextPage'):
+        edges, page_info, commander_name = fetch_entries_page(session, variables, cursor=page_info.get('endCursor'),
+                                                              metrics=metrics)
+        page_count += 1
+
+        page_decks = [deck for deck in (entry_to_deck(edge['node'], commander_name) for edge in edges) if deck]
+        new_decks, reached_known = take_new_entries(page_decks, known_keys)
+        decks.extend(new_decks)
+        print(f"Fetched page {page_count}: {len(new_decks)} new of {len(page_decks)} entries")
+
+        if reached_known:
+            break
+
+    print(f"Found {len(decks)} new deck entries in {page_count} page(s), {time.time() - start_time:.2f} seconds")
+
+    return {
+        'commander': commander_name,
+        'decks': decks
+    }
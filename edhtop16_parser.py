@@ -0,0 +1,194 @@
+import re
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+
+DECK_ENTRY_CLASS = 'group relative overflow-hidden rounded-lg bg-white shadow transition-shadow cursor-pointer hover:shadow-lg'
+DATE_SPAN_CLASS = 'line-clamp-1 text-sm opacity-70'
+
+# Selectors and patterns are compiled once at import, not once per entry
+TITLE_XPATH = etree.XPath('string(//title)')
+ENTRY_XPATH = etree.XPath(f'//div[@class="{DECK_ENTRY_CLASS}"]')
+LINKS_XPATH = etree.XPath('.//a')
+DATE_XPATH = etree.XPath(f'.//span[@class="{DATE_SPAN_CLASS}"]')
+PLACEMENT_DIV_XPATH = etree.XPath('.//div[contains(concat(" ", normalize-space(@class), " "), " bottom-0 ")]')
+SPANS_XPATH = etree.XPath('.//span')
+
+DECK_ID_PATTERN = re.compile(r'moxfield\.com/decks/([^/]+)')
+NUMBER_PATTERN = re.compile(r'\d+')
+WINS_PATTERN = re.compile(r'Wins:\s*(\d+)')
+LOSSES_PATTERN = re.compile(r'Losses:\s*(\d+)')
+DRAWS_PATTERN = re.compile(r'Draws:\s*(\d+)')
+
+
+def load_html(source):
+    """Return the HTML text for a saved page path, or the string itself if it is already HTML."""
+    if '<' not in source[:1024]:
+        with open(source, 'r', encoding='utf-8') as f:
+            return f.read()
+    return source
+
+
+def parse_placement(placement_text):
+    """Split "4th / 63 players" into ('4', '63')."""
+    parts = [p.strip() for p in placement_text.split('/')]
+    if len(parts) < 2:
+        return None
+    placement = NUMBER_PATTERN.search(parts[0])
+    total_players = NUMBER_PATTERN.search(parts[1])
+    return (placement.group() if placement else "",
+            total_players.group() if total_players else "")
+
+
+def parse_record(record_text):
+    """Split "Wins: 2 / Losses: 3 / Draws: 0" into ('2', '3', '0')."""
+    wins = WINS_PATTERN.search(record_text)
+    losses = LOSSES_PATTERN.search(record_text)
+    draws = DRAWS_PATTERN.search(record_text)
+    return (wins.group(1) if wins else "",
+            losses.group(1) if losses else "",
+            draws.group(1) if draws else "")
+
+
+def parse_edhtop16_html(source):
+    """
+    Extract deck entries from a fully loaded EDHTop16 commander page.
+
+    Uses lxml's C-backed tree with precompiled XPath selectors. The output
+    matches parse_edhtop16_html_bs4 entry for entry.
+
+    Args:
+        source: Path to a saved page, or the page HTML as a string
+
+    Returns:
+        Dictionary with 'commander' and 'decks'
+    """
+    tree = lxml_html.fromstring(load_html(source))
+    commander_name = TITLE_XPATH(tree).split('|')[0].strip()
+
+    decks = []
+    for entry in ENTRY_XPATH(tree):
+        links = LINKS_XPATH(entry)
+        if not links:
+            continue
+
+        url = links[0].get('href', '').strip()  # the site sometimes has a stray space in the link
+
+        # Skip if not a Moxfield URL
+        if "moxfield.com" not in url:
+            continue
+
+        deck_id_match = DECK_ID_PATTERN.search(url)
+        if not deck_id_match:
+            continue
+
+        deck_info = {
+            'commander': commander_name,
+            'deck_id': deck_id_match.group(1),
+            'url': url,
+            'name': links[0].text_content().strip(),
+            'tournament': links[1].text_content().strip() if len(links) > 1 else "",
+        }
+
+        date_spans = DATE_XPATH(entry)
+        deck_info['date'] = date_spans[0].text_content().strip() if date_spans else ""
+
+        deck_info['placement'] = ''
+        deck_info['total_players'] = ''
+        deck_info['wins'] = ""
+        deck_info['losses'] = ""
+        deck_info['draws'] = ""
+
+        placement_divs = PLACEMENT_DIV_XPATH(entry)
+        if placement_divs:
+            spans = SPANS_XPATH(placement_divs[0])
+
+            # First span contains placement info
+            if len(spans) > 0:
+                placement = parse_placement(spans[0].text_content())
+                if placement:
+                    deck_info['placement'], deck_info['total_players'] = placement
+
+            # Second span contains win/loss record
+            if len(spans) > 1:
+                deck_info['wins'], deck_info['losses'], deck_info['draws'] = parse_record(spans[1].text_content())
+
+        decks.append(deck_info)
+
+    return {
+        'commander': commander_name,
+        'decks': decks
+    }
+
+
+def parse_edhtop16_html_bs4(source):
+    """
+    Reference implementation of the entry extraction using BeautifulSoup's html.parser.
+
+    This is the original scrape_edhtop16 parsing path, kept for comparison in
+    benchmarks and as a fallback. Prefer parse_edhtop16_html.
+
+    Args:
+        source: Path to a saved page, or the page HTML as a string
+
+    Returns:
+        Dictionary with 'commander' and 'decks'
+    """
+    soup = BeautifulSoup(load_html(source), 'html.parser')
+    commander_name = soup.title.text.split('|')[0].strip()
+
+    decks = []
+    for entry in soup.find_all('div', class_=DECK_ENTRY_CLASS):
+        deck_link = entry.find('a')
+        if not deck_link:
+            continue
+
+        url = deck_link['href'].strip()
+        if "moxfield.com" not in url:
+            continue
+
+        deck_id_match = re.search(r'moxfield\.com/decks/([^/]+)', url)
+        if not deck_id_match:
+            continue
+
+        deck_info = {
+            'commander': commander_name,
+            'deck_id': deck_id_match.group(1),
+            'url': url,
+            'name': deck_link.text.strip()
+        }
+
+        tournament_link = entry.find_all('a')
+        deck_info['tournament'] = tournament_link[1].text.strip() if len(tournament_link) > 1 else ""
+
+        date_span = entry.find('span', class_=DATE_SPAN_CLASS)
+        deck_info['date'] = date_span.text.strip() if date_span else ""
+
+        deck_info['placement'] = ''
+        deck_info['total_players'] = ''
+        deck_info['wins'] = ""
+        deck_info['losses'] = ""
+        deck_info['draws'] = ""
+
+        placement_div = entry.find('div', class_='bottom-0')
+        if placement_div:
+            spans = placement_div.find_all('span')
+            if len(spans) > 0:
+                parts = [p.strip() for p in spans[0].get_text(strip=True).split('/')]
+                if len(parts) >= 2:
+                    deck_info['placement'] = re.search(r'\d+', parts[0]).group() if re.search(r'\d+', parts[0]) else ""
+                    deck_info['total_players'] = re.search(r'\d+', parts[1]).group() if re.search(r'\d+', parts[1]) else ""
+            if len(spans) > 1:
+                record_text = spans[1].get_text(strip=True)
+                wins = re.search(r'Wins:\s*(\d+)', record_text)
+                losses = re.search(r'Losses:\s*(\d+)', record_text)
+                draws = re.search(r'Draws:\s*(\d+)', record_text)
+                deck_info['wins'] = wins.group(1) if wins else ""
+                deck_info['losses'] = losses.group(1) if losses else ""
+                deck_info['draws'] = draws.group(1) if draws else ""
+
+        decks.append(deck_info)
+
+    return {
+        'commander': commander_name,
+        'decks': decks
+    }
@@ -0,0 +1,114 @@
+import argparse
+import re
+import pandas as pd
+
+# Where each field lives in stage 1 CSVs and in the older Title/Weblink layout
+COLUMN_ALIASES = {
+    'placement': ['placement', 'Placement'],
+    'players': ['total_players', 'Total Players'],
+    'wins': ['wins', 'Wins'],
+    'losses': ['losses', 'Losses'],
+    'draws': ['draws', 'Draws'],
+    'date': ['date', 'Date'],
+}
+
+# name -> description; see priority_key for how each is computed
+PRIORITIES = {
+    'placement': "best finish first",
+    'winrate': "highest win rate first",
+    'date': "most recent event first",
+    'size': "largest event first",
+}
+DEFAULT_PRIORITY = "placement,size"
+
+# Stage 1 writes dates like "February 1st 2025"; pandas can't parse the ordinal suffix
+ORDINAL_SUFFIX = re.compile(r'(\d+)(st|nd|rd|th)\b')
+
+
+def _column(df, field, numeric=True):
+    """A field's column under whichever name the CSV uses, or all missing values if it has none."""
+    for name in COLUMN_ALIASES[field]:
+        if name in df.columns:
+            if not numeric:
+                return df[name]
+            return pd.to_numeric(df[name], errors='coerce')
+    return pd.Series(float('nan'), index=df.index)
+
+
+def priority_key(df, name):
+    """
+    One priority's sort key for every row.
+
+    Returns:
+        Tuple of (Series of keys, ascending); rows with a missing key sort last
+    """
+    if name == 'placement':
+        return _column(df, 'placement'), True
+    if name == 'size':
+        return _column(df, 'players'), False
+    if name == 'winrate':
+        wins, losses, draws = _column(df, 'wins'), _column(df, 'losses'), _column(df, 'draws').fillna(0)
+        games = wins + losses + draws
+        return (wins / games).where(games > 0), False
+    if name == 'date':
+        dates = _column(df, 'date', numeric=False).map(lambda value: ORDINAL_SUFFIX.sub(r'\1', value) if isinstance(value, str) else value)
+        return pd.to_datetime(dates, errors='coerce'), False
+    raise ValueError(f"Unknown priority '{name}'; choose from {', '.join(PRIORITIES)} or csv")
+
+
+def parse_priority(priority):
+    """Split a comma-separated priority into names; None, '' and 'csv' mean CSV order (no names)."""
+    if not priority or priority == 'csv':
+        return []
+    names = [name.strip() for name in priority.split(',') if name.strip()]
+    for name in names:
+        if name not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{name}'; choose from {', '.join(PRIORITIES)} or csv")
+    return names
+
+
+def prioritize(df, priority=DEFAULT_PRIORITY):
+    """
+    Reorder deck rows so the most useful decks are fetched first.
+
+    An interrupted run then leaves the best-performing decks downloaded rather
+    than whichever came first in the CSV. Rows keep their index labels, so output
+    file names and summary order don't depend on the fetch order.
+
+    Args:
+        df: DataFrame read from a deck CSV (stage 1 or the Title/Weblink layout)
+        priority: Comma-separated PRIORITIES names, each breaking the previous one's
+            ties (e.g. "placement,size"), or "csv" to keep CSV order
+
+    Returns:
+        The reordered DataFrame; ties and rows missing a key keep their CSV order
+
+    Raises:
+        ValueError for an unknown priority name
+    """
+    names = parse_priority(priority)
+    if not names or df.empty:
+        return df
+
+    keys = pd.DataFrame(index=df.index)
+    ascending = []
+    for position, name in enumerate(names):
+        keys[position], name_ascending = priority_key(df, name)
+        ascending.append(name_ascending)
+    keys['csv_position'] = range(len(df))
+    order = keys.sort_values(list(keys.columns), ascending=ascending + [True], na_position='last', kind='mergesort').index
+    return df.loc[order]
+
+
+def add_priority_argument(parser):
+    """The --priority option shared by the deck scrapers."""
+    def priority_type(value):
+        try:
+            parse_priority(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+        return value
+
+    parser.add_argument('--priority', type=priority_type, default=DEFAULT_PRIORITY,
+                        help=f"Fetch order: comma-separated {', '.join(PRIORITIES)}, or csv for file order "
+                             f"(default: {DEFAULT_PRIORITY})")
@@ -0,0 +1,78 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # HTTP/2 is optional
+    httpx = None
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Connection': 'keep-alive',
+}
+
+# Connection-level failures a caller may retry; httpx's are included when it's installed
+NETWORK_ERRORS = (requests.RequestException,) + ((httpx.TransportError,) if httpx else ())
+
+
+def transport_retry(retries=2, backoff_factor=0.3):
+    """
+    urllib3 retry policy for failures below HTTP: refused or reset connections and read errors.
+
+    Status codes aren't retried here; 429 and 5xx go back to the caller's rate
+    controller (rate_control.governed_get) so it can slow down and honour Retry-After.
+    """
+    return Retry(total=retries, connect=retries, read=retries, status=0, redirect=3,
+                 backoff_factor=backoff_factor, allowed_methods=frozenset(['GET', 'HEAD']),
+                 raise_on_status=False, respect_retry_after_header=False)
+
+
+def create_session(headers=None, pool_connections=4, pool_maxsize=16, retries=2):
+    """
+    requests.Session with a sized keep-alive connection pool and transport-level retries.
+
+    Args:
+        headers: Headers added to DEFAULT_HEADERS for every request
+        pool_connections: Number of hosts to keep connection pools for
+        pool_maxsize: Connections kept open per host
+        retries: Retries for connection and read errors
+    """
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.headers.update(headers or {})
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                          max_retries=transport_retry(retries))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def http2_available():
+    if httpx is None:
+        return False
+    try:
+        import h2  # noqa: F401 - httpx needs it for http2=True
+    except ImportError:
+        return False
+    return True
+
+
+def create_client(headers=None, http2=False, pool_maxsize=16, retries=2, timeout=30):
+    """
+    HTTP client for the scrapers: an httpx.Client speaking HTTP/2 when asked for and
+    installed (pip install httpx[http2]), otherwise a pooled requests.Session.
+
+    Both answer get(url, headers=..., timeout=...) with a response that has
+    status_code, headers, text and content, which is all governed_get needs.
+    """
+    if http2 and http2_available():
+        client_headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        # One multiplexed connection per host replaces the keep-alive pool
+        return httpx.Client(http2=True, headers=client_headers, timeout=timeout, follow_redirects=True,
+                            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize),
+                            transport=httpx.HTTPTransport(http2=True, retries=retries))
+    if http2:
+        print("HTTP/2 needs httpx and h2 (pip install httpx[http2]); using HTTP/1.1 keep-alive instead")
+    return create_session(headers, pool_maxsize=pool_maxsize, retries=retries)
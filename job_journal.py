@@ -0,0 +1,202 @@
+import os
+import time
+import sqlite3
+import tempfile
+import pandas as pd
+
+SUMMARY_HEADER = "Deck Title,Placement,Total Players,Wins,Losses,Draws,Deck URL,Deck ID,Download Status\n"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    row_index INTEGER,
+    deck_id TEXT,
+    title TEXT,
+    placement TEXT,
+    players TEXT,
+    wins TEXT,
+    losses TEXT,
+    draws TEXT,
+    status TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    output_file TEXT,
+    snapshot TEXT,
+    started_at REAL,
+    finished_at REAL,
+    elapsed REAL
+)
+"""
+
+ROW_FIELDS = ['url', 'row_index', 'deck_id', 'title', 'placement', 'players', 'wins', 'losses', 'draws']
+
+
+def journal_key(url, row_index):
+    """
+    Journal key for an input row: its deck URL and 1-based row number.
+
+    Keyed per row rather than per URL, so a deck registered for several
+    tournaments still gets a text file and summary row for every input row.
+    """
+    return f"{url}#{row_index + 1}"
+
+
+class JobJournal:
+    """
+    Transactional record of every deck the scraper has worked on, kept in SQLite.
+
+    Each input row is one journal row keyed by journal_key (deck URL and row
+    number), holding its status, attempt count,
+    last error and timing. Every status change is its own transaction, so a crash
+    can lose at most the deck in progress and never corrupts the journal; resume
+    checks are primary-key lookups. deck_summary.csv is exported from the journal
+    rather than appended to.
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        # WAL with synchronous=NORMAL fsyncs at checkpoints rather than on every commit
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(SCHEMA)
+        # Journals created before snapshots were tracked
+        columns = [row['name'] for row in self.connection.execute("PRAGMA table_info(decks)")]
+        if 'snapshot' not in columns:
+            self.connection.execute("ALTER TABLE decks ADD COLUMN snapshot TEXT")
+        # Journals keyed by deck URL alone, from before rows were keyed individually
+        self.connection.execute("UPDATE OR IGNORE decks SET key = url || '#' || (row_index + 1) "
+                                "WHERE key = url AND row_index IS NOT NULL")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def is_done(self, key):
+        """True if the deck has already been downloaded successfully."""
+        row = self.connection.execute("SELECT status FROM decks WHERE key = ?", (key,)).fetchone()
+        return row is not None and row['status'] == 'Success'
+
+    def get(self, key):
+        """Return the journal row for key as a dictionary, or None."""
+        row = self.connection.execute("SELECT * FROM decks WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row else None
+
+    def count(self, status=None):
+        if status is None:
+            return self.connection.execute("SELECT COUNT(*) FROM decks").fetchone()[0]
+        return self.connection.execute("SELECT COUNT(*) FROM decks WHERE status = ?", (status,)).fetchone()[0]
+
+    def status_counts(self):
+        """Return {status: number of decks}."""
+        return dict(self.connection.execute("SELECT status, COUNT(*) FROM decks GROUP BY status").fetchall())
+
+    def begin(self, key, **row):
+        """
+        Start (or restart) work on a deck, recording its CSV fields.
+
+        Args:
+            key: Journal key from journal_key()
+            **row: Any of url, row_index, deck_id, title, placement, players, wins, losses, draws
+        """
+        values = {field: (str(row[field]) if field != 'row_index' else int(row[field]))
+                  for field in ROW_FIELDS if field in row}
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO decks (key, status, started_at) VALUES (?, 'In Progress', ?) "
+                "ON CONFLICT(key) DO UPDATE SET status = 'In Progress', error = NULL, started_at = excluded.started_at",
+                (key, time.time()))
+            if values:
+                assignments = ", ".join(f"{field} = ?" for field in values)
+                self.connection.execute(f"UPDATE decks SET {assignments} WHERE key = ?", (*values.values(), key))
+
+    def attempt(self, key, error=None):
+        """Count one attempt (a direct API fetch or a browser load) at the deck, noting any error it hit."""
+        with self.connection:
+            self.connection.execute("UPDATE decks SET attempts = attempts + 1, error = COALESCE(?, error) WHERE key = ?",
+                                    (error, key))
+
+    def finish(self, key, status, error=None, output_file=None, snapshot=None):
+        """
+        Record the outcome for a deck.
+
+        Args:
+            key: Journal key passed to begin()
+            status: Summary status, e.g. "Success", "Skipped - Page Not Found" or "Failed - ..."
+            error: Exception text or other detail behind a failure
+            output_file: Path of the saved deck list
+            snapshot: Content hash of the deck store snapshot the row refers to
+        """
+        now = time.time()
+        with self.connection:
+            self.connection.execute(
+                "UPDATE decks SET status = ?, error = ?, output_file = COALESCE(?, output_file), "
+                "snapshot = COALESCE(?, snapshot), finished_at = ?, elapsed = ? - COALESCE(started_at, ?) WHERE key = ?",
+                (status, error, output_file, snapshot, now, now, now, key))
+
+    def import_summary_csv(self, summary_file, input_urls):
+        """
+        Seed an empty journal from a deck_summary.csv written by earlier versions of the scraper.
+
+        Those versions keyed decks by URL and appended rows as they went (skipped
+        rows again on every run), so a summary row's position says nothing about
+        its input row. Each input row instead takes the latest summary status for
+        its URL; summary rows whose URL isn't in the input are dropped.
+
+        Args:
+            summary_file: Path of the old deck_summary.csv
+            input_urls: (row_index, url) pairs for the rows of the input CSV
+
+        Returns:
+            Number of rows imported
+        """
+        if self.count() or not os.path.exists(summary_file):
+            return 0
+        try:
+            summary_df = pd.read_csv(summary_file)
+        except Exception as e:
+            print(f"Error reading existing summary file: {e}")
+            return 0
+
+        # Later rows are from later runs, so they win
+        latest = {str(row['Deck URL']): row for _, row in summary_df.iterrows()}
+        imported = 0
+        with self.connection:
+            for row_index, url in input_urls:
+                row = latest.get(str(url))
+                if row is None:
+                    continue
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO decks (key, url, row_index, deck_id, title, placement, players, wins, losses, draws, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (journal_key(url, row_index), str(url), int(row_index), str(row['Deck ID']), str(row['Deck Title']),
+                     str(row['Placement']), str(row['Total Players']), str(row['Wins']), str(row['Losses']),
+                     str(row['Draws']), row['Download Status']))
+                imported += 1
+        return imported
+
+    def export_summary_csv(self, summary_file):
+        """Write deck_summary.csv (in input CSV order) from the journal, replacing the file atomically."""
+        rows = self.connection.execute(
+            "SELECT * FROM decks WHERE status != 'In Progress' ORDER BY row_index, key").fetchall()
+
+        directory = os.path.dirname(summary_file) or '.'
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".deck_summary_")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(SUMMARY_HEADER)
+            for row in rows:
+                f.write(f'"{row["title"]}",{row["placement"]},{row["players"]},{row["wins"]},{row["losses"]},'
+                        f'{row["draws"]},"{row["url"]}","{row["deck_id"]}","{row["status"]}"\n')
+        os.replace(temp_path, summary_file)
+        return len(rows)
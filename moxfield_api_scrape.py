@@ -1,10 +1,31 @@
 import pandas as pd
 import time
-import random
-import sys
 import os
-import requests
+import argparse
+from collections import deque
+from contextlib import nullcontext
 from urllib.parse import urlparse
+from async_downloader import download_all
+from http_client import NETWORK_ERRORS, create_client
+from rate_control import AIMDController, CircuitOpenError, HostGovernor, governed_get
+from response_cache import DEFAULT_CACHE_DIR, ResponseCache
+from deck_store import link_or_copy
+from fetch_priority import DEFAULT_PRIORITY, add_priority_argument, prioritize
+from deck_fetcher import NOT_FOUND_BURST, ExportIdCache, deck_download_url, deck_json_url
+from run_metrics import RunMetrics
+
+SUMMARY_HEADER = "Deck Title,Placement,Total Players,Wins,Losses,Draws,Deck URL,Deck ID,API URL,Download Status\n"
+
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/plain',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.moxfield.com/',
+    'Origin': 'https://www.moxfield.com'
+}
+
+# Decks checked by diagnose_not_found before concluding the export ID is at fault
+EXPORT_ID_SAMPLE = 5
 
 def extract_deck_id(url):
     """Extract the deck ID from a Moxfield URL."""
@@ -20,14 +41,99 @@ def extract_deck_id(url):
 
     return None
 
-def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists", export_id="b8c9ef4b-34fe-4ed8-8d4d-9759552b7b3a"):
+def make_filename(index, title):
+    """Create a safe, unique output filename (without extension) from the row index and deck title."""
+    safe_title = "".join([c if c.isalnum() or c in " -_" else "_" for c in title])
+    safe_title = safe_title.strip().replace(' ', '_')
+    if len(safe_title) > 100:  # Truncate if too long
+        safe_title = safe_title[:100]
+
+    # Add index to ensure uniqueness
+    return f"{index+1:03d}_{safe_title}"
+
+def api_download_url(deck_id, export_id):
+    return deck_download_url(deck_id, export_id)
+
+def csv_deck_ids(df):
+    """Deck IDs of the CSV's Moxfield links, in order, for looking up the export ID."""
+    deck_ids = [extract_deck_id(url) for url in df['Weblink'] if isinstance(url, str) and url.startswith('http')]
+    return [deck_id for deck_id in deck_ids if deck_id]
+
+def summary_row(job, deck_id, api_url, status):
+    """Format one deck_summary.csv line for a job built by scrape_deck_pages_async."""
+    return (f'"{job["title"]}",{job["placement"]},{job["players"]},{job["wins"]},{job["losses"]},{job["draws"]},'
+            f'"{job["deck_url"]}","{deck_id}","{api_url}","{status}"\n')
+
+def diagnose_not_found(session, governor, deck_ids, export_id, metrics=None):
+    """
+    Work out why download requests returned 404, once, after the run.
+
+    Each deck's JSON endpoint is checked: a deck that exists there was refused by
+    the download endpoint, which points at the export ID rather than the deck. If
+    the first EXPORT_ID_SAMPLE decks checked all exist, the export ID is reported
+    as stale and the rest aren't checked.
+
+    Args:
+        session: HTTP client used for the run
+        governor: The run's HostGovernor, so the checks are paced like the downloads
+        deck_ids: Deck IDs whose download returned 404
+        export_id: The export ID the downloads used
+        metrics: Optional RunMetrics to record the checks in
+
+    Returns:
+        Dictionary with 'exists' (deck IDs the JSON endpoint knows) and 'missing'
+        (deck IDs it doesn't), plus 'unchecked' when the check stopped early
+    """
+    deck_ids = list(dict.fromkeys(deck_ids))
+    result = {'exists': [], 'missing': [], 'unchecked': []}
+    if not deck_ids:
+        return result
+
+    print(f"\nChecking {len(deck_ids)} deck(s) whose download returned 404...")
+    for position, deck_id in enumerate(deck_ids):
+        if len(result['exists']) >= EXPORT_ID_SAMPLE and not result['missing']:
+            result['unchecked'] = deck_ids[position:]
+            break
+        try:
+            with metrics.step("not_found_check") if metrics else nullcontext():
+                response = governed_get(session, deck_json_url(deck_id), governor, metrics=metrics)
+        except NETWORK_ERRORS + (CircuitOpenError,) as e:
+            print(f"Could not check {deck_id}: {e}")
+            result['unchecked'].append(deck_id)
+            continue
+        result['exists' if response.status_code == 200 else 'missing'].append(deck_id)
+
+    if result['exists'] and not result['missing']:
+        print(f"Diagnosis: every deck checked exists but its download failed. The export ID is probably stale: {export_id}")
+    else:
+        if result['exists']:
+            print(f"Diagnosis: {len(result['exists'])} deck(s) exist but their download failed; the export ID might be incorrect: {export_id}")
+            print(f"  {', '.join(result['exists'])}")
+        if result['missing']:
+            print(f"Diagnosis: {len(result['missing'])} deck(s) were not found; they may have been removed or made private")
+            print(f"  {', '.join(result['missing'])}")
+    if result['unchecked']:
+        print(f"{len(result['unchecked'])} deck(s) not checked")
+    return result
+
+def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists", export_id=None,
+                      cache_dir=DEFAULT_CACHE_DIR, http2=False, pool_size=4, priority=DEFAULT_PRIORITY):
     """
     Download deck lists using the Moxfield API.
 
+    The export ID comes from ExportIdCache unless one is given. If NOT_FOUND_BURST
+    downloads in a row return 404, it's looked up again and, if it changed, those
+    downloads are retried with the new one.
+
     Args:
         csv_file_path: Path to the CSV file containing deck information
         output_dir: Directory to save the downloaded deck lists
-        export_id: The export ID to use in the API request
+        export_id: The export ID to use in the API request, or None to look it up
+        cache_dir: Response cache directory; decks already in it are revalidated with a
+            conditional request instead of downloaded again. None disables the cache.
+        http2: Use HTTP/2 when httpx and h2 are installed
+        pool_size: Keep-alive connections kept open to the API
+        priority: Order to fetch decks in (see fetch_priority.prioritize)
     """
     # Create output directory if it doesn't exist
     if not os.path.exists(output_dir):
@@ -50,23 +156,46 @@ def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists",
         print("Error: CSV file does not contain a 'Weblink' column.")
         return
 
+    # Fetch the most useful decks first, so an interrupted run still leaves them downloaded
+    df = prioritize(df, priority)
+
     # Create a summary file
     summary_file = os.path.join(output_dir, "deck_summary.csv")
     with open(summary_file, 'w', encoding='utf-8') as f:
-        f.write("Deck Title,Placement,Total Players,Wins,Losses,Draws,Deck URL,Deck ID,API URL,Download Status\n")
-
-    # Set up a session for making requests
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/plain',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Referer': 'https://www.moxfield.com/',
-        'Origin': 'https://www.moxfield.com'
-    })
-
-    # Iterate through each URL in the DataFrame
-    for index, row in df.iterrows():
+        f.write(SUMMARY_HEADER)
+
+    # One pooled client for the run, so requests reuse kept-alive connections
+    session = create_client(REQUEST_HEADERS, http2=http2, pool_maxsize=pool_size)
+
+    # Start at one request every 2-3 seconds and let the controller find the rate the API tolerates
+    governor = HostGovernor(AIMDController(initial=0.4, minimum=0.1, maximum=5.0, increase=0.2))
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    downloaded = {}  # deck ID -> (API URL, saved file) for decks fetched this run
+    not_found = []  # deck IDs whose download returned 404, diagnosed after the run
+    metrics = RunMetrics()
+
+    def fetch(url):
+        return governed_get(session, url, governor, metrics=metrics)
+
+    export_ids = ExportIdCache(export_id=export_id)
+    export_id = export_ids.current(fetch, csv_deck_ids(df))
+
+    # 404s since the last successful download, as (index, row, deck ID, summary line). They're
+    # written once a download succeeds; if they pile up first, the export ID is checked.
+    held = []
+
+    def write_held():
+        with open(summary_file, 'a', encoding='utf-8') as f:
+            for _, _, held_deck_id, line in held:
+                f.write(line)
+                not_found.append(held_deck_id)
+        held.clear()
+
+    # Iterate through each URL in the DataFrame (rows are put back if the export ID changes)
+    rows = deque(df.iterrows())
+    requested = 0  # rows that got as far as the API
+    while rows:
+        index, row = rows.popleft()
         url = row['Weblink']
         title = row['Title']
         placement = row.get('Placement', 'Unknown')
@@ -76,13 +205,7 @@ def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists",
         draws = row.get('Draws', 'Unknown')
 
         # Create a safe filename from the title
-        safe_title = "".join([c if c.isalnum() or c in " -_" else "_" for c in title])
-        safe_title = safe_title.strip().replace(' ', '_')
-        if len(safe_title) > 100:  # Truncate if too long
-            safe_title = safe_title[:100]
-
-        # Add index to ensure uniqueness
-        filename = f"{index+1:03d}_{safe_title}"
+        filename = make_filename(index, title)
 
         # Skip if URL is not valid
         if url == "No link found" or not url.startswith('http'):
@@ -108,26 +231,45 @@ def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists",
 
             print(f"Extracted deck ID: {deck_id}")
 
-            # Add a random delay to avoid being blocked
-            delay = random.uniform(2, 5)
-            print(f"Waiting {delay:.2f} seconds before request...")
-            time.sleep(delay)
+            # A deck reused across tournaments is only downloaded once per run
+            if deck_id in downloaded:
+                api_url, first_file_path = downloaded[deck_id]
+                output_file_path = os.path.join(output_dir, f"{filename}.txt")
+                link_or_copy(first_file_path, output_file_path)
+                metrics.count("duplicates_linked")
+                print(f"Deck already downloaded this run, linked to: {first_file_path}")
+                with open(summary_file, 'a', encoding='utf-8') as f:
+                    f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","{api_url}","Success"\n')
+                continue
 
             # Construct the API URL
-            api_url = f"https://api.moxfield.com/v2/decks/all/{deck_id}/download?exportId={export_id}&arenaOnly=false"
+            api_url = api_download_url(deck_id, export_id)
             print(f"Making API request to: {api_url}")
 
-            # Make the request
-            response = session.get(api_url)
+            # Make the request, paced by the rate controller and retried on 429/5xx.
+            # A cached deck is sent as a conditional request, so an unchanged one costs a 304.
+            cache_key = ResponseCache.key(deck_id, export_id)
+            conditional = cache.conditional_headers(cache_key) if cache else {}
+            with metrics.step("http_fetch"):
+                response = governed_get(session, api_url, governor, headers=conditional, metrics=metrics)
+            if cache:
+                deck_text = cache.resolve(cache_key, response.status_code, response.text, response.headers)
+            else:
+                deck_text = response.text if response.status_code == 200 else None
 
             # Check if the request was successful
-            if response.status_code == 200:
+            if deck_text is not None:
                 # Save the deck list to a file
                 output_file_path = os.path.join(output_dir, f"{filename}.txt")
-                with open(output_file_path, 'w', encoding='utf-8') as f:
-                    f.write(response.text)
+                with metrics.step("file_write"), open(output_file_path, 'w', encoding='utf-8') as f:
+                    f.write(deck_text)
 
-                print(f"Successfully downloaded deck list to: {output_file_path}")
+                if response.status_code == 304:
+                    print(f"Deck unchanged since last run, saved cached copy to: {output_file_path}")
+                else:
+                    print(f"Successfully downloaded deck list to: {output_file_path}")
+                downloaded[deck_id] = (api_url, output_file_path)
+                write_held()
 
                 # Add to summary
                 with open(summary_file, 'a', encoding='utf-8') as f:
@@ -143,39 +285,261 @@ def scrape_deck_pages(csv_file_path="edh16_scrape.csv", output_dir="deck_lists",
                     error_text = response.text.replace('"', '""')[:100]
                     error_info += f" - {error_text}"
 
-                with open(summary_file, 'a', encoding='utf-8') as f:
-                    f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","{api_url}","{error_info}"\n')
-
-                # Try to diagnose the issue
-                if response.status_code == 404:
-                    print("Diagnosis: The deck ID might be incorrect or the API endpoint has changed.")
-                    print("Checking if deck exists by making a request to the main deck page...")
-
-                    # Try to access the main deck API endpoint
-                    check_url = f"https://api.moxfield.com/v2/decks/all/{deck_id}"
-                    check_response = session.get(check_url)
-
-                    if check_response.status_code == 200:
-                        print(f"Deck exists but download endpoint failed. Export ID might be incorrect: {export_id}")
-                    else:
-                        print(f"Deck not found at {check_url} (Status: {check_response.status_code})")
-                        print("The deck ID might be invalid or the deck might have been removed.")
+                summary_line = f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","{deck_id}","{api_url}","{error_info}"\n'
+                if response.status_code == 404 and export_ids.can_refresh():
+                    held.append((index, row, deck_id, summary_line))
+                    if len(held) >= NOT_FOUND_BURST:
+                        if export_ids.refresh(fetch, [held_deck_id for _, _, held_deck_id, _ in held]):
+                            export_id = export_ids.export_id
+                            print(f"Retrying {len(held)} downloads with the new export ID")
+                            rows.extendleft(reversed([(held_index, held_row) for held_index, held_row, _, _ in held]))
+                            held.clear()
+                        else:
+                            write_held()
+                else:
+                    with open(summary_file, 'a', encoding='utf-8') as f:
+                        f.write(summary_line)
+                    if response.status_code == 404:
+                        not_found.append(deck_id)
 
         except Exception as e:
             print(f"Error processing URL {url}: {e}")
             with open(summary_file, 'a', encoding='utf-8') as f:
                 f.write(f'"{title}",{placement},{players},{wins},{losses},{draws},"{url}","","","Failed - {str(e)}"\n')
 
+        # Rows come in priority order, so count them rather than going by the row index
+        requested += 1
+        if cache and requested % 50 == 0:
+            cache.save()
+
+    write_held()
+    if cache:
+        cache.save()
+        print(f"Response cache: {cache.summary()}")
+
+    diagnosis = diagnose_not_found(session, governor, not_found, export_id, metrics)
+    session.close()
+
+    metrics.print_summary()
+    metrics.write_report(os.path.join(output_dir, "run_report.json"), script="moxfield_api_scrape", mode="sync",
+                         csv_file=csv_file_path, rows=len(df), cache=cache.summary() if cache else None,
+                         export_id=export_id, export_id_refreshes=export_ids.refreshes, not_found=diagnosis)
     print(f"\nScraping completed! Results saved to {output_dir} directory")
     print(f"Summary file created at: {summary_file}")
 
+def scrape_deck_pages_async(csv_file_path="edh16_scrape.csv", output_dir="deck_lists", export_id=None,
+                            concurrency=8, requests_per_second=2.0, cache_dir=DEFAULT_CACHE_DIR, priority=DEFAULT_PRIORITY,
+                            max_requests_per_second=5.0):
+    """
+    Download deck lists concurrently with asyncio, paced by a per-host token bucket.
+
+    Produces the same files and deck_summary.csv as scrape_deck_pages, but keeps up
+    to `concurrency` requests in flight instead of sleeping 2-5 seconds between them.
+    A burst of 404s stops the batch to check the export ID, as in scrape_deck_pages.
+
+    Args:
+        csv_file_path: Path to the CSV file containing deck information
+        output_dir: Directory to save the downloaded deck lists
+        export_id: The export ID to use in the API request, or None to look it up
+        concurrency: Maximum number of requests in flight
+        requests_per_second: Starting request rate for api.moxfield.com
+        cache_dir: Response cache directory (see scrape_deck_pages), or None to disable it
+        priority: Order to start downloads in (see fetch_priority.prioritize)
+        max_requests_per_second: Request rate the AIMD controller may grow to while responses stay fast
+    """
+    # Create output directory if it doesn't exist
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print(f"Created output directory: {output_dir}")
+
+    # Load the CSV file into a pandas DataFrame
+    try:
+        df = pd.read_csv(csv_file_path)
+        print(f"Successfully loaded {len(df)} records from {csv_file_path}")
+    except FileNotFoundError:
+        print(f"Error: File '{csv_file_path}' not found.")
+        return
+    except Exception as e:
+        print(f"Error reading CSV file: {e}")
+        return
+
+    # Check if the Weblink column exists
+    if 'Weblink' not in df.columns:
+        print("Error: CSV file does not contain a 'Weblink' column.")
+        return
+
+    # Fetch the most useful decks first, so an interrupted run still leaves them downloaded
+    df = prioritize(df, priority)
+
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    metrics = RunMetrics()
+
+    # The export ID lookup and the 404 checks are a few sequential requests, so they use a plain pooled client
+    session = create_client(REQUEST_HEADERS)
+    governor = HostGovernor(AIMDController(initial=requests_per_second, minimum=0.1, maximum=5.0, increase=0.2))
+
+    def fetch(url):
+        return governed_get(session, url, governor, metrics=metrics)
+
+    export_ids = ExportIdCache(export_id=export_id)
+    export_id = export_ids.current(fetch, csv_deck_ids(df))
+
+    def set_export_id(job, export_id):
+        job['url'] = api_download_url(job['deck_id'], export_id)
+        job['cache_key'] = ResponseCache.key(job['deck_id'], export_id)
+        if cache:
+            job['headers'] = cache.conditional_headers(job['cache_key'])
+
+    summary_rows = {}
+    jobs = []
+    jobs_by_deck = {}
+    for index, row in df.iterrows():
+        job = {
+            'index': index,
+            'deck_url': row['Weblink'],
+            'title': row['Title'],
+            'placement': row.get('Placement', 'Unknown'),
+            'players': row.get('Total Players', 'Unknown'),
+            'wins': row.get('Wins', 'Unknown'),
+            'losses': row.get('Losses', 'Unknown'),
+            'draws': row.get('Draws', 'Unknown'),
+            'filename': make_filename(index, row['Title']),
+        }
+
+        # Skip if URL is not valid
+        if job['deck_url'] == "No link found" or not job['deck_url'].startswith('http'):
+            summary_rows[index] = summary_row(job, "", "", "Skipped - Invalid URL")
+            continue
+
+        deck_id = extract_deck_id(job['deck_url'])
+        if not deck_id:
+            summary_rows[index] = summary_row(job, "", "", "Failed - Could not extract deck ID")
+            continue
+
+        job['deck_id'] = deck_id
+        if deck_id in jobs_by_deck:
+            # A deck reused across tournaments is downloaded once and written for every row
+            jobs_by_deck[deck_id]['duplicates'].append(job)
+            continue
+
+        set_export_id(job, export_id)
+        job['duplicates'] = []
+        jobs_by_deck[deck_id] = job
+        jobs.append(job)
+
+    duplicates = sum(len(job['duplicates']) for job in jobs)
+    if duplicates:
+        print(f"{duplicates} rows reuse a deck that appears earlier in the file; each deck is downloaded once")
+    print(f"Downloading {len(jobs)} decks with up to {concurrency} requests in flight, "
+          f"starting at {requests_per_second} requests/second (up to {max_requests_per_second})")
+
+    not_found = []  # deck IDs whose download returned 404, diagnosed after the run
+
+    def record_result(job, result):
+        if cache:
+            deck_text = cache.resolve(job['cache_key'], result['status'], result['text'], result['headers'])
+        else:
+            deck_text = result['text'] if result['status'] == 200 else None
+
+        if deck_text is not None:
+            output_file_path = os.path.join(output_dir, f"{job['filename']}.txt")
+            with metrics.step("file_write"):
+                with open(output_file_path, 'w', encoding='utf-8') as f:
+                    f.write(deck_text)
+                for duplicate in job['duplicates']:
+                    link_or_copy(output_file_path, os.path.join(output_dir, f"{duplicate['filename']}.txt"))
+            status = "Success"
+            action = "Unchanged" if result['status'] == 304 else "Downloaded"
+            print(f"[{job['index']+1}] {action} {job['deck_id']} in {result['elapsed']:.2f}s ({result['attempts']} attempt(s))")
+        elif result['status'] is None:
+            status = f"Failed - {result['error']}"
+            print(f"[{job['index']+1}] Request for {job['deck_id']} failed: {result['error']}")
+        else:
+            status = f"Failed - API Status {result['status']}"
+            if result['status'] == 404:
+                not_found.append(job['deck_id'])
+            if result['text']:
+                # Truncate and clean the response text for CSV
+                error_text = result['text'].replace('"', '""')[:100]
+                status += f" - {error_text}"
+            print(f"[{job['index']+1}] Failed to download {job['deck_id']}. Status code: {result['status']}")
+        for row_job in [job] + job['duplicates']:
+            summary_rows[row_job['index']] = summary_row(row_job, job['deck_id'], job['url'], status)
+
+    start_time = time.time()
+    pending = jobs
+    while pending:
+        held = []  # (job, result) for 404s since the last successful download
+        started = set()
+
+        def handle_result(job, result):
+            started.add(job['index'])
+            if result['status'] == 404 and export_ids.can_refresh():
+                held.append((job, result))
+                return
+            if result['status'] in (200, 304):
+                for held_job, held_result in held:
+                    record_result(held_job, held_result)
+                held.clear()
+            record_result(job, result)
+
+        download_all(pending, handle_result, concurrency=concurrency, requests_per_second=requests_per_second,
+                     max_requests_per_second=max_requests_per_second, headers=REQUEST_HEADERS, metrics=metrics, should_stop=lambda: len(held) >= NOT_FOUND_BURST)
+        unstarted = [job for job in pending if job['index'] not in started]
+        if len(held) >= NOT_FOUND_BURST and export_ids.refresh(fetch, [job['deck_id'] for job, _ in held]):
+            export_id = export_ids.export_id
+            pending = [job for job, _ in held] + unstarted
+            print(f"Retrying {len(held)} failed downloads and {len(unstarted)} not yet started with the new export ID")
+            for job in pending:
+                set_export_id(job, export_id)
+        else:
+            for held_job, held_result in held:
+                record_result(held_job, held_result)
+            pending = unstarted
+    elapsed = time.time() - start_time
+    if cache:
+        cache.save()
+        print(f"Response cache: {cache.summary()}")
+
+    # Write the summary in CSV order, like the sequential scraper
+    summary_file = os.path.join(output_dir, "deck_summary.csv")
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write(SUMMARY_HEADER)
+        for index in sorted(summary_rows):
+            f.write(summary_rows[index])
+
+    succeeded = sum(1 for line in summary_rows.values() if line.endswith('"Success"\n'))
+    print(f"\nGot deck lists for {succeeded}/{len(summary_rows)} rows ({len(jobs)} distinct decks) in {elapsed:.1f} seconds")
+
+    diagnosis = diagnose_not_found(session, governor, not_found, export_id, metrics)
+    session.close()
+    metrics.print_summary()
+    metrics.write_report(os.path.join(output_dir, "run_report.json"), script="moxfield_api_scrape", mode="async",
+                         csv_file=csv_file_path, rows=len(summary_rows), decks=len(jobs), succeeded=succeeded,
+                         concurrency=concurrency, requests_per_second=requests_per_second,
+                         cache=cache.summary() if cache else None, export_id=export_id,
+                         export_id_refreshes=export_ids.refreshes, not_found=diagnosis)
+    print(f"Summary file created at: {summary_file}")
+
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
-        # If both CSV file and export ID are provided
-        scrape_deck_pages(sys.argv[1], export_id=sys.argv[2])
-    elif len(sys.argv) > 1:
-        # If only CSV file is provided
-        scrape_deck_pages(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Download Moxfield deck lists through the API")
+    parser.add_argument('csv_file', nargs='?', default="edh16_scrape.csv", help="CSV file containing deck information")
+    parser.add_argument('export_id', nargs='?', default=None, help="Export ID for the download endpoint (looked up from deck JSON if omitted)")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="Download concurrently with asyncio")
+    parser.add_argument('--concurrency', type=int, default=8, help="Maximum requests in flight with --async (adapts upwards from 2)")
+    parser.add_argument('--rps', type=float, default=2.0, help="Starting requests per second with --async")
+    parser.add_argument('--max-rps', type=float, default=5.0, help="Requests per second --async may adapt up to")
+    parser.add_argument('--no-cache', action='store_true', help="Download every deck in full instead of revalidating cached copies")
+    parser.add_argument('--http2', action='store_true', help="Use HTTP/2 (needs httpx[http2]; the sequential scraper only)")
+    parser.add_argument('--pool-size', type=int, default=4, help="Keep-alive connections kept open to the API")
+    add_priority_argument(parser)
+    args = parser.parse_args()
+    cache_dir = None if args.no_cache else DEFAULT_CACHE_DIR
+
+    if args.use_async:
+        scrape_deck_pages_async(args.csv_file, export_id=args.export_id,
+                                concurrency=args.concurrency, requests_per_second=args.rps, cache_dir=cache_dir,
+                                priority=args.priority, max_requests_per_second=args.max_rps)
     else:
-        # Use defaults
-        scrape_deck_pages()
+        scrape_deck_pages(args.csv_file, export_id=args.export_id, cache_dir=cache_dir,
+                          http2=args.http2, pool_size=args.pool_size, priority=args.priority)
@@ -0,0 +1,119 @@
+import time
+from collections import deque
+from selenium.common.exceptions import WebDriverException
+from scrape_waits import POLL_INTERVAL
+
+# Set on a tab's old document just before it navigates away, so the poller can
+# tell the previous page apart from the one it asked for
+STALE_MARKER_SCRIPT = "window.__multiTabStale = true; window.location.href = arguments[0];"
+STALE_CHECK_SCRIPT = "return window.__multiTabStale === true"
+
+
+def open_tabs(driver, count):
+    """
+    Make sure the browser has count tabs open.
+
+    Returns:
+        List of window handles, starting with the driver's current one
+    """
+    handles = [driver.current_window_handle]
+    while len(handles) < count:
+        driver.switch_to.new_window('tab')
+        handles.append(driver.current_window_handle)
+    return handles
+
+
+def close_tabs(driver, handles):
+    """Close every tab but the first and switch back to it."""
+    for handle in handles[1:]:
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except WebDriverException:
+            pass
+    driver.switch_to.window(handles[0])
+
+
+def run_in_tabs(driver, jobs, ready_condition, harvest, tabs=4, timeout=20, max_attempts=3,
+                navigate_interval=0.0, poll=POLL_INTERVAL, timer=None):
+    """
+    Load pages in several tabs of one browser and harvest whichever becomes ready first.
+
+    Navigation is started on every idle tab without waiting for the load, then the
+    loading tabs are polled round-robin with ready_condition. A tab whose page is
+    ready (or has timed out) is handed to harvest with the driver switched to it,
+    and then gets the next job. One Chrome process does the work of `tabs` serial
+    scrapers while the waits overlap.
+
+    Args:
+        driver: Selenium WebDriver whose browser gets the tabs
+        jobs: List of dictionaries, each with at least a 'url' key
+        ready_condition: scrape_waits condition; a truthy result means the page can be harvested
+        harvest: Called as harvest(driver, job, ready, final_attempt). ready is the condition's
+            result, or None if the page timed out - the tab may then still show the previous
+            job's page, so nothing should be read from it. Return True when the job is finished,
+            or False to queue it again (ignored on the final attempt).
+        tabs: Number of tabs to drive
+        timeout: Seconds a page may take to become ready
+        max_attempts: Loads per job before final_attempt is True
+        navigate_interval: Minimum seconds between starting two navigations, to stay polite
+        poll: Seconds between polling rounds
+        timer: Optional RunMetrics; records 'tab_load' and 'tab_harvest' steps
+
+    Returns:
+        Number of page loads issued
+    """
+    if not jobs:
+        return 0
+
+    handles = open_tabs(driver, min(tabs, len(jobs)))
+    pending = deque(jobs)
+    attempts = {}
+    loading = {}
+    idle = list(handles)
+    last_navigation = 0.0
+    loads = 0
+
+    try:
+        while pending or loading:
+            # Start a navigation on every idle tab, paced by navigate_interval
+            while idle and pending and time.monotonic() - last_navigation >= navigate_interval:
+                handle = idle.pop()
+                job = pending.popleft()
+                attempts[id(job)] = attempts.get(id(job), 0) + 1
+                driver.switch_to.window(handle)
+                driver.execute_script(STALE_MARKER_SCRIPT, job['url'])
+                last_navigation = time.monotonic()
+                loading[handle] = (job, last_navigation)
+                loads += 1
+
+            # Harvest every tab whose page is ready or out of time
+            for handle, (job, started) in list(loading.items()):
+                driver.switch_to.window(handle)
+                try:
+                    ready = None if driver.execute_script(STALE_CHECK_SCRIPT) else ready_condition(driver)
+                except WebDriverException:
+                    # The old document can vanish mid-check while the new one commits
+                    ready = None
+
+                elapsed = time.monotonic() - started
+                if not ready and elapsed < timeout:
+                    continue
+
+                del loading[handle]
+                if timer is not None:
+                    timer.record("tab_load", elapsed, timed_out=not ready)
+                final_attempt = attempts[id(job)] >= max_attempts
+                harvest_start = time.perf_counter()
+                finished = harvest(driver, job, ready or None, final_attempt)
+                if timer is not None:
+                    timer.record("tab_harvest", time.perf_counter() - harvest_start)
+                if not finished and not final_attempt:
+                    pending.append(job)
+                idle.append(handle)
+
+            time.sleep(poll)
+    finally:
+        close_tabs(driver, handles)
+
+    return loads
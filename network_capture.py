@@ -0,0 +1,98 @@
+import json
+import time
+import base64
+from browser_profile import read_performance_log
+from scrape_waits import POLL_INTERVAL
+
+MAX_BUFFERED_RESPONSES = 500
+
+
+class NetworkCapture:
+    """
+    Picks responses out of the page's own network traffic via Chrome's performance log.
+
+    Network events are buffered across reads, so with several tabs on one driver a
+    response logged while another tab was being polled is still found later. Every
+    message read is also kept for ResourceStats (see drain_messages), since the log
+    can only be read once.
+
+    Args:
+        driver: WebDriver created with performance logging (browser_profile.build_chrome_options)
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.responses = {}  # requestId -> URL, for JSON responses only
+        self.finished = set()
+        self.unreported = []
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+        except Exception:
+            pass
+
+    def poll(self):
+        """Read new performance log messages into the buffer."""
+        messages = read_performance_log(self.driver)
+        for message in messages:
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived' and 'json' in params['response'].get('mimeType', ''):
+                self.responses[params['requestId']] = params['response']['url']
+            elif method == 'Network.loadingFinished' and params['requestId'] in self.responses:
+                self.finished.add(params['requestId'])
+
+        # Forget the oldest JSON responses nobody asked for
+        while len(self.responses) > MAX_BUFFERED_RESPONSES:
+            request_id = next(iter(self.responses))
+            del self.responses[request_id]
+            self.finished.discard(request_id)
+        self.unreported.extend(messages)
+        return messages
+
+    def drain_messages(self):
+        """Return the messages read since the last call, for ResourceStats.collect."""
+        messages, self.unreported = self.unreported, []
+        return messages
+
+    def _take_finished(self, url_pattern):
+        for request_id, url in list(self.responses.items()):
+            if request_id in self.finished and url_pattern.search(url):
+                del self.responses[request_id]
+                self.finished.discard(request_id)
+                return request_id
+        return None
+
+    def take_json(self, url_pattern, timeout=3.0, poll=POLL_INTERVAL):
+        """
+        Wait for a finished response whose URL matches url_pattern and return its body as JSON.
+
+        The driver must be switched to the tab that made the request.
+
+        Args:
+            url_pattern: Compiled regular expression matched against response URLs
+            timeout: Seconds to wait for the response to finish loading
+            poll: Seconds between log reads
+
+        Returns:
+            The parsed JSON body, or None if no matching response arrived or it wasn't JSON
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.poll()
+            request_id = self._take_finished(url_pattern)
+            if request_id is not None:
+                break
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            body = result['body']
+            if result.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            return json.loads(body)
+        except Exception as e:
+            # The body may already be evicted from the buffer, or belong to a tab we aren't attached to
+            print(f"Could not read captured response body: {e}")
+            return None
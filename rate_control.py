@@ -0,0 +1,251 @@
+import time
+import random
+from email.utils import parsedate_to_datetime
+from http_client import NETWORK_ERRORS
+
+# Responses that mean "slow down" rather than "this request is wrong"
+THROTTLE_STATUSES = {429, 503}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value, now=None):
+    """
+    Convert a Retry-After header (seconds, or an HTTP date) to a number of seconds.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or unreadable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (now if now is not None else time.time()))
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease controller, as used for TCP congestion windows.
+
+    `value` is the current limit (requests in flight, or requests per second). Each
+    fast, successful response grows it by roughly `increase` per full window; a
+    throttled or failed response, or latency rising above `latency_factor` times the
+    best smoothed latency seen, multiplies it by `decrease`.
+    """
+
+    def __init__(self, initial=2.0, minimum=1.0, maximum=32.0, increase=1.0, decrease=0.5, latency_factor=2.0):
+        self.value = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.smoothed_latency = None
+        self.baseline_latency = None
+        self.last_decrease = 0.0
+
+    @property
+    def limit(self):
+        """The current value rounded down to a whole number of requests (at least 1)."""
+        return max(1, int(self.value))
+
+    def on_success(self, latency):
+        if self.smoothed_latency is None:
+            self.smoothed_latency = latency
+        else:
+            self.smoothed_latency = 0.8 * self.smoothed_latency + 0.2 * latency
+        if self.baseline_latency is None or self.smoothed_latency < self.baseline_latency:
+            self.baseline_latency = self.smoothed_latency
+
+        if self.smoothed_latency > self.baseline_latency * self.latency_factor:
+            self._decrease()
+        else:
+            self.value = min(self.maximum, self.value + self.increase / self.value)
+
+    def on_throttle(self):
+        self._decrease()
+
+    def on_failure(self):
+        self._decrease()
+
+    def _decrease(self):
+        # Several in-flight responses usually report the same overload; only cut once per second
+        now = time.monotonic()
+        if now - self.last_decrease < 1.0:
+            return
+        self.last_decrease = now
+        self.value = max(self.minimum, self.value * self.decrease)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host that is clearly down.
+
+    After `failure_threshold` consecutive failures the circuit opens and allow()
+    returns False for `reset_timeout` seconds. Then a single probe request is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half-open' and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            if self.opened_at is None:
+                print(f"Circuit breaker open after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+class HostGovernor:
+    """
+    Per-host AIMD controller, circuit breaker and Retry-After pause, fed by each response.
+
+    The async downloader reads controller.limit as the number of requests in
+    flight and rate_controller.value as requests per second; governed_get reads
+    controller.value as requests per second.
+
+    Args:
+        controller: AIMDController for this host's concurrency or rate
+        breaker: CircuitBreaker for this host
+        rate_controller: Optional second AIMDController for the request rate, when
+            controller limits concurrency; both are fed every response
+    """
+
+    def __init__(self, controller=None, breaker=None, rate_controller=None):
+        self.controller = controller or AIMDController()
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_controller = rate_controller
+        self.controllers = [self.controller] + ([rate_controller] if rate_controller else [])
+        self.paused_until = 0.0
+        self.last_request = 0.0
+
+    def pause_remaining(self):
+        """Seconds left on a Retry-After pause (0 if none)."""
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def interval_remaining(self):
+        """Seconds until the next request is due when controller.value is a rate."""
+        return max(0.0, 1.0 / self.controller.value - (time.monotonic() - self.last_request))
+
+    def record(self, status, latency, retry_after=None):
+        """
+        Feed one response (status None for a network error) into the controller and breaker.
+
+        Returns:
+            True if the request should be retried
+        """
+        if status is not None and status < 500 and status not in THROTTLE_STATUSES:
+            # Any definite answer (including 404) shows the host is up
+            self.breaker.record_success()
+            for controller in self.controllers:
+                controller.on_success(latency)
+            return False
+
+        wait = parse_retry_after(retry_after)
+        if wait is not None:
+            self.paused_until = max(self.paused_until, time.monotonic() + wait)
+
+        if status in THROTTLE_STATUSES:
+            for controller in self.controllers:
+                controller.on_throttle()
+            if status == 429:
+                # Rate limiting means the host is up and answering
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+        else:
+            for controller in self.controllers:
+                controller.on_failure()
+            self.breaker.record_failure()
+        return status is None or status in RETRYABLE_STATUSES
+
+
+def governed_get(session, url, governor, max_retries=3, timeout=30, headers=None, metrics=None):
+    """
+    Sequential GET paced and protected by a HostGovernor.
+
+    Waits out Retry-After pauses and the governor's current request interval,
+    retries 429/5xx responses and network errors with backoff, and refuses to
+    send anything while the host's circuit breaker is open. Every attempt is
+    recorded in metrics (a RunMetrics) when one is given.
+
+    Returns:
+        The final requests.Response (which may still be an error status)
+
+    Raises:
+        CircuitOpenError if the breaker is open, or the last network error
+    """
+    for attempt in range(max_retries + 1):
+        if not governor.breaker.allow():
+            raise CircuitOpenError(f"Circuit open - not requesting {url}")
+
+        wait = max(governor.pause_remaining(), governor.interval_remaining())
+        if wait > 0:
+            time.sleep(wait)
+        governor.last_request = time.monotonic()
+
+        response = None
+        retry_after = None
+        start_time = time.monotonic()
+        try:
+            response = session.get(url, timeout=timeout, headers=headers)
+            status = response.status_code
+            retry_after = response.headers.get('Retry-After')
+        except NETWORK_ERRORS as e:
+            status = None
+            error = e
+
+        elapsed = time.monotonic() - start_time
+        retry = governor.record(status, elapsed, retry_after)
+        if metrics is not None:
+            metrics.record_request(url, status, elapsed, len(response.content) if response is not None else 0,
+                                   retry=retry and attempt < max_retries)
+        if not retry or attempt == max_retries:
+            if response is None:
+                raise error
+            return response
+
+        print(f"Retrying {url} (attempt {attempt + 2}/{max_retries + 1}, status {status})")
+        if not retry_after:
+            time.sleep(backoff_delay(attempt))
@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+# Next to the scripts, like the export ID cache, so runs from any directory share it
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".response_cache")
+
+
+def _atomic_write(path, data):
+    """Write bytes to path via a temporary file, so an interrupted run never leaves a torn file."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache of HTTP response bodies with conditional revalidation.
+
+    Bodies are stored once under blobs/<sha256>, so identical deck lists share a
+    file. index.json maps a cache key (deck ID plus export format) to the blob and
+    the validators the server sent (ETag, Last-Modified). On the next run,
+    conditional_headers() turns those into If-None-Match / If-Modified-Since, and
+    a 304 answer is served from the stored blob.
+
+    Args:
+        cache_dir: Directory holding index.json and the blobs
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    @staticmethod
+    def key(deck_id, export_format):
+        """Cache key for a deck in one export format (e.g. the export ID, or 'json')."""
+        return f"{deck_id}:{export_format}"
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest)
+
+    def lookup(self, key):
+        """Return the cached body for key, or None if it isn't cached (or its blob went missing)."""
+        entry = self.index.get(key)
+        if not entry:
+            return None
+        try:
+            with open(self._blob_path(entry['sha256']), 'rb') as f:
+                return f.read().decode('utf-8')
+        except OSError:
+            return None
+
+    def conditional_headers(self, key):
+        """Request headers that let the server answer 304 if the cached copy is still current."""
+        entry = self.index.get(key)
+        if not entry or self.lookup(key) is None:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, key, body, headers):
+        """
+        Record a 200 response body and its validators.
+
+        Args:
+            key: Cache key from ResponseCache.key
+            body: Response text
+            headers: Response headers (any mapping with .get)
+
+        Returns:
+            The body's sha256 hex digest
+        """
+        data = body.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            _atomic_write(blob_path, data)
+        self.index[key] = {
+            'sha256': digest,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        self.misses += 1
+        return digest
+
+    def revalidated(self, key):
+        """Note a 304 for key and return the cached body."""
+        self.index[key]['fetched_at'] = time.time()
+        self.hits += 1
+        return self.lookup(key)
+
+    def resolve(self, key, status, body, headers):
+        """
+        Turn a response into the body to use: stores 200s, serves 304s from the cache.
+
+        Returns:
+            The response body, or None if the status was neither 200 nor a usable 304
+        """
+        if status == 200:
+            self.store(key, body, headers)
+            return body
+        if status == 304 and key in self.index:
+            return self.revalidated(key)
+        return None
+
+    def save(self):
+        """Write the index to disk."""
+        _atomic_write(self.index_file, json.dumps(self.index, indent=1).encode('utf-8'))
+
+    def summary(self):
+        return f"{self.hits} unchanged (304), {self.misses} downloaded, {len(self.index)} cached"
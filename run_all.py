@@ -1,4 +1,5 @@
 import subprocess
+import browser_pool
 
 #todo automatically run all
 
@@ -10,7 +11,18 @@ scripts = [
     "5_winrate_based_analytics.py"
 ]
 
-if __name__ == "__main__":
-    #todo: automatically initialize the scripts, so I don't need to type this out. Just look for scripts that are in the same directory
+def run_scripts():
     for script in scripts:
         subprocess.run(["python", script], check=True)
+
+if __name__ == "__main__":
+    #todo: automatically initialize the scripts, so I don't need to type this out. Just look for scripts that are in the same directory
+    # Keep one warm browser alive across the scraping stages instead of cold-starting Chrome in each
+    try:
+        browser_pool.find_chrome_binary()
+    except FileNotFoundError as e:
+        print(f"Browser pool unavailable ({e}), each stage will start its own browser")
+        run_scripts()
+    else:
+        with browser_pool.serve(size=1):
+            run_scripts()
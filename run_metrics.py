@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Histogram bucket upper bounds in seconds: 1ms doubling up to ~65s, then everything slower
+BUCKET_BOUNDS = [0.001 * 2 ** i for i in range(17)]
+
+
+class Histogram:
+    """Durations counted into fixed, doubling buckets, with exact count, sum, min and max."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(BUCKET_BOUNDS) and seconds > BUCKET_BOUNDS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of observations (capped at the max)."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        buckets = {}
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count:
+                label = f"<={BUCKET_BOUNDS[index]:g}" if index < len(BUCKET_BOUNDS) else f">{BUCKET_BOUNDS[-1]:g}"
+                buckets[label] = bucket_count
+        return {'count': self.count, 'sum': round(self.total, 6), 'min': self.min, 'max': self.max,
+                'mean': self.total / self.count if self.count else 0.0,
+                'p50': self.percentile(0.50), 'p90': self.percentile(0.90), 'p99': self.percentile(0.99),
+                'buckets': buckets}
+
+
+class RunMetrics:
+    """
+    Timings and counters for one scraper run.
+
+    Steps (navigation, DOM waits, export clicks, HTTP fetches, file writes...) each
+    get a latency histogram and a timeout count. HTTP requests are also counted per
+    host by status code, with bytes received and retries. print_summary shows the
+    step table on the console; write_report saves everything as JSON.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.steps = defaultdict(Histogram)
+        self.timeouts = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.requests = defaultdict(lambda: {'statuses': defaultdict(int), 'bytes': 0, 'retries': 0,
+                                             'latency': Histogram()})
+
+    def record(self, step, seconds, timed_out=False):
+        with self.lock:
+            self.steps[step].observe(seconds)
+            if timed_out:
+                self.timeouts[step] += 1
+
+    @contextmanager
+    def step(self, name):
+        """Time the body of a with-block under the given step name."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start_time)
+
+    def count(self, name, amount=1):
+        """Add to a named counter, e.g. decks saved or cache hits."""
+        with self.lock:
+            self.counters[name] += amount
+
+    def record_request(self, url, status, seconds, size=0, retry=False):
+        """
+        Record one HTTP attempt.
+
+        Args:
+            url: Request URL (requests are grouped by host)
+            status: HTTP status code, or None for a network error
+            seconds: Time until the response body was read
+            size: Bytes in the response body
+            retry: True if the attempt is going to be retried
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            stats = self.requests[host]
+            stats['statuses'][str(status) if status is not None else 'error'] += 1
+            stats['bytes'] += size
+            stats['latency'].observe(seconds)
+            if retry:
+                stats['retries'] += 1
+
+    def summary(self):
+        """Return one line per step with count, mean, p50, p99, max and timeouts, then one per host."""
+        lines = []
+        with self.lock:
+            for step, histogram in self.steps.items():
+                lines.append(f"  {step:<24} n={histogram.count:<5} mean={histogram.total / histogram.count:.3f}s "
+                             f"p50={histogram.percentile(0.5):.3f}s p99={histogram.percentile(0.99):.3f}s "
+                             f"max={histogram.max:.3f}s timeouts={self.timeouts[step]}")
+            for host, stats in self.requests.items():
+                statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats['statuses'].items()))
+                lines.append(f"  {host:<24} requests={stats['latency'].count} ({statuses}) retries={stats['retries']} "
+                             f"{stats['bytes'] / 1024:.0f} KiB p99={stats['latency'].percentile(0.99):.3f}s")
+        return "\n".join(lines)
+
+    def print_summary(self, title="Step timings"):
+        if self.steps or self.requests:
+            print(f"{title}:\n{self.summary()}")
+
+    def report(self, **context):
+        """The run report as a JSON-serialisable dictionary; context is stored under 'run'."""
+        finished_at = time.time()
+        with self.lock:
+            return {
+                'run': dict(context, started_at=self.started_at, finished_at=finished_at,
+                            elapsed=finished_at - self.started_at),
+                'steps': {step: dict(histogram.to_dict(), timeouts=self.timeouts[step])
+                          for step, histogram in self.steps.items()},
+                'requests': {host: {'statuses': dict(stats['statuses']), 'bytes': stats['bytes'],
+                                    'retries': stats['retries'], 'latency': stats['latency'].to_dict()}
+                             for host, stats in self.requests.items()},
+                'counters': dict(self.counters),
+            }
+
+    def write_report(self, path, **context):
+        """Write the run report to path as JSON (atomically) and return the report."""
+        report = self.report(**context)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        os.replace(temp_path, path)
+        print(f"Run report saved to {path}")
+        return report
@@ -0,0 +1,213 @@
+import os
+import time
+import socket
+import argparse
+import multiprocessing
+import msgpack
+import pandas as pd
+from deck_fetcher import DeckFetcher, DeckFetchError, DeckNotFound, extract_deck_id
+from fetch_priority import DEFAULT_PRIORITY, add_priority_argument, prioritize
+from deck_store import DeckRecord, DeckStore, deck_record_from_json, deck_record_from_text
+from job_journal import SUMMARY_HEADER
+from work_queue import WorkQueue
+
+QUEUE_FILE_NAME = "work_queue.sqlite3"
+
+
+def run_worker(queue_path, requests_per_second=1.0, max_requests_per_second=2.0, lease_seconds=120, batch_size=5):
+    """
+    Worker process: lease decks from the queue and fetch them from the Moxfield API until none are left.
+
+    Each worker has its own DeckFetcher (session and rate controller). Results go
+    back into the queue; the coordinator is the only process that writes files.
+    """
+    queue = WorkQueue(queue_path)
+    fetcher = DeckFetcher(requests_per_second=requests_per_second, max_requests_per_second=max_requests_per_second)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    fetched = 0
+
+    while True:
+        items = queue.lease(owner, batch_size, lease_seconds)
+        if not items:
+            if queue.remaining() == 0:
+                break
+            # Other workers hold the rest; wait in case one of them dies and its lease expires
+            time.sleep(1.0)
+            continue
+
+        for deck_id, url in items:
+            try:
+                deck_text, source, deck_json = fetcher.fetch_structured(deck_id)
+                if deck_json is not None:
+                    record = deck_record_from_json(deck_json, deck_id)
+                else:
+                    record = deck_record_from_text(deck_text, deck_id)
+                result = msgpack.packb({'record': record.to_dict(), 'text': deck_text}, use_bin_type=True)
+                queue.complete(deck_id, owner, result)
+                fetched += 1
+            except DeckNotFound:
+                queue.complete(deck_id, owner, None, status='not_found')
+            except DeckFetchError as e:
+                print(f"[{owner}] {deck_id} failed: {e}")
+                queue.fail(deck_id, owner, str(e))
+
+    print(f"[{owner}] Worker finished after fetching {fetched} decks")
+    queue.close()
+
+
+def load_rows(csv_files, priority=DEFAULT_PRIORITY):
+    """
+    Read the deck rows of one or more stage 1 CSVs.
+
+    Returns:
+        List of dictionaries with the source CSV, row index, deck ID and the summary
+        fields, in fetch priority order across all the CSVs (see fetch_priority.prioritize)
+    """
+    frames = []
+    for csv_file in csv_files:
+        df = pd.read_csv(csv_file)
+        print(f"Loaded {len(df)} records from {csv_file}")
+        frames.append(df.assign(source=csv_file, row_index=df.index))
+    if not frames:
+        return []
+
+    rows = []
+    for _, row in prioritize(pd.concat(frames, ignore_index=True), priority).iterrows():
+        url = row['url']
+        valid = isinstance(url, str) and url.startswith('http')
+        rows.append({
+            'source': row['source'],
+            'row_index': row['row_index'],
+            'url': url,
+            'deck_id': extract_deck_id(url) if valid else None,
+            'name': row['name'],
+            'placement': row.get('placement', 'Unknown'),
+            'players': row.get('total_players', 'Unknown'),
+            'wins': row.get('wins', 'Unknown'),
+            'losses': row.get('losses', 'Unknown'),
+            'draws': row.get('draws', 'Unknown'),
+        })
+    return rows
+
+
+def write_outputs(queue, rows, output_dir, multiple_sources):
+    """
+    Store every fetched deck as a snapshot and link each input row's text file to it.
+
+    With several input CSVs, each one's files and deck_summary.csv go in a
+    subdirectory named after it; the deck store and snapshots are shared.
+    """
+    store = DeckStore(output_dir)
+    outcomes = {}
+    for deck_id, status, result, error in queue.results():
+        if status == 'done':
+            data = msgpack.unpackb(result, raw=False)
+            snapshot, _ = store.add(DeckRecord.from_dict(data['record']), data['text'])
+            outcomes[deck_id] = ('Success', snapshot)
+        elif status == 'not_found':
+            outcomes[deck_id] = ('Skipped - Page Not Found', None)
+        else:
+            outcomes[deck_id] = (f"Failed - {error}", None)
+
+    summaries = {}
+    for row in sorted(rows, key=lambda row: (row['source'], row['row_index'])):
+        row_dir = output_dir
+        if multiple_sources:
+            row_dir = os.path.join(output_dir, os.path.splitext(os.path.basename(row['source']))[0])
+        os.makedirs(row_dir, exist_ok=True)
+
+        deck_id = row['deck_id'] or f"unknown_id_{row['row_index']+1}"
+        if row['deck_id'] is None:
+            status, snapshot = "Skipped - Invalid URL", None
+        else:
+            status, snapshot = outcomes.get(deck_id, ("Failed - Not fetched", None))
+        if snapshot is not None:
+            store.link(snapshot, os.path.join(row_dir, f"{row['row_index']+1:03d}_{deck_id}.txt"))
+
+        summaries.setdefault(row_dir, []).append(
+            f'"{row["name"]}",{row["placement"]},{row["players"]},{row["wins"]},{row["losses"]},'
+            f'{row["draws"]},"{row["url"]}","{deck_id}","{status}"\n')
+
+    for row_dir, lines in summaries.items():
+        with open(os.path.join(row_dir, "deck_summary.csv"), 'w', encoding='utf-8') as f:
+            f.write(SUMMARY_HEADER)
+            f.writelines(lines)
+    return outcomes
+
+
+def scrape_sharded(csv_files, output_dir="deck_lists", workers=4, requests_per_second=2.0, max_requests_per_second=8.0,
+                   lease_seconds=120, max_restarts=3, priority=DEFAULT_PRIORITY):
+    """
+    Fetch the decks of one or more stage 1 CSVs with several worker processes sharing a work queue.
+
+    The queue (output_dir/work_queue.sqlite3) holds one item per deck ID, so it
+    persists across runs: rerunning only fetches what is still unfinished or
+    failed last time (see WorkQueue.add for the retry cap). The
+    request rate is split evenly between the workers, each adapting its share.
+
+    Args:
+        csv_files: Stage 1 CSV files
+        output_dir: Directory for the deck store, snapshots and per-row text files
+        workers: Number of worker processes
+        requests_per_second: Starting request rate across all workers
+        max_requests_per_second: Request rate ceiling across all workers
+        lease_seconds: How long a worker may hold a batch before it's handed to another worker
+        max_restarts: Worker processes to restart after crashes, in total
+        priority: Order decks are fetched in, across all the CSVs (see fetch_priority.prioritize)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rows = load_rows(csv_files, priority)
+    queue_path = os.path.join(output_dir, QUEUE_FILE_NAME)
+    queue = WorkQueue(queue_path)
+    # Each deck is queued at the position of its highest-priority row
+    items = {}
+    for row in rows:
+        if row['deck_id'] and row['deck_id'] not in items:
+            items[row['deck_id']] = (row['deck_id'], row['url'], len(items))
+    added = queue.add(items.values())
+    print(f"{len(rows)} rows, {added} new decks queued, {queue.remaining()} decks to fetch")
+
+    def start_worker():
+        process = multiprocessing.Process(
+            target=run_worker, args=(queue_path, requests_per_second / workers, max_requests_per_second / workers, lease_seconds))
+        process.start()
+        return process
+
+    start_time = time.time()
+    processes = [start_worker() for _ in range(min(workers, queue.remaining()))]
+    restarts = 0
+    last_report = start_time
+    while any(process.is_alive() for process in processes):
+        time.sleep(1.0)
+        for i, process in enumerate(processes):
+            if not process.is_alive() and process.exitcode != 0 and queue.remaining() and restarts < max_restarts:
+                # Its leases expire on their own; a replacement keeps the worker count up
+                print(f"Worker {process.pid} exited with code {process.exitcode}, starting a replacement")
+                processes[i] = start_worker()
+                restarts += 1
+        if time.time() - last_report >= 10:
+            print(f"Queue: {queue.counts()}")
+            last_report = time.time()
+
+    elapsed = time.time() - start_time
+    print(f"Workers finished in {elapsed:.1f}s. Queue: {queue.counts()}")
+
+    outcomes = write_outputs(queue, rows, output_dir, multiple_sources=len(csv_files) > 1)
+    queue.close()
+    succeeded = sum(1 for status, _ in outcomes.values() if status == 'Success')
+    print(f"{succeeded}/{len(outcomes)} decks fetched; results saved to {output_dir}")
+    return outcomes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch Moxfield decks with several worker processes sharing a work queue")
+    parser.add_argument('csv_files', nargs='+', help="Stage 1 CSV files")
+    parser.add_argument('--workers', type=int, default=4, help="Worker processes")
+    parser.add_argument('--output-dir', default="deck_lists", help="Output directory")
+    parser.add_argument('--rps', type=float, default=2.0, help="Starting requests per second across all workers")
+    parser.add_argument('--max-rps', type=float, default=8.0, help="Maximum requests per second across all workers")
+    parser.add_argument('--lease-seconds', type=float, default=120, help="Seconds before a crashed worker's decks are re-leased")
+    add_priority_argument(parser)
+    args = parser.parse_args()
+    scrape_sharded(args.csv_files, args.output_dir, args.workers, args.rps, args.max_rps, args.lease_seconds,
+                   priority=args.priority)
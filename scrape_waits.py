@@ -0,0 +1,100 @@
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+
+# Check the DOM every 50ms instead of WebDriverWait's default 500ms
+POLL_INTERVAL = 0.05
+
+
+def wait_for(driver, condition, timeout=10, step=None, timer=None, poll=POLL_INTERVAL):
+    """
+    Poll a DOM condition until it returns something truthy.
+
+    Args:
+        driver: Selenium WebDriver
+        condition: Callable taking the driver, e.g. one of the conditions below
+        timeout: Seconds to wait before giving up
+        step: Name to record the wait under in the timer
+        timer: Optional RunMetrics
+        poll: Seconds between checks
+
+    Returns:
+        The condition's return value, or None if the timeout expired
+    """
+    start_time = time.perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll,
+                               ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)).until(condition)
+        timed_out = False
+    except TimeoutException:
+        result = None
+        timed_out = True
+
+    if timer is not None and step:
+        timer.record(step, time.perf_counter() - start_time, timed_out=timed_out)
+    return result
+
+
+def document_ready():
+    """The page has finished parsing and running its synchronous scripts."""
+    def condition(driver):
+        return driver.execute_script("return document.readyState") == "complete"
+    return condition
+
+
+def element_count_at_least(locator, count):
+    """At least count elements match the locator; returns the matched elements."""
+    def condition(driver):
+        elements = driver.find_elements(*locator)
+        return elements if len(elements) >= count else False
+    return condition
+
+
+def element_count_greater_than(locator, count):
+    """More than count elements match the locator, e.g. after a "Load More" click."""
+    return element_count_at_least(locator, count + 1)
+
+
+def element_visible(locator):
+    """The first element matching the locator is displayed; returns it."""
+    def condition(driver):
+        for element in driver.find_elements(*locator):
+            if element.is_displayed():
+                return element
+        return False
+    return condition
+
+
+def element_clickable(element):
+    """An already located element is displayed and enabled; returns it."""
+    def condition(driver):
+        return element if element.is_displayed() and element.is_enabled() else False
+    return condition
+
+
+def value_non_empty(locator):
+    """The first element matching the locator has a non-empty value (e.g. a populated textarea)."""
+    def condition(driver):
+        for element in driver.find_elements(*locator):
+            value = element.get_attribute('value')
+            if value:
+                return value
+        return False
+    return condition
+
+
+def any_of(*conditions):
+    """Any one of the conditions holds; returns (index, result) of the first that does."""
+    def condition(driver):
+        for index, sub_condition in enumerate(conditions):
+            result = sub_condition(driver)
+            if result:
+                return index, result
+        return False
+    return condition
+
+
+def xpath(expression):
+    """Shorthand for an XPath locator tuple."""
+    return (By.XPATH, expression)
@@ -122,5 +122,793 @@ class PreprocessingIntegrationTest(unittest.TestCase):
         shutil.rmtree(self.test_input_dir)
         shutil.rmtree(self.test_output_dir)
 
+    def test_parallel_matches_serial(self):
+        """Test that the process pool writes the same files as the serial loop, parsing shared decks once."""
+        import importlib
+        preprocessing = importlib.import_module('3_deck_preprocessing')
+
+        shutil.copy(self.sample_deck, os.path.join(self.test_input_dir, "copy_of_sample_deck.txt"))
+        with open(os.path.join(self.test_input_dir, "other_deck.txt"), 'w', encoding='utf-8') as f:
+            f.write("4 Lightning Bolt (M10) 146\n1 Magda, Brazen Outlaw (ELD) 135\n")
+
+        serial_dir = os.path.join(self.test_output_dir, "serial")
+        parallel_dir = os.path.join(self.test_output_dir, "parallel")
+        preprocessing.preprocess_decklists(self.test_input_dir, serial_dir)
+        preprocessing.preprocess_decklists(self.test_input_dir, parallel_dir, workers=2)
+
+        serial = {os.path.basename(path): open(path, encoding='utf-8').read() for path in glob.glob(os.path.join(serial_dir, "*.txt"))}
+        parallel = {os.path.basename(path): open(path, encoding='utf-8').read() for path in glob.glob(os.path.join(parallel_dir, "*.txt"))}
+        self.assertEqual(len(serial), 3)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(serial["other_deck.txt"].splitlines()[:2], ["Lightning Bolt1", "Lightning Bolt2"])
+
+    def test_incremental_rerun(self):
+        """Test that a rerun only rewrites changed decks, removes vanished ones and redoes everything for a new parser version."""
+        import importlib
+        from unittest import mock
+        preprocessing = importlib.import_module('3_deck_preprocessing')
+
+        other_deck = os.path.join(self.test_input_dir, "other_deck.txt")
+        with open(other_deck, 'w', encoding='utf-8') as f:
+            f.write("1 Magda, Brazen Outlaw (ELD) 135\n")
+        preprocessing.preprocess_decklists(self.test_input_dir, self.test_output_dir)
+
+        with mock.patch.object(preprocessing, 'parse_deck_text', side_effect=AssertionError("reparsed")):
+            preprocessing.preprocess_decklists(self.test_input_dir, self.test_output_dir)
+
+        os.remove(other_deck)
+        with open(os.path.join(self.test_input_dir, "new_deck.txt"), 'w', encoding='utf-8') as f:
+            f.write("2 Lightning Bolt (M10) 146\n")
+        parsed = []
+        with mock.patch.object(preprocessing, 'parse_deck_text', side_effect=lambda text: parsed.append(text) or ["card"]):
+            preprocessing.preprocess_decklists(self.test_input_dir, self.test_output_dir)
+        self.assertEqual(parsed, ["2 Lightning Bolt (M10) 146\n"])
+        self.assertEqual(sorted(os.listdir(self.test_output_dir)),
+                         [preprocessing.MANIFEST_FILE, "new_deck.txt", "sample_deck.txt"])
+
+        with mock.patch.object(preprocessing, 'PARSER_VERSION', preprocessing.PARSER_VERSION + 1):
+            preprocessing.preprocess_decklists(self.test_input_dir, self.test_output_dir)
+        with open(os.path.join(self.test_output_dir, "new_deck.txt"), 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "Lightning Bolt1\nLightning Bolt2\n")
+
+class EdhTop16IngestTest(unittest.TestCase):
+    """Test the browserless EDHTop16 ingest against the saved Magda page."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        self.html_file = os.path.join(self.project_root, "Magda, Brazen Outlaw _ EDHTop 16.html")
+
+    def test_next_data_entries(self):
+        """Test that the embedded __NEXT_DATA__ payload yields the rendered deck entries."""
+        from edhtop16_api import scrape_edhtop16_http
+
+        data = scrape_edhtop16_http(html_file=self.html_file)
+
+        self.assertEqual(data['commander'], "Magda, Brazen Outlaw")
+        self.assertEqual(len(data['decks']), 48)
+
+        first = data['decks'][0]
+        self.assertEqual(first['deck_id'], "bgYPXZKYskuW8JPJoOwzHg")
+        self.assertEqual(first['name'], "🥇 Brandon Austin")
+        self.assertEqual(first['tournament'], "AGL/CCS $10,000 CEDH Main Event")
+        self.assertEqual(first['date'], "February 1st 2025")
+        self.assertEqual((first['placement'], first['total_players']), ("1", "129"))
+        self.assertEqual((first['wins'], first['losses'], first['draws']), ("5", "0", "3"))
+
+    def test_html_parser_matches_next_data(self):
+        """Test that the lxml parser, the BeautifulSoup path and __NEXT_DATA__ agree."""
+        from edhtop16_api import scrape_edhtop16_http
+        from edhtop16_parser import parse_edhtop16_html, parse_edhtop16_html_bs4
+
+        parsed = parse_edhtop16_html(self.html_file)
+
+        self.assertEqual(parsed, parse_edhtop16_html_bs4(self.html_file))
+        self.assertEqual(parsed, scrape_edhtop16_http(html_file=self.html_file))
+
+    def test_new_entries_stop_at_known_entry(self):
+        """Test that incremental paging stops at the first known entry and keeps the display name."""
+        import json
+        from edhtop16_api import entry_key, entry_to_deck, extract_next_data, scrape_edhtop16_http
+
+        with open(self.html_file, 'r', encoding='utf-8') as f:
+            edges = extract_next_data(f.read())['edges']
+        known_keys = {entry_key(entry_to_deck(edges[2]['node'], ""))}
+
+        class Response:
+            status_code = 200
+            content = b""
+
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                page_info = {'endCursor': edges[3]['cursor'], 'hasNextPage': True}
+                return {'data': {'commander': {'name': "Magda, Brazen Outlaw",
+                                               'entries': {'edges': edges[:4], 'pageInfo': page_info}}}}
+
+        class Session:
+            def __init__(self):
+                self.payloads = []
+
+            def post(self, url, json=None, timeout=None):
+                self.payloads.append(json)
+                return Response()
+
+        session = Session()
+        data = scrape_edhtop16_http("https://edhtop16.com/commander/magda-brazen-outlaw", session=session,
+                                    known_keys=known_keys)
+
+        self.assertEqual(len(session.payloads), 1)
+        self.assertEqual(session.payloads[0]['variables']['sortBy'], "NEW")
+        self.assertEqual(data['commander'], "Magda, Brazen Outlaw")
+        self.assertEqual([deck['deck_id'] for deck in data['decks']],
+                         [entry_to_deck(edge['node'], "")['deck_id'] for edge in edges[:2]])
+        self.assertEqual({deck['commander'] for deck in data['decks']}, {"Magda, Brazen Outlaw"})
+
+class EdhTop16BatchTest(unittest.TestCase):
+    """Test batch scraping against the mock EDHTop16 server."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        import edhtop16_api
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+        from mock_servers import MockState, start_mock_server
+
+        self.test_dir = tempfile.mkdtemp()
+        self.server, base_url = start_mock_server(MockState(entries=100))
+        self.saved_globals = (edhtop16_api.EDHTOP16_BASE_URL, edhtop16_api.GRAPHQL_URL)
+        edhtop16_api.EDHTOP16_BASE_URL, edhtop16_api.GRAPHQL_URL = base_url, f"{base_url}/api/graphql"
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        import edhtop16_api
+        edhtop16_api.EDHTOP16_BASE_URL, edhtop16_api.GRAPHQL_URL = self.saved_globals
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def test_batch_matches_serial(self):
+        """Test that the worker pool returns jobs in order and writes the same CSVs as scraping one job at a time."""
+        import importlib
+        from edhtop16_api import commander_url, scrape_edhtop16_http
+        stage1 = importlib.import_module('1_edh16_scrape')
+
+        commanders, time_periods = ["Magda, Brazen Outlaw", "Winota, Joiner of Forces"], ["POST_BAN", "ONE_YEAR"]
+        batch_dir = os.path.join(self.test_dir, "batch")
+        results = stage1.scrape_batch(commanders, time_periods, output_dir=batch_dir, max_workers=3)
+
+        jobs = [(commander, time_period) for commander in commanders for time_period in time_periods]
+        self.assertEqual([result[:2] for result in results], jobs)
+        for index, (commander, time_period, deck_count, output_file) in enumerate(results):
+            serial_file = os.path.join(self.test_dir, f"serial_{index}.csv")
+            stage1.save_decks_csv(scrape_edhtop16_http(commander_url(commander, time_period))['decks'], serial_file)
+            self.assertEqual(deck_count, 100)
+            self.assertEqual(output_file, os.path.join(batch_dir, stage1.safe_filename(commander), f"{time_period}.csv"))
+            with open(output_file, 'r', encoding='utf-8') as batch, open(serial_file, 'r', encoding='utf-8') as serial:
+                self.assertEqual(batch.read(), serial.read())
+
+class ResourceStatsTest(unittest.TestCase):
+    """Test the transfer and blocking tallies read from Chrome's performance log."""
+
+    def test_performance_log_totals(self):
+        """Test that finished loads add their bytes, blocked loads are counted and a missing log reads as empty."""
+        import json
+        from selenium.common.exceptions import WebDriverException
+        from browser_profile import ResourceStats, read_performance_log
+
+        def entry(method, **params):
+            return {'level': "INFO", 'timestamp': 0, 'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+        class Driver:
+            def __init__(self, entries):
+                self.entries = entries
+
+            def get_log(self, log_type):
+                if self.entries is None:
+                    raise WebDriverException("log type 'performance' not found")
+                entries, self.entries = self.entries, []
+                return entries
+
+        driver = Driver([entry('Network.requestWillBeSent', requestId="1"),
+                         entry('Network.loadingFinished', requestId="1", encodedDataLength=1536),
+                         entry('Network.loadingFinished', requestId="2", encodedDataLength=512.0),
+                         entry('Network.loadingFailed', requestId="3", blockedReason="inspector"),
+                         entry('Network.loadingFailed', requestId="4", errorText="net::ERR_ABORTED")])
+        stats = ResourceStats()
+        stats.collect(driver, 1.5)
+        stats.collect(driver, 0.5)
+
+        self.assertEqual((stats.pages, stats.requests, stats.bytes_transferred, stats.blocked_requests), (2, 2, 2048, 1))
+        self.assertEqual(stats.load_seconds, 2.0)
+        self.assertEqual(read_performance_log(Driver(None)), [])
+
+class NetworkCaptureTest(unittest.TestCase):
+    """Test picking the deck JSON out of the page's network traffic."""
+
+    def test_take_json_matches_deck_api_pattern(self):
+        """Test that only a finished JSON response for the requested deck is read, and nothing else is returned."""
+        import json
+        import base64
+        from deck_fetcher import deck_api_pattern
+        from network_capture import NetworkCapture
+
+        def entry(method, **params):
+            return {'level': "INFO", 'timestamp': 0, 'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+        def response(request_id, url, mime_type="application/json"):
+            return entry('Network.responseReceived', requestId=request_id, response={'url': url, 'mimeType': mime_type})
+
+        api = "https://api2.moxfield.com"
+        bodies = {"1": {'publicId': "mockAB"}, "2": {'publicId': "mockA"}, "3": {'publicId': "other"}}
+
+        class Driver:
+            def __init__(self, entries):
+                self.entries = entries
+                self.body_requests = []
+
+            def get_log(self, log_type):
+                entries, self.entries = self.entries, []
+                return entries
+
+            def execute_cdp_cmd(self, command, params):
+                if command == 'Network.getResponseBody':
+                    self.body_requests.append(params['requestId'])
+                    body = json.dumps(bodies[params['requestId']]).encode('utf-8')
+                    return {'body': base64.b64encode(body).decode('ascii'), 'base64Encoded': True}
+                return {}
+
+        driver = Driver([response("1", f"{api}/v3/decks/all/mockAB"),
+                         entry('Network.loadingFinished', requestId="1"),
+                         response("2", f"{api}/v3/decks/all/mockA?allowMultiplePrintings=true"),
+                         response("3", f"{api}/v2/decks/all/other"),
+                         response("4", f"{api}/v2/decks/all/mockA", mime_type="text/html"),
+                         entry('Network.loadingFinished', requestId="4"),
+                         entry('Network.loadingFinished', requestId="2")])
+        capture = NetworkCapture(driver)
+
+        self.assertEqual(capture.take_json(deck_api_pattern("mockA"), timeout=0), {'publicId': "mockA"})
+        self.assertEqual(driver.body_requests, ["2"])
+        self.assertIsNone(capture.take_json(deck_api_pattern("mockA"), timeout=0))
+        # The other deck's response never finished loading
+        self.assertIsNone(capture.take_json(deck_api_pattern("other"), timeout=0))
+        self.assertEqual(driver.body_requests, ["2"])
+        self.assertEqual(len(capture.drain_messages()), 7)
+
+class TokenBucketTest(unittest.TestCase):
+    """Test the async downloader's rate limiter."""
+
+    def test_token_bucket_paces_requests(self):
+        """Test that acquiring more tokens than the burst waits for the refill rate."""
+        import asyncio
+        import time
+        from async_downloader import TokenBucket
+
+        async def take(count):
+            bucket = TokenBucket(rate=50, capacity=1)
+            for _ in range(count):
+                await bucket.acquire()
+
+        start_time = time.monotonic()
+        asyncio.run(take(6))
+        # The first token is free; the other five arrive at 50 per second
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.09)
+
+class DeckStoreTest(unittest.TestCase):
+    """Test the structured deck store."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.test_dir)
+
+    def test_records_round_trip(self):
+        """Test that records built from deck JSON load back with boards, quantities and printings."""
+        from deck_store import DeckStore, deck_record_from_json
+
+        deck_json = {
+            'name': "Magda Storm",
+            'lastUpdatedAtUtc': "2025-02-01T10:00:00Z",
+            'commanders': {"Magda, Brazen Outlaw": {'quantity': 1, 'card': {'name': "Magda, Brazen Outlaw", 'set': "eld", 'cn': "135"}}},
+            'mainboard': {"Mountain": {'quantity': 4, 'card': {'name': "Mountain", 'set': "unf", 'cn': "239"}}},
+            'sideboard': {"Pyroblast": {'quantity': 1, 'card': {'name': "Pyroblast"}}},
+        }
+        store = DeckStore(self.test_dir)
+        store.append(deck_record_from_json(deck_json, "old"))
+        store.append(deck_record_from_json(deck_json, "abc"))
+        store.append(deck_record_from_json(dict(deck_json, name="Magda Storm v2"), "abc"))
+
+        records = store.load()
+        self.assertEqual(set(records), {"old", "abc"})
+        self.assertEqual(records["abc"].name, "Magda Storm v2")
+        self.assertEqual([(card.quantity, card.name, card.set_code) for card in records["abc"].main_deck()],
+                         [(1, "Magda, Brazen Outlaw", "ELD"), (4, "Mountain", "UNF")])
+        self.assertEqual([card.name for card in records["abc"].board('sideboard')], ["Pyroblast"])
+
+class DeckArchiveTest(unittest.TestCase):
+    """Test the packed deck list archive."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.test_dir)
+
+    def test_archive_matches_directory(self):
+        """Test that an archive spread over several shards reads back the same as the directory it was packed from."""
+        from deck_archive import DeckArchiveWriter, PackedDeckLists, open_decklists, pack_directory
+
+        deck_dir = os.path.join(self.test_dir, "processed_decklists")
+        os.makedirs(deck_dir)
+        for i in range(1, 6):
+            with open(os.path.join(deck_dir, f"{i:03d}_deck{i}.txt"), 'w', encoding='utf-8') as f:
+                f.write("".join(f"Test Card {n}\n" for n in range(i * 10)))
+
+        directory = dict(open_decklists(deck_dir))
+        archive_path = pack_directory(deck_dir)
+        with DeckArchiveWriter(archive_path, shard_size=1) as writer:
+            writer.add("006_deck6", "Magda, Brazen Outlaw\n")
+        shutil.rmtree(deck_dir)
+
+        packed = open_decklists(deck_dir)
+        self.assertIsInstance(packed, PackedDeckLists)
+        self.assertEqual(len(packed), 6)
+        self.assertEqual(dict(packed), dict(directory, **{"006_deck6": "Magda, Brazen Outlaw\n"}))
+        self.assertEqual(packed.find("deck3"), "003_deck3")
+        self.assertEqual(packed.read(packed.find("deck6")), "Magda, Brazen Outlaw\n")
+
+class JobJournalTest(unittest.TestCase):
+    """Test the scraper's job journal."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.test_dir)
+
+    def test_legacy_summary_matched_by_url(self):
+        """Test that an old summary with re-appended skipped rows is imported against the right input rows."""
+        from job_journal import JobJournal, SUMMARY_HEADER, journal_key
+
+        url_a, url_b = "https://www.moxfield.com/decks/deckA", "https://www.moxfield.com/decks/deckB"
+        summary_file = os.path.join(self.test_dir, "deck_summary.csv")
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            f.write(SUMMARY_HEADER)
+            f.write('"Bad",1,40,5,0,0,"not a url","","Skipped - Invalid URL"\n')
+            f.write(f'"Alice",2,40,4,1,0,"{url_a}","deckA","Success"\n')
+            f.write('"Bad",1,40,5,0,0,"not a url","","Skipped - Invalid URL"\n')
+            f.write(f'"Bob",3,40,3,2,0,"{url_b}","deckB","Success"\n')
+
+        journal = JobJournal(os.path.join(self.test_dir, "journal.sqlite3"))
+        input_urls = [(0, "not a url"), (1, url_a), (2, url_b), (3, "https://www.moxfield.com/decks/deckC")]
+        self.assertEqual(journal.import_summary_csv(summary_file, input_urls), 3)
+        self.assertTrue(journal.is_done(journal_key(url_a, 1)))
+        self.assertTrue(journal.is_done(journal_key(url_b, 2)))
+        self.assertEqual(journal.get(journal_key(url_b, 2))['title'], "Bob")
+        self.assertEqual(journal.count(), 3)
+
+        journal.export_summary_csv(summary_file)
+        with open(summary_file, 'r', encoding='utf-8') as f:
+            self.assertEqual([line.split(',')[0] for line in f.read().splitlines()[1:]], ['"Bad"', '"Alice"', '"Bob"'])
+        journal.close()
+
+class ResponseCacheTest(unittest.TestCase):
+    """Test the conditional-request response cache."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.test_dir)
+
+    def test_304_replays_cached_body(self):
+        """Test that a stored response is revalidated with If-None-Match and a 304 returns the cached body."""
+        from response_cache import ResponseCache
+
+        cache = ResponseCache(self.test_dir)
+        key = ResponseCache.key("abc", "export-1")
+        self.assertEqual(cache.conditional_headers(key), {})
+        self.assertEqual(cache.resolve(key, 200, "1 Magda, Brazen Outlaw\n", {'ETag': '"v1"'}), "1 Magda, Brazen Outlaw\n")
+        cache.store(ResponseCache.key("copy", "export-1"), "1 Magda, Brazen Outlaw\n", {})
+        cache.save()
+
+        cache = ResponseCache(self.test_dir)
+        self.assertEqual(cache.conditional_headers(key), {'If-None-Match': '"v1"'})
+        self.assertEqual(cache.resolve(key, 304, "", {'ETag': '"v1"'}), "1 Magda, Brazen Outlaw\n")
+        self.assertIsNone(cache.resolve(ResponseCache.key("other", "export-1"), 304, "", {}))
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertEqual(len(glob.glob(os.path.join(self.test_dir, "blobs", "*", "*"))), 1)
+
+class RateControlTest(unittest.TestCase):
+    """Test the adaptive rate controller and circuit breaker."""
+
+    def test_governor_backs_off_and_opens_circuit(self):
+        """Test that a 429 halves the limit and repeated 5xx responses open the circuit."""
+        from rate_control import AIMDController, CircuitBreaker, HostGovernor, parse_retry_after
+
+        governor = HostGovernor(AIMDController(initial=8, maximum=8), CircuitBreaker(failure_threshold=3))
+        self.assertFalse(governor.record(200, 0.1))
+        self.assertTrue(governor.record(429, 0.1, retry_after="2"))
+        self.assertEqual(governor.controller.limit, 4)
+        self.assertGreater(governor.pause_remaining(), 1.5)
+
+        for _ in range(3):
+            governor.record(502, 0.1)
+        self.assertFalse(governor.breaker.allow())
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470), 10.0)
+
+    def test_governed_get_against_mock_server(self):
+        """Test that governed_get grows the rate on 200s, halves it and pauses on a 429, and trips the circuit on 503s."""
+        import time
+        import requests
+        from rate_control import AIMDController, CircuitBreaker, CircuitOpenError, HostGovernor, governed_get
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+        from mock_servers import FaultConfig, MockState, start_mock_server
+
+        faults = FaultConfig(latency=0.0, jitter=0.0)
+        server, base_url = start_mock_server(MockState(faults=faults, entries=0))
+        session = requests.Session()
+        url = f"{base_url}/v2/decks/all/mockA"
+        governor = HostGovernor(AIMDController(initial=8, maximum=16), CircuitBreaker(failure_threshold=3, reset_timeout=0.5))
+        try:
+            self.assertEqual(governed_get(session, url, governor).status_code, 200)
+            self.assertGreater(governor.controller.value, 8)
+
+            # Every request inside a 429 burst, each carrying Retry-After: 1
+            faults.burst_every, faults.burst_length = 3600, 3600
+            self.assertEqual(governed_get(session, url, governor, max_retries=0).status_code, 429)
+            self.assertLess(governor.controller.value, 5)
+            self.assertGreater(governor.pause_remaining(), 0.5)
+            self.assertEqual(governor.breaker.state, 'closed')
+
+            faults.burst_every, faults.error_rate = 0.0, 1.0
+            for _ in range(3):
+                self.assertEqual(governed_get(session, url, governor, max_retries=0).status_code, 503)
+            self.assertEqual(governor.breaker.state, 'open')
+            with self.assertRaises(CircuitOpenError):
+                governed_get(session, url, governor)
+
+            # After reset_timeout one probe is let through, and its success closes the circuit
+            faults.error_rate = 0.0
+            time.sleep(0.5)
+            self.assertEqual(governed_get(session, url, governor, max_retries=0).status_code, 200)
+            self.assertEqual(governor.breaker.state, 'closed')
+        finally:
+            session.close()
+            server.shutdown()
+            server.server_close()
+
+class RunMetricsTest(unittest.TestCase):
+    """Test the scrapers' run metrics."""
+
+    def test_report_histograms_and_requests(self):
+        """Test that steps land in doubling buckets and requests are counted per host and status."""
+        from run_metrics import RunMetrics
+
+        metrics = RunMetrics()
+        for seconds in [0.0015, 0.003, 0.003, 0.5]:
+            metrics.record("navigate", seconds)
+        metrics.record("page_content", 10.0, timed_out=True)
+        metrics.record_request("https://api.moxfield.com/v2/decks/all/abc", 429, 0.2, retry=True)
+        metrics.record_request("https://api.moxfield.com/v2/decks/all/abc", 200, 0.1, size=2048)
+        metrics.count("duplicates_linked")
+
+        report = metrics.report(script="test")
+        navigate = report['steps']['navigate']
+        self.assertEqual(navigate['count'], 4)
+        self.assertEqual(navigate['buckets'], {"<=0.002": 1, "<=0.004": 2, "<=0.512": 1})
+        self.assertEqual(navigate['p50'], 0.004)
+        self.assertEqual(navigate['p99'], 0.5)
+        self.assertEqual(report['steps']['page_content']['timeouts'], 1)
+
+        moxfield = report['requests']['api.moxfield.com']
+        self.assertEqual(moxfield['statuses'], {'429': 1, '200': 1})
+        self.assertEqual((moxfield['bytes'], moxfield['retries']), (2048, 1))
+        self.assertEqual(report['counters'], {'duplicates_linked': 1})
+        self.assertEqual(report['run']['script'], "test")
+
+class WorkQueueTest(unittest.TestCase):
+    """Test the scrape coordinator's shared work queue."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.test_dir)
+
+    def test_expired_leases_are_taken_over(self):
+        """Test that decks are queued once and a crashed worker's lease passes to another worker."""
+        from work_queue import WorkQueue
+
+        queue = WorkQueue(os.path.join(self.test_dir, "queue.sqlite3"))
+        self.assertEqual(queue.add([("a", "url-a"), ("b", "url-b"), ("a", "url-a")]), 2)
+
+        self.assertEqual(len(queue.lease("crashed", count=2, lease_seconds=-1)), 2)
+        taken = queue.lease("worker", count=5)
+        self.assertEqual(sorted(deck_id for deck_id, _ in taken), ["a", "b"])
+
+        self.assertFalse(queue.complete("a", "crashed", b"late"))
+        self.assertTrue(queue.complete("a", "worker", b"deck"))
+        self.assertTrue(queue.complete("b", "worker", None, status='not_found'))
+        self.assertEqual(queue.remaining(), 0)
+        self.assertEqual(sorted(queue.results()), [("a", "done", b"deck", None), ("b", "not_found", None, None)])
+        queue.close()
+
+    def test_failed_items_retried_on_new_run(self):
+        """Test that a failed deck is queued again by the next run that lists it, until it has failed in max_failed_runs runs."""
+        from work_queue import WorkQueue
+
+        queue = WorkQueue(os.path.join(self.test_dir, "queue.sqlite3"))
+        for run in range(3):
+            queue.add([("a", "url-a")], max_failed_runs=2)
+            for attempt in range(2):
+                self.assertEqual(queue.lease("worker"), [] if run == 2 else [("a", "url-a")])
+                queue.fail("a", "worker", "HTTP 503", max_attempts=2)
+            self.assertEqual(queue.remaining(), 0)
+            self.assertEqual(list(queue.results()), [("a", "failed", None, "HTTP 503")])
+
+        queue.add([("b", "url-b")])
+        self.assertEqual(queue.lease("worker"), [("b", "url-b")])
+        self.assertTrue(queue.complete("b", "worker", b"deck"))
+        queue.add([("a", "url-a")])
+        self.assertEqual(queue.lease("worker"), [("a", "url-a")])
+        self.assertTrue(queue.complete("a", "worker", b"deck"))
+        queue.add([("a", "url-a")])
+        self.assertEqual(queue.remaining(), 0)
+        queue.close()
+
+class ExportIdCacheTest(unittest.TestCase):
+    """Test export ID discovery, expiry and refresh."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        shutil.rmtree(self.test_dir)
+
+    def test_stale_id_costs_one_lookup(self):
+        """Test that a cached ID is reused until it expires or a 404 burst forces one refresh."""
+        import json
+        from deck_fetcher import ExportIdCache
+
+        class Response:
+            def __init__(self, status_code, body):
+                self.status_code, self.body = status_code, body
+
+            def json(self):
+                return self.body
+
+        current = {'id': "first"}
+        requested = []
+
+        def get(url):
+            requested.append(url)
+            if "gone" in url:
+                return Response(404, {})
+            return Response(200, {'exportId': current['id']})
+
+        path = os.path.join(self.test_dir, "export_id.json")
+        self.assertEqual(ExportIdCache(path).current(get, ["gone1", "deck1"]), "first")
+        self.assertEqual(len(requested), 2)
+
+        cache = ExportIdCache(path)
+        self.assertEqual(cache.current(get, ["deck1"]), "first")
+        self.assertEqual(len(requested), 2)
+
+        current['id'] = "second"
+        self.assertTrue(cache.refresh(get, ["deck2"]))
+        self.assertEqual(cache.export_id, "second")
+        self.assertFalse(cache.refresh(get, ["gone2"]))
+        self.assertFalse(cache.refresh(get, ["deck2"]))
+        self.assertEqual(len(requested), 4)
+        with open(path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['export_id'], "second")
+
+        self.assertEqual(ExportIdCache(path, ttl=0).current(get, ["gone3"]), "second")
+
+class FetchPriorityTest(unittest.TestCase):
+    """Test the fetch order of deck rows."""
+
+    def test_rows_ordered_by_priority(self):
+        """Test that priorities break ties in turn, missing values go last and rows keep their index."""
+        import pandas as pd
+        from fetch_priority import prioritize
+
+        df = pd.DataFrame({'url': ["a", "b", "c", "d"], 'placement': [3, 1, None, 1],
+                           'total_players': [50, 40, 100, 90], 'wins': [5, 3, 2, 6], 'losses': [1, 2, 2, 0],
+                           'draws': [0, 1, 0, 0], 'date': ["January 1st 2025", "May 2nd 2024", "March 3rd 2025", None]})
+        self.assertEqual(list(prioritize(df, "placement,size").url), ["d", "b", "a", "c"])
+        self.assertEqual(list(prioritize(df, "winrate").url), ["d", "a", "b", "c"])
+        self.assertEqual(list(prioritize(df, "date").url), ["c", "a", "b", "d"])
+        self.assertEqual(list(prioritize(df, "csv").url), ["a", "b", "c", "d"])
+        self.assertEqual(list(prioritize(df, "size").index), [2, 3, 0, 1])
+        with self.assertRaises(ValueError):
+            prioritize(df, "popularity")
+
+class MultiTabTest(unittest.TestCase):
+    """Test loading pages in several tabs with a fake driver."""
+
+    def test_timeouts_requeue_until_final_attempt(self):
+        """Test that timed-out and unfinished jobs are queued again and the last load is flagged final."""
+        from multi_tab import STALE_MARKER_SCRIPT, run_in_tabs
+
+        class SwitchTo:
+            def __init__(self, driver):
+                self.driver = driver
+
+            def new_window(self, kind):
+                self.driver.tabs.append(None)
+                self.driver.current_window_handle = len(self.driver.tabs) - 1
+
+            def window(self, handle):
+                self.driver.current_window_handle = handle
+
+        class Driver:
+            def __init__(self):
+                self.tabs = [None]
+                self.current_window_handle = 0
+                self.switch_to = SwitchTo(self)
+                self.closed = []
+
+            def execute_script(self, script, *args):
+                if script == STALE_MARKER_SCRIPT:
+                    self.tabs[self.current_window_handle] = args[0]
+                    return None
+                return False  # STALE_CHECK_SCRIPT: the fake tab commits its navigation at once
+
+            def close(self):
+                self.closed.append(self.current_window_handle)
+
+        def ready(driver):
+            url = driver.tabs[driver.current_window_handle]
+            return None if url == "slow" else url
+
+        harvested = []
+
+        def harvest(driver, job, loaded, final_attempt):
+            harvested.append((job['url'], loaded, final_attempt))
+            return job['url'] == "ok" or (job['url'] == "flaky" and final_attempt)
+
+        driver = Driver()
+        jobs = [{'url': "ok"}, {'url': "slow"}, {'url': "flaky"}]
+        loads = run_in_tabs(driver, jobs, ready, harvest, tabs=2, timeout=0.05, max_attempts=2, poll=0.01)
+
+        self.assertEqual(loads, 5)
+        self.assertEqual(sorted(harvested), [("flaky", "flaky", False), ("flaky", "flaky", True), ("ok", "ok", False),
+                                             ("slow", None, False), ("slow", None, True)])
+        self.assertEqual((driver.closed, driver.current_window_handle), ([1], 0))
+
+class MoxfieldScrapeTest(unittest.TestCase):
+    """Test the Moxfield scrapers and their HTTP client against the mock server."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        import deck_fetcher
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+        from mock_servers import MockState, start_mock_server
+
+        self.test_dir = tempfile.mkdtemp()
+        self.state = MockState(entries=0)
+        self.server, base_url = start_mock_server(self.state)
+        self.saved_globals = (deck_fetcher.MOXFIELD_API_BASE, deck_fetcher.EXPORT_ID_FILE)
+        deck_fetcher.MOXFIELD_API_BASE = base_url
+        deck_fetcher.EXPORT_ID_FILE = os.path.join(self.test_dir, "export_id.json")
+
+    def tearDown(self):
+        """Tear down test fixtures."""
+        import deck_fetcher
+        deck_fetcher.MOXFIELD_API_BASE, deck_fetcher.EXPORT_ID_FILE = self.saved_globals
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def test_repeated_urls_keep_their_rows(self):
+        """Test that a deck listed on several rows is fetched once and every row gets its file and summary row."""
+        import importlib
+        import pandas as pd
+
+        deck_ids = ["mockA", "mockA", "mockB"]
+        csv_file = os.path.join(self.test_dir, "edh16_scrape.csv")
+        pd.DataFrame({'url': [f"https://www.moxfield.com/decks/{deck_id}" for deck_id in deck_ids],
+                      'name': ["Alice", "Bob", "Carol"], 'placement': [1, 2, 3], 'total_players': [40, 40, 40],
+                      'wins': [5, 4, 3], 'losses': [1, 2, 3], 'draws': [0, 0, 0]}).to_csv(csv_file, index=False)
+
+        output_dir = os.path.join(self.test_dir, "deck_lists")
+        importlib.import_module('2_moxfield_scrape').scrape_deck_pages(csv_file, output_dir, priority="csv")
+
+        files = [os.path.join(output_dir, f"{index + 1:03d}_{deck_id}.txt") for index, deck_id in enumerate(deck_ids)]
+        for path in files:
+            self.assertTrue(os.path.isfile(path), f"{path} was not written")
+        self.assertEqual(os.stat(files[0]).st_ino, os.stat(files[1]).st_ino)
+
+        summary = pd.read_csv(os.path.join(output_dir, "deck_summary.csv"))
+        self.assertEqual(len(summary), 3)
+        self.assertEqual(list(summary['Deck Title']), ["Alice", "Bob", "Carol"])
+        self.assertEqual(list(summary['Download Status']), ["Success"] * 3)
+
+        fetched = [key for site, key, _, _ in self.state.log if site == 'moxfield' and 'mockA' in key]
+        self.assertEqual(fetched, ["/v2/decks/all/mockA"])
+
+    def test_not_found_diagnosis(self):
+        """Test that the pooled session checks each 404'd deck once and stops after EXPORT_ID_SAMPLE existing decks."""
+        import deck_fetcher
+        from http_client import create_client, create_session
+        from moxfield_api_scrape import EXPORT_ID_SAMPLE, diagnose_not_found
+        from rate_control import AIMDController, HostGovernor
+
+        session = create_session(pool_maxsize=4, retries=1)
+        adapter = session.get_adapter(deck_fetcher.MOXFIELD_API_BASE)
+        self.assertEqual((adapter.max_retries.total, adapter.max_retries.status), (1, 0))
+        self.assertIs(type(create_client(http2=False)), type(session))
+
+        governor = HostGovernor(AIMDController(initial=50.0, maximum=50.0))
+        result = diagnose_not_found(session, governor, ["mockA", "gone1", "mockA"], "export")
+        self.assertEqual(result, {'exists': ["mockA"], 'missing': ["gone1"], 'unchecked': []})
+
+        deck_ids = [f"mock{index}" for index in range(EXPORT_ID_SAMPLE + 2)]
+        result = diagnose_not_found(session, governor, deck_ids, "export")
+        self.assertEqual((result['exists'], result['unchecked']), (deck_ids[:EXPORT_ID_SAMPLE], deck_ids[EXPORT_ID_SAMPLE:]))
+        self.assertEqual(len(self.state.log), 2 + EXPORT_ID_SAMPLE)
+        session.close()
+
+    def test_structured_fetch_falls_back_to_download(self):
+        """Test that fetch_structured asks for the deck JSON first and only downloads the text when the JSON is unusable."""
+        import requests
+        from urllib.parse import urlparse
+        from deck_fetcher import DeckFetcher, DeckFetchError, DeckNotFound
+
+        class RecordingSession(requests.Session):
+            """Notes the path of every request; with broken_json, serves deck JSON with an unparseable body."""
+            def __init__(self, broken_json=False):
+                super().__init__()
+                self.broken_json = broken_json
+                self.paths = []
+
+            def get(self, url, **kwargs):
+                self.paths.append(urlparse(url).path)
+                response = super().get(url, **kwargs)
+                if self.broken_json and '/download' not in url:
+                    response._content = b"<html>not json</html>"
+                return response
+
+            def take_paths(self):
+                paths, self.paths = self.paths, []
+                return paths
+
+        session = RecordingSession()
+        fetcher = DeckFetcher(session=session, requests_per_second=50.0, max_requests_per_second=50.0)
+        deck_text, source, deck_json = fetcher.fetch_structured("mockA")
+        self.assertEqual((source, deck_json['exportId']), ('json', fetcher.export_id))
+        self.assertIn("Magda", deck_text)
+        self.assertEqual(session.take_paths(), ["/v2/decks/all/mockA"])
+
+        with self.assertRaises(DeckNotFound):
+            fetcher.fetch_structured("gone1")
+        self.assertEqual(session.take_paths(), ["/v2/decks/all/gone1"])
+
+        session = RecordingSession(broken_json=True)
+        broken = DeckFetcher(session=session, export_id=fetcher.export_id,
+                             requests_per_second=50.0, max_requests_per_second=50.0)
+        self.assertEqual(broken.fetch_structured("mockA"), (deck_text, 'download', None))
+        self.assertEqual(session.take_paths(), ["/v2/decks/all/mockA", "/v2/decks/all/mockA/download"])
+
+        broken.export_id = "stale"
+        with self.assertRaisesRegex(DeckFetchError, "Invalid deck JSON"):
+            broken.fetch_structured("mockA")
+        self.assertEqual(session.take_paths(), ["/v2/decks/all/mockA", "/v2/decks/all/mockA/download"])
+
 if __name__ == "__main__":
     unittest.main()
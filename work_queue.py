@@ -0,0 +1,135 @@
+import time
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work (
+    deck_id TEXT PRIMARY KEY,
+    url TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result BLOB,
+    error TEXT,
+    finished_at REAL,
+    priority REAL NOT NULL DEFAULT 0,
+    failed_runs INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS work_status ON work (status, lease_expires);
+"""
+
+# Items in these states are finished and never leased again. 'failed' only ends
+# an item for the current run: the next run's add() queues it again.
+FINAL_STATUSES = ('done', 'not_found')
+# Runs an item may fail in before later runs stop queueing it again
+MAX_FAILED_RUNS = 3
+
+
+class WorkQueue:
+    """
+    SQLite-backed work queue shared by the scraper's worker processes.
+
+    Items are keyed by deck ID, so a deck that appears in many input rows is
+    queued (and fetched) once. Items are leased lowest priority value first. A
+    worker leases items for lease_seconds; if it crashes, the lease expires and
+    another worker picks the items up.
+
+    Args:
+        path: SQLite database file
+        timeout: Seconds to wait for another process's write lock
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(work)")]
+        if 'priority' not in columns:  # Queue created before items had priorities
+            self.connection.execute("ALTER TABLE work ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+        if 'failed_runs' not in columns:  # Queue created before failed items were retried
+            self.connection.execute("ALTER TABLE work ADD COLUMN failed_runs INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, items, max_failed_runs=MAX_FAILED_RUNS):
+        """
+        Queue (deck_id, url) or (deck_id, url, priority) items, ignoring decks that are already queued.
+
+        A deck that is already queued but not yet leased takes the new priority,
+        so a rerun with a different order reorders what's left. Decks in items that
+        failed in an earlier run go back to pending with a fresh set of attempts, unless
+        they have already failed in max_failed_runs runs.
+
+        Returns:
+            Number of new items
+        """
+        items = [tuple(item) if len(item) == 3 else (item[0], item[1], 0) for item in items]
+        before = self.connection.total_changes
+        self.connection.execute("BEGIN IMMEDIATE")
+        self.connection.executemany("INSERT OR IGNORE INTO work (deck_id, url, priority) VALUES (?, ?, ?)", items)
+        added = self.connection.total_changes - before
+        self.connection.executemany("UPDATE work SET status = 'pending', attempts = 0 "
+                                    "WHERE deck_id = ? AND status = 'failed' AND failed_runs < ?",
+                                    [(deck_id, max_failed_runs) for deck_id, _, _ in items])
+        self.connection.executemany("UPDATE work SET priority = ? WHERE deck_id = ? AND status = 'pending'",
+                                    [(priority, deck_id) for deck_id, _, priority in items])
+        self.connection.execute("COMMIT")
+        return added
+
+    def lease(self, owner, count=1, lease_seconds=120):
+        """
+        Take up to count items that are pending or whose lease has expired.
+
+        Returns:
+            List of (deck_id, url) tuples
+        """
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.connection.execute(
+                "SELECT deck_id, url FROM work WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_expires < ?) ORDER BY priority, rowid LIMIT ?", (now, count)).fetchall()
+            self.connection.executemany(
+                "UPDATE work SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE deck_id = ?", [(owner, now + lease_seconds, deck_id) for deck_id, _ in rows])
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _finish(self, deck_id, owner, status, result=None, error=None):
+        # Only the current lease holder may finish an item; a worker whose lease
+        # expired and was taken over has its late result ignored
+        cursor = self.connection.execute(
+            "UPDATE work SET status = ?, result = ?, error = ?, finished_at = ?, lease_owner = NULL, "
+            "failed_runs = failed_runs + (? = 'failed') WHERE deck_id = ? AND lease_owner = ? AND status = 'leased'",
+            (status, result, error, time.time(), status, deck_id, owner))
+        return cursor.rowcount == 1
+
+    def complete(self, deck_id, owner, result, status='done'):
+        """Store an item's result (bytes). status is 'done' or 'not_found'."""
+        return self._finish(deck_id, owner, status, result=result)
+
+    def fail(self, deck_id, owner, error, max_attempts=3):
+        """Record a failed attempt; the item goes back to pending until it has used max_attempts this run."""
+        row = self.connection.execute("SELECT attempts FROM work WHERE deck_id = ?", (deck_id,)).fetchone()
+        if row is not None and row[0] < max_attempts:
+            return self._finish(deck_id, owner, 'pending', error=error)
+        return self._finish(deck_id, owner, 'failed', error=error)
+
+    def remaining(self):
+        """Number of items not yet finished this run (pending or leased)."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM work WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+    def counts(self):
+        return dict(self.connection.execute("SELECT status, COUNT(*) FROM work GROUP BY status").fetchall())
+
+    def results(self):
+        """Yield (deck_id, status, result, error) for every item finished this run, including failed ones."""
+        yield from self.connection.execute(
+            f"SELECT deck_id, status, result, error FROM work WHERE status IN {FINAL_STATUSES + ('failed',)}")